@@ -0,0 +1,9 @@
+from .synthetic_workbook import generate_workbook, HEADER
+from .run_benchmark import run_benchmark, save_result
+
+__all__ = [
+    'generate_workbook',
+    'HEADER',
+    'run_benchmark',
+    'save_result'
+]
@@ -0,0 +1,39 @@
+import argparse
+from benchmark.run_benchmark import run_isolated, print_result, save_result
+
+
+def parse_args():
+    """Lê as opções de linha de comando do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark do input de dados contra o GLPI simulado")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000],
+                        help="Tamanhos de planilha a medir (ex: --rows 1000 10000)")
+    parser.add_argument("--entities", type=int, default=30, help="Caminhos de entidade distintos (padrão: 30)")
+    parser.add_argument("--brands", type=int, default=5, help="Fabricantes distintos (padrão: 5)")
+    parser.add_argument("--models", type=int, default=20, help="Modelos distintos (padrão: 20)")
+    parser.add_argument("--users", type=int, default=None, help="Usuários distintos (padrão: um por linha)")
+    parser.add_argument("--workers", type=int, default=1, help="Linhas processadas em paralelo (padrão: 1)")
+    parser.add_argument("--batch-size", type=int, default=50, help="Ativos novos por requisição (padrão: 50)")
+    parser.add_argument("--adaptive", action="store_true", help="Concorrência adaptativa (--workers vira o teto)")
+    parser.add_argument("--stream", action="store_true", help="Usa o modo streaming de main()")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência simulada por requisição, em segundos")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latência extra aleatória máxima, em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de requisições com erro 500")
+    parser.add_argument("--page-limit", type=int, default=1000, help="Itens por página do GLPI simulado")
+    parser.add_argument("--seed", type=int, default=0, help="Semente dos dados gerados")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="Arquivo JSON onde os resultados são acumulados (padrão: benchmark_results.json)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    for rows in args.rows:
+        # Cada tamanho roda em um processo próprio (memória e contadores independentes)
+        result = run_isolated(
+            rows=rows, entities=args.entities, brands=args.brands, models=args.models, users=args.users,
+            workers=args.workers, batch_size=args.batch_size, stream=args.stream, latency=args.latency,
+            jitter=args.jitter, error_rate=args.error_rate, page_limit=args.page_limit, seed=args.seed,
+            adaptive=args.adaptive
+        )
+        print_result(result)
+        save_result(result, args.output)
@@ -0,0 +1,185 @@
+import os
+import json
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime
+from helper.colors import c
+from benchmark.synthetic_workbook import generate_workbook
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _serve_mock(conn, options):
+    """Processo do GLPI simulado: envia a URL, espera o pedido de parada e devolve as estatísticas"""
+    from glpi_mock import MockGLPIServer
+    server = MockGLPIServer(**options).start()
+    conn.send(server.url)
+    conn.recv()
+    conn.send(server.stats())
+    server.stop()
+
+
+def _peak_rss_mb():
+    """Pico de memória residente do processo (MB), se disponível"""
+    if resource is None:
+        return None
+    # No Linux ru_maxrss é em KB (no macOS, em bytes)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 / (1024 if os.uname().sysname == "Darwin" else 1), 1)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(rows=1000, entities=30, brands=5, models=20, users=None, workers=1, batch_size=50,
+                  stream=False, latency=0.0, jitter=0.0, error_rate=0.0, page_limit=1000, seed=0, workdir=None,
+                  adaptive=False):
+    """
+    Executa main() contra o GLPI simulado com uma planilha sintética
+
+    Args:
+        rows (int): Linhas da planilha sintética
+        entities, brands, models, users (int): Cardinalidade dos dados gerados
+        workers (int): Linhas processadas em paralelo
+        batch_size (int): Ativos novos criados por requisição
+        stream (bool): Usa o modo streaming de main()
+        latency, jitter (float): Latência simulada por requisição (segundos)
+        error_rate (float): Fração de requisições com erro 500
+        page_limit (int): Itens por página do GLPI simulado
+        seed (int): Semente dos dados gerados
+        workdir (str): Diretório da planilha gerada (padrão: diretório temporário)
+        adaptive (bool): Usa o controle adaptativo de concorrência (workers = teto)
+
+    Returns:
+        dict: Resultado do benchmark
+    """
+    import main as glpi_main
+
+    workdir = workdir or tempfile.mkdtemp(prefix="glpi_bench_")
+    file_path = os.path.join(workdir, f"bench_{rows}.xlsx")
+    print(c(f"📝 Gerando planilha sintética com {rows} linha(s)...", 'cyan'))
+    generate_workbook(file_path, rows, entities=entities, brands=brands, models=models, users=users, seed=seed)
+
+    # O GLPI simulado roda em outro processo para não somar memória e CPU ao input
+    parent_conn, child_conn = multiprocessing.Pipe()
+    options = {"latency": latency, "jitter": jitter, "error_rate": error_rate,
+               "page_limit": page_limit, "random_seed": seed}
+    mock = multiprocessing.Process(target=_serve_mock, args=(child_conn, options), daemon=True)
+    mock.start()
+    base_url = parent_conn.recv()
+
+    try:
+        total, success, errors = glpi_main.main(workers=workers, batch_size=batch_size, stream=stream,
+                                                file_path=file_path, base_url=base_url,
+                                                adaptive=adaptive) or (0, 0, 0)
+    finally:
+        parent_conn.send("stop")
+        endpoint_counts = parent_conn.recv()
+        mock.join()
+
+    stats = glpi_main.run_stats
+    elapsed = stats.get("elapsed_seconds") or 0.0
+    requests_total = sum(endpoint_counts.values())
+    per_row = lambda value: round(value / rows, 3) if rows else None
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "params": {
+            "rows": rows, "entities": entities, "brands": brands, "models": models, "users": users,
+            "workers": workers, "batch_size": batch_size, "stream": stream, "latency": latency,
+            "jitter": jitter, "error_rate": error_rate, "page_limit": page_limit, "seed": seed,
+            "adaptive": adaptive,
+        },
+        "rows_processed": total,
+        "rows_ok": success,
+        "rows_error": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 2) if elapsed else None,
+        "requests_total": requests_total,
+        "requests_per_row": per_row(requests_total),
+        "requests_per_row_by_endpoint": {endpoint: per_row(count)
+                                         for endpoint, count in sorted(endpoint_counts.items())},
+        "peak_rss_mb": _peak_rss_mb(),
+        "workbook_io_seconds": round(stats.get("workbook_io_seconds", 0.0), 3),
+        "network_seconds": round(stats.get("network_seconds", 0.0), 3),
+        "concurrency": stats.get("concurrency"),
+    }
+
+
+def _run_in_child(conn, options):
+    """Processo de uma medição: executa run_benchmark e devolve o resultado (ou o erro)"""
+    try:
+        conn.send(("ok", run_benchmark(**options)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def run_isolated(**options):
+    """
+    Executa run_benchmark em um processo novo (spawn)
+    Cada tamanho de planilha é medido em um interpretador limpo, de modo que
+    contadores globais, caches e o pico de memória (ru_maxrss) de uma medição
+    não passam para a seguinte.
+
+    Args:
+        options: Mesmos parâmetros de run_benchmark
+
+    Returns:
+        dict: Resultado do benchmark
+    """
+    context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = context.Pipe()
+    process = context.Process(target=_run_in_child, args=(child_conn, options))
+    process.start()
+    try:
+        status, result = parent_conn.recv()
+    except EOFError:
+        status, result = "error", f"processo do benchmark terminou com código {process.exitcode}"
+    process.join()
+    if status != "ok":
+        raise RuntimeError(result)
+    return result
+
+
+def print_result(result):
+    """Exibe o resumo do benchmark no terminal"""
+    print(c("=" * 60, 'blue'))
+    print(c(f"📊 BENCHMARK ({result['params']['rows']} linhas, {result['params']['workers']} worker(s))", 'blue'))
+    print(c(f"⏱️ Tempo total: {result['elapsed_seconds']}s ({result['rows_per_second']} linhas/s)", 'cyan'))
+    print(c(f"🌐 Requisições: {result['requests_total']} ({result['requests_per_row']} por linha)", 'cyan'))
+    print(c(f"📄 I/O da planilha: {result['workbook_io_seconds']}s | Rede: {result['network_seconds']}s", 'cyan'))
+    print(c(f"🧠 Pico de memória: {result['peak_rss_mb']} MB", 'cyan'))
+    if result.get("concurrency"):
+        concurrency = result["concurrency"]
+        print(c(f"🎚️ Concorrência adaptativa: média {concurrency['avg']} | máx {concurrency['max']} | "
+                f"final {concurrency['limit']}", 'cyan'))
+    top = sorted(result["requests_per_row_by_endpoint"].items(), key=lambda item: -item[1])[:10]
+    for endpoint, count in top:
+        print(c(f"   {count:>8} req/linha  {endpoint}", 'white'))
+    print(c("=" * 60, 'blue'))
+
+
+def save_result(result, output_path):
+    """Anexa o resultado a um arquivo JSON (lista de execuções), para comparar versões"""
+    results = []
+    if os.path.exists(output_path):
+        with open(output_path, 'r', encoding='utf-8') as f:
+            try:
+                results = json.load(f)
+            except ValueError:
+                results = []
+    if not isinstance(results, list):
+        results = [results]
+    results.append(result)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
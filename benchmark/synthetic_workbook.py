@@ -0,0 +1,72 @@
+import random
+import openpyxl
+
+# Cabeçalho da planilha de entrada (mesmo layout de input_glpi.xlsx, 44 colunas)
+HEADER = [
+    "Nome do User", "email", "CPF", "Email corp", "Celular pessoal", "Posição", "Comentario", "Status",
+    "Raiz", "new BU", "cliente", "Projeto", "Dimensoes",
+    "Linha", "Operadora", "Contrato Linha", "Status linha", "Tipo de Linha", "Fornecedor Linha",
+    "Data Inicial linha", "Valor linha",
+    "Tipo de Celular", "Marca do Celular", "Modelo do Celular", "IMEI do Celular", "Status telefone",
+    "Comentario celular",
+    "Fabricante Notebook", "Modelo do Notebook", "Tipo de computador", "Serial Number do Notebook",
+    "Ativo Notebook", "Armazenamento Notebook", "Processador Notebook", "Memoria RAM Notebook",
+    "Contrato Notebook", "Comprado em Notebook", "Fornecedor do Notebook", "Comentario note", "Status Notebook",
+    "Input User", "Input Line", "Input Mobile", "Input Notebook",
+]
+
+OPERATORS = ("Vivo", "Claro", "TIM", "Oi")
+STORAGES = ("SSD 256GB", "SSD 512GB", "HD 1TB")
+PROCESSORS = ("Intel i5", "Intel i7", "AMD Ryzen 5", "AMD Ryzen 7")
+MEMORIES = ("8GB", "16GB", "32GB")
+POSITIONS = ("Analista", "Coordenador", "Gerente", "Estagiário", "Diretor")
+
+
+def generate_workbook(path, rows, entities=30, brands=5, models=20, users=None, contracts=5, suppliers=3, seed=0):
+    """
+    Gera uma planilha sintética no layout de input_glpi.xlsx
+
+    Args:
+        path (str): Caminho do arquivo .xlsx gerado
+        rows (int): Número de linhas de dados
+        entities (int): Caminhos de entidade distintos
+        brands (int): Fabricantes distintos (celular e notebook)
+        models (int): Modelos distintos (celular e notebook)
+        users (int): Usuários distintos (padrão: um por linha)
+        contracts (int): Contratos distintos (linha e notebook)
+        suppliers (int): Fornecedores distintos
+        seed (int): Semente do gerador aleatório
+
+    Returns:
+        str: Caminho do arquivo gerado
+    """
+    rnd = random.Random(seed)
+    users = users or rows
+    entity_paths = [(f"Raiz {i % 3}", f"BU {i % 7}", f"Cliente {i}", f"Projeto {i}" if i % 2 else None)
+                    for i in range(max(1, entities))]
+
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = wb.create_sheet("Planilha1")
+    sheet.append(HEADER)
+
+    for row in range(rows):
+        user = row % users
+        ent_a, ent_b, ent_c, ent_d = entity_paths[rnd.randrange(len(entity_paths))]
+        brand = f"Marca {rnd.randrange(max(1, brands))}"
+        nb_brand = f"Marca {rnd.randrange(max(1, brands))}"
+        sheet.append([
+            f"Usuario {user} Sintetico", f"usuario{user}@exemplo.com", f"{user:011d}", None,
+            f"119{user:08d}", rnd.choice(POSITIONS), None, 1,
+            ent_a, ent_b, ent_c, ent_d, f"Comentário {ent_c}",
+            f"11{9_0000_0000 + row}", rnd.choice(OPERATORS), f"Contrato {rnd.randrange(max(1, contracts))}",
+            1, 1, f"Fornecedor {rnd.randrange(max(1, suppliers))}", "01/02/2024", rnd.randrange(30, 120),
+            1, brand, f"Modelo Celular {rnd.randrange(max(1, models))}", f"35{row:013d}", 1, None,
+            nb_brand, f"Modelo Notebook {rnd.randrange(max(1, models))}", 1, f"SN{row:08d}", f"AT{row:08d}",
+            rnd.choice(STORAGES), rnd.choice(PROCESSORS), rnd.choice(MEMORIES),
+            f"Contrato {rnd.randrange(max(1, contracts))}", "2024-01-15",
+            f"Fornecedor {rnd.randrange(max(1, suppliers))}", None, 1,
+            None, None, None, None,
+        ])
+
+    wb.save(path)
+    return path
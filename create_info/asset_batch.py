@@ -0,0 +1,153 @@
+import threading
+from helper.colors import c
+from create_info.create_asset import asset_key, find_asset, search_asset, update_asset, post_asset
+from create_info.glpi_objects.dropdown_cache import get_dropdown_cache, DropdownCache
+from create_info.glpi_objects.generic_operations import create_many, BatchOutcomeUnknown
+from create_info.glpi_objects.asset_index import get_asset_index
+
+
+class AssetBatchWriter:
+    """
+    Classe para criar Computers, Phones e Lines em lote
+    Ativos já existentes são atualizados na hora. Ativos novos ficam em uma fila
+    por itemtype e são criados com um único POST {"input": [...]} quando a fila
+    atinge o tamanho do lote (ou no flush final). Os IDs devolvidos pela API são
+    mapeados de volta para cada item, e apenas os itens que a API informou como
+    falha são reenviados individualmente. Se o lote ficou sem resposta conclusiva
+    (timeout, conexão, 5xx), cada ativo é buscado na API e só os que não existem
+    são criados de novo. O restante do processamento de cada ativo
+    (status, infocom, contrato, componentes) roda no callback informado.
+    Pode ser usada por vários workers ao mesmo tempo.
+    """
+
+    def __init__(self, client, batch_size=50):
+        """
+        Inicializa o gravador em lote
+
+        Args:
+            client: GLPIClient da sessão ativa
+            batch_size (int): Quantidade de ativos criados por requisição
+        """
+        self.client = client
+        self.batch_size = max(1, int(batch_size))
+        self._queues = {}
+        self._pending_keys = set()
+        self._lock = threading.Lock()
+        self._flush_locks = {}
+
+    @staticmethod
+    def _key(asset_type, payload):
+        return tuple(DropdownCache.normalize(part) if isinstance(part, str) else part
+                     for part in asset_key(asset_type, payload))
+
+    def _flush_lock(self, asset_type):
+        with self._lock:
+            lock = self._flush_locks.get(asset_type)
+            if lock is None:
+                lock = self._flush_locks[asset_type] = threading.Lock()
+            return lock
+
+    def submit(self, asset_type, payload, callback):
+        """
+        Atualiza o ativo se ele já existir ou o coloca na fila de criação
+
+        Args:
+            asset_type: Tipo do ativo (Line, Phone, Computer)
+            payload: Dados do ativo
+            callback: Função chamada com (asset_id, error_message, created) quando o ativo estiver pronto
+        """
+        print(c(f"💻 Processando {asset_type}...", 'yellow'))
+        key = self._key(asset_type, payload)
+        ready = []
+
+        with get_dropdown_cache().lock_for(asset_type, payload.get("name")):
+            # Mesmo ativo já está na fila (outra linha da planilha): cria o lote antes
+            # para que esta linha encontre o ativo e o atualize, como no fluxo individual
+            with self._lock:
+                already_pending = key in self._pending_keys
+            if already_pending:
+                ready.extend(self._flush(asset_type))
+
+            try:
+                asset_id = find_asset(self.client, asset_type, payload)
+                if asset_id:
+                    update_asset(self.client, asset_type, asset_id, payload)
+                    ready.append((callback, asset_id, None, False))
+                else:
+                    with self._lock:
+                        queue = self._queues.setdefault(asset_type, [])
+                        queue.append((key, payload, callback))
+                        self._pending_keys.add(key)
+                        full = len(queue) >= self.batch_size
+                    if full:
+                        ready.extend(self._flush(asset_type))
+            except Exception as e:
+                print(c(f"❌ Erro ao processar {asset_type}", 'red'))
+                ready.append((callback, None, f"Erro: {str(e)}", False))
+
+        self._run_callbacks(ready)
+
+    def flush(self, asset_type=None):
+        """
+        Cria os ativos que ainda estão na fila
+
+        Args:
+            asset_type: Tipo do ativo a criar (padrão: todos)
+        """
+        with self._lock:
+            asset_types = [asset_type] if asset_type else list(self._queues)
+        for item_type in asset_types:
+            self._run_callbacks(self._flush(item_type))
+
+    def _flush(self, asset_type):
+        """Envia o lote do itemtype e retorna os callbacks prontos para execução"""
+        with self._flush_lock(asset_type):
+            with self._lock:
+                batch = self._queues.pop(asset_type, [])
+            if not batch:
+                return []
+
+            print(c(f"📦 Criando {len(batch)} {asset_type}(s) em lote...", 'cyan'))
+            unknown = False
+            try:
+                ids = create_many(self.client, asset_type, [payload for _, payload, _ in batch])
+            except BatchOutcomeUnknown as e:
+                print(c(f"⚠️ Lote de {asset_type} sem resposta conclusiva ({e}), verificando item a item...", 'yellow'))
+                ids = [None] * len(batch)
+                unknown = True
+
+            index = get_asset_index()
+            ready = []
+            for (key, payload, callback), asset_id in zip(batch, ids):
+                error = None
+                created = bool(asset_id)
+                if asset_id:
+                    index.add(asset_type, payload, asset_id)
+                else:
+                    # Só os itens que falharam no lote são reenviados um a um; sem resposta
+                    # conclusiva, o ativo pode ter sido gravado e é procurado antes
+                    try:
+                        asset_id = search_asset(self.client, asset_type, payload) if unknown else None
+                        if asset_id:
+                            print(c(f"✅ {asset_type} criado", 'green'))
+                        else:
+                            asset_id, error = post_asset(self.client, asset_type, payload)
+                        created = bool(asset_id)
+                    except Exception as e:
+                        if "Duplicate entry" in str(e) or "already exists" in str(e):
+                            asset_id = True
+                        else:
+                            asset_id, error = None, f"Erro: {str(e)}"
+                ready.append((callback, asset_id, error, created))
+
+            with self._lock:
+                for key, _, _ in batch:
+                    self._pending_keys.discard(key)
+            return ready
+
+    def _run_callbacks(self, ready):
+        for callback, asset_id, error, created in ready:
+            try:
+                callback(asset_id, error, created)
+            except Exception as e:
+                print(c(f"❌ Erro ao finalizar ativo {asset_id}: {e}", 'red'))
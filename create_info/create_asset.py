@@ -1,106 +1,211 @@
-
-import requests
 from time import sleep
-from helper.read_config import GLPI_URL, HEADERS
+import requests
 from helper.colors import c
+from create_info.glpi_objects.dropdown_cache import get_dropdown_cache
+from create_info.glpi_objects.asset_index import get_asset_index
+from create_info.glpi_objects.generic_operations import update_changed, put_item
+from helper.read_config import UPDATE_ONLY_CHANGED
 
-def create_asset(session_token, asset_type, payload):
+def _parse_item_id(data_item):
+    """Extrai o ID de um item retornado pela busca (dict ou lista)"""
+    if isinstance(data_item, dict):
+        return int(data_item.get("id", data_item.get("2", 0)))
+    if isinstance(data_item, list) and len(data_item) > 2:
+        # Se for lista, o ID geralmente está na posição 2
+        return int(data_item[2]) if data_item[2] else 0
+    # Fallback: busca qualquer valor numérico válido
+    for item in (data_item if isinstance(data_item, list) else [data_item]):
+        if isinstance(item, (int, str)) and str(item).isdigit():
+            return int(item)
+    return 0
+
+def _parse_created_id(response_data):
+    """Extrai o ID da resposta de criação (dict ou lista)"""
+    if isinstance(response_data, dict):
+        return response_data.get("id")
+    if isinstance(response_data, list) and len(response_data) > 0:
+        # Se for lista, verifica se o primeiro item tem ID
+        first_item = response_data[0]
+        if isinstance(first_item, dict):
+            return first_item.get("id")
+        if len(response_data) >= 3:
+            # Se tem pelo menos 3 itens, o ID geralmente está na posição 2 (índice 2)
+            third_item = response_data[2]
+            if isinstance(third_item, (int, str)) and str(third_item).isdigit():
+                return int(third_item)
+        elif isinstance(first_item, (int, str)) and str(first_item).isdigit():
+            return int(first_item)
+    return None
+
+def asset_key(asset_type, payload):
     """
-    Cria ou atualiza um ativo (Line, Phone, Computer) vinculado à entidade e usuário.
-    Retorna uma tupla (asset_id, error_message).
+    Chave natural usada para identificar o ativo (nome e, para Lines, o usuário)
+
+    Args:
+        asset_type: Tipo do ativo (Line, Phone, Computer)
+        payload: Dados do ativo
+
+    Returns:
+        tuple: Chave do ativo
     """
-    headers = {**HEADERS, "Session-Token": session_token}
-    print(c(f"💻 Processando {asset_type}...", 'yellow'))
-    search_value = payload.get("name")
-    
-    try:
-        # Primeiro verifica se o ativo já existe
-        users_id = payload.get("users_id", 0)
-        search_params = {
-            "criteria[0][field]": 1,
-            "criteria[0][searchtype]": "equals",
-            "criteria[0][value]": search_value
-        }
-        
-        # Adiciona critério de usuário para Lines
-        if asset_type == "Line":
-            search_params.update({
-                "criteria[1][link]": "AND",
-                "criteria[1][field]": 70,
-                "criteria[1][searchtype]": "equals",
-                "criteria[1][value]": users_id
-            })
-        
-        # Busca o ativo
-        search = requests.get(f"{GLPI_URL}/search/{asset_type}", headers=headers, params=search_params)
-        resp = search.json()
-        
-        # Se encontrou, atualiza
-        if resp.get("totalcount", 0) > 0:
-            # Verifica se data[0] é um dicionário ou uma lista
-            data_item = resp["data"][0]
-            if isinstance(data_item, dict):
-                asset_id = int(data_item.get("id", data_item.get("2", 0)))
-            elif isinstance(data_item, list) and len(data_item) > 2:
-                # Se for lista, o ID geralmente está na posição 2
-                asset_id = int(data_item[2]) if data_item[2] else 0
-            else:
-                # Fallback: busca qualquer valor numérico válido
+    if asset_type == "Line":
+        return (asset_type, payload.get("name"), payload.get("users_id", 0))
+    return (asset_type, payload.get("name"))
+
+def find_asset(client, asset_type, payload):
+    """
+    Busca um ativo existente pelo nome (e usuário, no caso de Lines)
+    Consulta o índice de ativos da execução (carregado uma vez por itemtype, que
+    também reconhece o ativo pelo serial/IMEI ou inventário); só faz a busca
+    individual na API se o índice não pôde ser carregado.
+
+    Args:
+        client: GLPIClient da sessão ativa
+        asset_type: Tipo do ativo (Line, Phone, Computer)
+        payload: Dados do ativo
+
+    Returns:
+        int: ID do ativo encontrado
+        None: Se o ativo não existe
+    """
+    index = get_asset_index()
+    index.load(client, asset_type)
+    if index.is_loaded(asset_type):
+        return index.get(asset_type, payload)
+    return search_asset(client, asset_type, payload)
+
+def search_asset(client, asset_type, payload):
+    """
+    Busca o ativo direto na API, sem consultar o índice
+    Usada depois de um POST sem resposta conclusiva: o ativo pode ter sido
+    gravado no GLPI sem que o índice da execução saiba disso.
+
+    Returns:
+        int: ID do ativo encontrado (também registrado no índice)
+        None: Se o ativo não existe
+
+    Raises:
+        requests.RequestException: Se a busca falhar
+    """
+    index = get_asset_index()
+    users_id = payload.get("users_id", 0)
+    search_params = {
+        "criteria[0][field]": 1,
+        "criteria[0][searchtype]": "equals",
+        "criteria[0][value]": payload.get("name")
+    }
+
+    # Adiciona critério de usuário para Lines
+    if asset_type == "Line":
+        search_params.update({
+            "criteria[1][link]": "AND",
+            "criteria[1][field]": 70,
+            "criteria[1][searchtype]": "equals",
+            "criteria[1][value]": users_id
+        })
+
+    resp = client.get(f"search/{asset_type}", params=search_params).json()
+    if resp.get("totalcount", 0) > 0:
+        asset_id = _parse_item_id(resp["data"][0])
+        if asset_id > 0:
+            index.add(asset_type, payload, asset_id)
+            return asset_id
+        print(c(f"⚠️ ID inválido encontrado para {asset_type}, criando novo...", 'yellow'))
+    return None
+
+def update_asset(client, asset_type, asset_id, payload):
+    """
+    Atualiza um ativo existente com os dados da planilha
+    Compara o payload com os valores atuais (do índice de ativos ou de um GET)
+    e envia só os campos alterados; se nada mudou, não faz o PUT.
+    O índice só passa a ter os novos valores se a API aceitar a atualização.
+
+    Raises:
+        RuntimeError: Se a API recusar a atualização (a linha fica com ERRO)
+    """
+    index = get_asset_index()
+    if not UPDATE_ONLY_CHANGED:
+        put_item(client, asset_type, asset_id, payload)
+        index.add(asset_type, payload, asset_id)
+        print(c(f"✅ {asset_type} atualizado", 'green'))
+        return
+
+    changes = update_changed(client, asset_type, asset_id, payload,
+                             current=index.current(asset_type, asset_id, payload))
+    index.add(asset_type, payload, asset_id)
+    if changes:
+        print(c(f"✅ {asset_type} atualizado ({', '.join(changes)})", 'green'))
+    else:
+        print(c(f"✅ {asset_type} sem alterações", 'green'))
+
+def post_asset(client, asset_type, payload):
+    """
+    Cria um único ativo (sem buscar antes)
+    Em falhas transitórias (5xx, 429, conexão) verifica se o ativo chegou a ser
+    criado antes de reenviar o POST, com espera conforme a política de novas tentativas.
+
+    Returns:
+        tuple: (asset_id, error_message)
+    """
+    policy = client.retry_policy
+    attempt = 1
+    while True:
+        r = None
+        try:
+            r = client.post(asset_type, json={"input": payload})
+            try:
+                asset_id = _parse_created_id(r.json())
+            except ValueError:
                 asset_id = None
-                for item in (data_item if isinstance(data_item, list) else [data_item]):
-                    if isinstance(item, (int, str)) and str(item).isdigit():
-                        asset_id = int(item)
-                        break
-                if not asset_id:
-                    asset_id = 0
-            
-            if asset_id > 0:
-                requests.put(f"{GLPI_URL}/{asset_type}/{asset_id}", headers=headers, json={"input": payload})
-                print(c(f"✅ {asset_type} atualizado", 'green'))
-                return asset_id, None
-            else:
-                print(c(f"⚠️ ID inválido encontrado para {asset_type}, criando novo...", 'yellow'))
-                # Continua para criação
-        
-        # Se não encontrou ou ID inválido, cria novo
-        r = requests.post(f"{GLPI_URL}/{asset_type}", headers=headers, json={"input": payload})
-
-        # verifica criação
-        re_try = 3
-        while re_try > 0:
-            print(c(f"⏳ Verificando criação de {asset_type}, tentativa {4 - re_try}/3...", 'yellow'))
-            response_data = r.json()
-            
-            # Verifica se a resposta é um dicionário ou lista
-            asset_id = None
-            if isinstance(response_data, dict):
-                asset_id = response_data.get("id")
-            elif isinstance(response_data, list) and len(response_data) > 0:
-                # Se for lista, verifica se o primeiro item tem ID
-                first_item = response_data[0]
-                if isinstance(first_item, dict):
-                    asset_id = first_item.get("id")
-                elif len(response_data) >= 3:
-                    # Se tem pelo menos 3 itens, o ID geralmente está na posição 2 (índice 2)
-                    third_item = response_data[2]
-                    if isinstance(third_item, (int, str)) and str(third_item).isdigit():
-                        asset_id = int(third_item)
-                elif isinstance(first_item, (int, str)) and str(first_item).isdigit():
-                    asset_id = int(first_item)
-            
             if asset_id:
+                get_asset_index().add(asset_type, payload, asset_id)
                 print(c(f"✅ {asset_type} criado", 'green'))
                 return asset_id, None
-            re_try -= 1
-            sleep(1)
-
-                
-        return None, "Falha na criação após tentativas"
-        
-    except Exception as e:
-        if "Duplicate entry" in str(e) or "already exists" in str(e):
-            print(c(f"✅ {asset_type} processado", 'green'))
-            return True, None
-            
-        print(c(f"❌ Erro ao processar {asset_type}", 'red'))
-        return None, f"Erro: {str(e)}"
+            error = f"Falha na criação (Status: {r.status_code})"
+            transient = policy.is_transient(r)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = f"Erro: {str(e)}"
+            transient = True
+
+        delay = policy.backoff(attempt, r) if transient else None
+        if delay is None:
+            return None, error
+
+        print(c(f"⏳ Falha transitória ao criar {asset_type}, nova tentativa em {delay:.1f}s...", 'yellow'))
+        sleep(delay)
+        attempt += 1
+
+        # O POST anterior pode ter sido gravado mesmo sem resposta: verifica na API antes de reenviar
+        asset_id = search_asset(client, asset_type, payload)
+        if asset_id:
+            print(c(f"✅ {asset_type} criado", 'green'))
+            return asset_id, None
+
+def create_asset(client, asset_type, payload):
+    """
+    Cria ou atualiza um ativo (Line, Phone, Computer) vinculado à entidade e usuário.
+    Retorna uma tupla (asset_id, error_message, created), onde created indica
+    que o ativo foi criado agora (e não atualizado).
+    """
+    print(c(f"💻 Processando {asset_type}...", 'yellow'))
+    search_value = payload.get("name")
+
+    with get_dropdown_cache().lock_for(asset_type, search_value):
+        try:
+            # Primeiro verifica se o ativo já existe; se encontrou, atualiza
+            asset_id = find_asset(client, asset_type, payload)
+            if asset_id:
+                update_asset(client, asset_type, asset_id, payload)
+                return asset_id, None, False
+
+            # Se não encontrou ou ID inválido, cria novo
+            asset_id, error = post_asset(client, asset_type, payload)
+            return asset_id, error, bool(asset_id)
+
+        except Exception as e:
+            if "Duplicate entry" in str(e) or "already exists" in str(e):
+                print(c(f"✅ {asset_type} processado", 'green'))
+                return True, None, False
+
+            print(c(f"❌ Erro ao processar {asset_type}", 'red'))
+            return None, f"Erro: {str(e)}", False
@@ -1,55 +1,67 @@
 
 from create_info.get_or_create import get_or_create
-import requests
-from helper.read_config import GLPI_URL, APP_TOKEN, USER_TOKEN, HEADERS
+from create_info.glpi_objects.entity_cache import get_entity_cache
 from helper.colors import c
 
 
-def create_entity_hierarchy(session_token, entidade_a, entidade_b=None, entidade_c=None, entidade_d=None, comment=None):
+def create_entity_hierarchy(client, entidade_a, entidade_b=None, entidade_c=None, entidade_d=None, comment=None):
     """
     Cria entidades em cascata (até 4 níveis) e retorna o ID da entidade mais profunda criada.
+    Caminhos já conhecidos são resolvidos pelo cache de entidades, sem chamadas à API.
     """
-    print(c("🏢 Criando hierarquia de entidades", 'yellow'))
-
-    eid_a = get_or_create(session_token, "Entity", "name", entidade_a)
-    if eid_a is None:
-        print(c(f"❌ Falha ao criar/encontrar '{entidade_a}'", 'red'))
-        return None
-    
-    eid_b = None
-    if entidade_b:
-        eid_b = get_or_create(session_token, "Entity", "name", entidade_b, {"entities_id": eid_a})
-        if not eid_b:
-            print(c(f"❌ Falha ao criar/encontrar '{entidade_b}'", 'red'))
-            return eid_a
-    
-    eid_c = None
-    if entidade_c:
-        eid_c = get_or_create(session_token, "Entity", "name", entidade_c, {"entities_id": eid_b})
-        if not eid_c:
-            print(c(f"❌ Falha ao criar/encontrar '{entidade_c}'", 'red'))
-            return eid_b if eid_b is not None else eid_a
-        
-    eid_d = None
-    if entidade_d:
-        eid_d = get_or_create(session_token, "Entity", "name", entidade_d, {"entities_id": eid_c})
-        if not eid_d:
-            print(c(f"❌ Falha ao criar/encontrar '{entidade_d}'", 'red'))
-            return eid_c if eid_c is not None else (eid_b if eid_b is not None else eid_a)
+    cache = get_entity_cache()
+    cache.load(client)
+
+    final_entity_id = cache.get(entidade_a, entidade_b, entidade_c, entidade_d)
+    if final_entity_id is None:
+        print(c("🏢 Criando hierarquia de entidades", 'yellow'))
+        final_entity_id = _resolve_levels(client, cache, [entidade_a, entidade_b, entidade_c, entidade_d])
 
     # Adiciona o comentário à última entidade criada
-    final_entity_id = eid_d or eid_c or eid_b or eid_a
-    
     if comment and final_entity_id:
-        comment_data = {"input": {"comment": comment}}
-        response = requests.put(
-            f"{GLPI_URL}/Entity/{final_entity_id}",
-            headers={**HEADERS, "Session-Token": session_token},
-            json=comment_data
-        )
-        if not response.status_code == 200:
-            print(c(f"⚠️ Não foi possível adicionar o comentário à entidade - Status: {response.status_code}", 'yellow'))
-            print(c(f"⚠️ Resposta: {response.text}", 'yellow'))
+        update_entity_comment(client, final_entity_id, comment)
 
     return final_entity_id
 
+
+def _resolve_levels(client, cache, names):
+    """
+    Resolve nível a nível o caminho, consultando o cache antes de buscar/criar.
+    Em caso de falha retorna o ID do último nível resolvido.
+    """
+    parent_id = None
+    for level, name in enumerate(names):
+        if level and not name:
+            continue
+
+        entity_id = cache.get(*names[:level + 1])
+        if entity_id is None:
+            payload_extra = {"entities_id": parent_id} if level else None
+            entity_id = get_or_create(client, "Entity", "name", name, payload_extra)
+            if not entity_id:
+                print(c(f"❌ Falha ao criar/encontrar '{name}'", 'red'))
+                return parent_id
+            cache.add(names[:level + 1], entity_id)
+        parent_id = entity_id
+
+    return parent_id
+
+
+def update_entity_comment(client, entity_id, comment):
+    """
+    Atualiza o comentário de uma entidade.
+    Não faz nada se o comentário atual já é o informado.
+    Retorna True se a atualização foi aceita pela API (ou não era necessária).
+    """
+    cache = get_entity_cache()
+    if cache.comment_matches(entity_id, comment):
+        return True
+
+    comment_data = {"input": {"comment": comment}}
+    response = client.put(f"Entity/{entity_id}", json=comment_data)
+    if not response.status_code == 200:
+        print(c(f"⚠️ Não foi possível adicionar o comentário à entidade - Status: {response.status_code}", 'yellow'))
+        print(c(f"⚠️ Resposta: {response.text}", 'yellow'))
+        return False
+    cache.set_comment(entity_id, comment)
+    return True
@@ -3,7 +3,24 @@ from .glpi_objects import (
     get_or_create_manufacturer,
     get_or_create_model,
     get_or_create,
-    link_component
+    create_many,
+    update_changed,
+    BatchCreator,
+    link_component,
+    get_or_create_device,
+    ComponentLinkWriter,
+    get_dropdown_cache,
+    reset_dropdown_cache,
+    get_entity_cache,
+    reset_entity_cache,
+    get_user_index,
+    reset_user_index,
+    get_contract_index,
+    reset_contract_index,
+    get_component_index,
+    reset_component_index,
+    get_asset_index,
+    reset_asset_index
 )
 
 __all__ = [
@@ -11,6 +28,23 @@ __all__ = [
     'get_or_create_manufacturer',
     'get_or_create_model',
     'get_or_create',
-    'link_component'
+    'create_many',
+    'update_changed',
+    'BatchCreator',
+    'link_component',
+    'get_or_create_device',
+    'ComponentLinkWriter',
+    'get_dropdown_cache',
+    'reset_dropdown_cache',
+    'get_entity_cache',
+    'reset_entity_cache',
+    'get_user_index',
+    'reset_user_index',
+    'get_contract_index',
+    'reset_contract_index',
+    'get_component_index',
+    'reset_component_index',
+    'get_asset_index',
+    'reset_asset_index'
 ]
 
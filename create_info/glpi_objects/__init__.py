@@ -1,13 +1,36 @@
 from .phone_model import get_or_create_phone_model
 from .manufacturer import get_or_create_manufacturer
 from .model import get_or_create_model
-from .generic_operations import get_or_create
-from .component import link_component
+from .generic_operations import get_or_create, create_many, update_changed, BatchCreator
+from .component import link_component, get_or_create_device, ComponentLinkWriter
+from .dropdown_cache import get_dropdown_cache, reset_dropdown_cache
+from .entity_cache import get_entity_cache, reset_entity_cache
+from .user_index import get_user_index, reset_user_index
+from .contract_index import get_contract_index, reset_contract_index
+from .component_index import get_component_index, reset_component_index
+from .asset_index import get_asset_index, reset_asset_index
 
 __all__ = [
     'get_or_create_phone_model',
     'get_or_create_manufacturer',
     'get_or_create_model',
     'get_or_create',
-    'link_component'
+    'create_many',
+    'update_changed',
+    'BatchCreator',
+    'link_component',
+    'get_or_create_device',
+    'ComponentLinkWriter',
+    'get_dropdown_cache',
+    'reset_dropdown_cache',
+    'get_entity_cache',
+    'reset_entity_cache',
+    'get_user_index',
+    'reset_user_index',
+    'get_contract_index',
+    'reset_contract_index',
+    'get_component_index',
+    'reset_component_index',
+    'get_asset_index',
+    'reset_asset_index'
 ]
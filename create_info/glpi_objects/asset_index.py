@@ -0,0 +1,180 @@
+import threading
+from helper.colors import c
+from .dropdown_cache import DropdownCache
+from glpi_session.pagination import iter_items
+
+# Campos da busca de ativos (search options do GLPI)
+ASSET_FIELD_NAME = 1
+ASSET_FIELD_ID = 2
+ASSET_FIELD_SERIAL = 5
+ASSET_FIELD_OTHERSERIAL = 6
+
+# Chaves naturais de cada itemtype além do nome (serial = IMEI nos celulares)
+NATURAL_KEYS = {
+    "Computer": ("serial", "otherserial"),
+    "Phone": ("serial",),
+    "Line": (),
+}
+
+
+def _normalize(value):
+    if value is None:
+        return None
+    text = DropdownCache.normalize(value)
+    return text or None
+
+
+class AssetIndex:
+    """
+    Índice dos ativos (Computer, Phone, Line) do GLPI durante uma execução
+    Montado uma única vez por itemtype a partir da listagem paginada (só os
+    campos usados nas chaves) e atualizado a cada ativo criado, de modo que
+    verificar se um ativo existe é uma consulta em memória.
+    Chaves: nome (número da linha + usuário, no caso de Lines), serial/IMEI
+    e número de inventário (otherserial). Também guarda os valores conhecidos
+    de cada ativo, usados para comparar com a planilha antes de atualizar.
+    """
+
+    def __init__(self, page_size=None):
+        self.page_size = page_size
+        self._names = {}
+        self._keys = {}
+        self._items = {}
+        self._loaded = set()
+        self._lock = threading.RLock()
+
+    def is_loaded(self, itemtype):
+        """Indica se os ativos do itemtype já foram carregados"""
+        return itemtype in self._loaded
+
+    @staticmethod
+    def name_key(itemtype, payload):
+        """Chave do nome do ativo (Lines também pelo usuário, como na busca individual)"""
+        name = _normalize(payload.get("name"))
+        if not name:
+            return None
+        if itemtype == "Line":
+            return (name, int(payload.get("users_id") or 0))
+        return name
+
+    def _rows(self, client, itemtype):
+        if itemtype == "Line":
+            # Na busca o campo de usuário vem com o nome exibido; a listagem traz o users_id
+            return iter_items(client, "Line", page_size=self.page_size)
+        params = {
+            "forcedisplay[0]": ASSET_FIELD_ID,
+            "forcedisplay[1]": ASSET_FIELD_NAME,
+            "forcedisplay[2]": ASSET_FIELD_SERIAL,
+        }
+        if "otherserial" in NATURAL_KEYS.get(itemtype, ()):
+            params["forcedisplay[3]"] = ASSET_FIELD_OTHERSERIAL
+        return ({
+            "id": row.get(str(ASSET_FIELD_ID)) or row.get("id"),
+            "name": row.get(str(ASSET_FIELD_NAME)),
+            "serial": row.get(str(ASSET_FIELD_SERIAL)),
+            "otherserial": row.get(str(ASSET_FIELD_OTHERSERIAL)),
+        } for row in iter_items(client, f"search/{itemtype}", params, page_size=self.page_size)
+            if isinstance(row, dict))
+
+    def load(self, client, itemtype):
+        """
+        Carrega (paginado) os ativos do itemtype no índice
+
+        Args:
+            client: GLPIClient da sessão ativa
+            itemtype (str): Computer, Phone ou Line
+        """
+        with self._lock:
+            if itemtype in self._loaded:
+                return
+            names = self._names.setdefault(itemtype, {})
+            keys = self._keys.setdefault(itemtype, {})
+            items = self._items.setdefault(itemtype, {})
+            try:
+                for item in self._rows(client, itemtype):
+                    if not item.get("id"):
+                        continue
+                    item_id = int(item["id"])
+                    items[item_id] = item
+                    key = self.name_key(itemtype, item)
+                    if key:
+                        names.setdefault(key, item_id)
+                    for field in NATURAL_KEYS.get(itemtype, ()):
+                        value = _normalize(item.get(field))
+                        if value:
+                            keys.setdefault((field, value), item_id)
+            except Exception as e:
+                print(c(f"⚠️ Não foi possível carregar o índice de {itemtype}: {e}", 'yellow'))
+                return
+            self._loaded.add(itemtype)
+            print(c(f"🗂️ {len(names)} {itemtype}(s) carregado(s) no índice", 'cyan'))
+
+    def get(self, itemtype, payload):
+        """
+        Retorna o ID do ativo pelo nome ou, se não houver, pelo serial/IMEI ou inventário
+
+        Returns:
+            int: ID do ativo
+            None: Se o ativo não está no índice
+        """
+        key = self.name_key(itemtype, payload)
+        item_id = self._names.get(itemtype, {}).get(key) if key else None
+        if item_id:
+            return item_id
+        keys = self._keys.get(itemtype, {})
+        for field in NATURAL_KEYS.get(itemtype, ()):
+            value = _normalize(payload.get(field))
+            if value and (field, value) in keys:
+                return keys[(field, value)]
+        return None
+
+    def current(self, itemtype, item_id, fields):
+        """
+        Valores conhecidos do ativo, se cobrirem todos os campos informados
+
+        Returns:
+            dict: Valores atuais do ativo
+            None: Se algum campo não é conhecido (é preciso buscar o ativo na API)
+        """
+        item = self._items.get(itemtype, {}).get(int(item_id))
+        if item is None or any(field not in item for field in fields):
+            return None
+        return item
+
+    def add(self, itemtype, payload, item_id):
+        """Registra um ativo encontrado, criado ou atualizado durante a execução"""
+        if not item_id or item_id is True:
+            return
+        with self._lock:
+            self._items.setdefault(itemtype, {}).setdefault(int(item_id), {}).update(payload)
+            key = self.name_key(itemtype, payload)
+            if key:
+                self._names.setdefault(itemtype, {})[key] = int(item_id)
+            for field in NATURAL_KEYS.get(itemtype, ()):
+                value = _normalize(payload.get(field))
+                if value:
+                    self._keys.setdefault(itemtype, {})[(field, value)] = int(item_id)
+
+
+# Instância global do índice (válida durante a execução)
+_global_asset_index = None
+_global_asset_index_lock = threading.Lock()
+
+def get_asset_index():
+    """
+    Função para obter a instância global do índice de ativos
+
+    Returns:
+        AssetIndex: Instância do índice
+    """
+    global _global_asset_index
+    with _global_asset_index_lock:
+        if _global_asset_index is None:
+            _global_asset_index = AssetIndex()
+        return _global_asset_index
+
+def reset_asset_index():
+    """Descarta o índice global (ex: no início de uma nova execução)"""
+    global _global_asset_index
+    with _global_asset_index_lock:
+        _global_asset_index = None
@@ -1,174 +1,172 @@
-from helper.read_config import HEADERS, GLPI_URL
-import requests
 from helper.colors import c
-from time import sleep
-
-def link_component(computer_id, nb_armazenamento, nb_processador, nb_memoria, session):
-    
-    headers = {**HEADERS, "Session-Token": session}
-        
-    # Processa armazenamento (HDD/SSD)
-    if nb_armazenamento and str(nb_armazenamento).strip():
+from .dropdown_cache import get_dropdown_cache
+from .generic_operations import BatchCreator
+from .component_index import get_component_index
+
+# Tipo de componente -> (campo de vínculo no Item_Device*, descrição usada nas mensagens, comentário de criação)
+DEVICE_TYPES = {
+    "DeviceHardDrive": ("deviceharddrives_id", "HD", "Criado automaticamente"),
+    "DeviceProcessor": ("deviceprocessors_id", "processador", "Criado automaticamente"),
+    "DeviceMemory": ("devicememories_id", "memória", "Criada automaticamente"),
+}
+
+def get_or_create_device(client, device_type, device_name):
+    """
+    Busca ou cria um componente (DeviceHardDrive, DeviceProcessor ou DeviceMemory) no GLPI.
+
+    Args:
+        client: GLPIClient da sessão ativa
+        device_type: Tipo do componente (chave de DEVICE_TYPES)
+        device_name: Nome do componente (ex: "SSD 256GB", "Intel i5", "8GB")
+
+    Returns:
+        int: ID do componente encontrado ou criado
+        None: Se não foi possível encontrar ou criar o componente
+    """
+    device_name = str(device_name).strip()
+    _, label, creation_comment = DEVICE_TYPES[device_type]
+
+    cache = get_dropdown_cache()
+    with cache.lock_for(device_type, device_name):
         try:
-            hd_name = str(nb_armazenamento).strip()
-            
-            # Primeiro procura se já existe
+            # Primeiro consulta o cache da execução (lista completa baixada uma única vez)
+            device_id = cache.get(client, device_type, device_name)
+            if device_id:
+                return device_id
+
+            # Se não encontrou, procura via busca
             search_params = {
                 "criteria[0][field]": 1,  # campo 1 = name
                 "criteria[0][searchtype]": "equals",
-                "criteria[0][value]": hd_name,
+                "criteria[0][value]": device_name,
                 "reset": "reset"
             }
-            search_response = requests.get(f"{GLPI_URL}/search/DeviceHardDrive", 
-                                        headers=headers, 
-                                        params=search_params)
-            
-            hd_id = None
+            search_response = client.get(f"search/{device_type}", params=search_params)
+
             if search_response.status_code == 200:
                 result = search_response.json()
                 if result.get("totalcount", 0) > 0:
-                    hd_id = int(result["data"][0].get("2", 0))
-            
+                    device_id = int(result["data"][0].get("2", 0))
+                    if device_id:
+                        print(c(f"✅ Componente {label} '{device_name}' encontrado (ID: {device_id})", 'green'))
+                        cache.add(device_type, device_name, device_id)
+                        return device_id
+
             # Se não encontrou, cria
-            if not hd_id:
-                hd_data = {
-                    "name": hd_name,
-                    "designation": hd_name,
-                    "comment": "Criado automaticamente",
-                    "entities_id": 0,
-                    "is_recursive": 1
-                }
-                hd_response = requests.post(f"{GLPI_URL}/DeviceHardDrive", 
-                                            headers=headers, 
-                                            json={"input": hd_data})
-                
-                if hd_response.status_code == 201:
-                    hd_id = hd_response.json().get("id")
-            
-            # Vincula ao computador se tiver ID
-            if hd_id:
-                link_data = {
-                    "items_id": computer_id,
-                    "itemtype": "Computer",
-                    "deviceharddrives_id": hd_id
-                }
-                link_response = requests.post(f"{GLPI_URL}/Item_DeviceHardDrive", 
-                            headers=headers, 
-                            json={"input": link_data})
-                
-                if not link_response.status_code in [200, 201]:
-                    print(c(f"❌ Erro ao vincular HD: {link_response.text}", 'red'))
-        except Exception as e:
-            print(c(f"❌ Erro ao processar HD: {str(e)}", 'red'))
-    
-    # Processa processador
-    if nb_processador and str(nb_processador).strip():
-        try:
-            cpu_name = str(nb_processador).strip()
-            
-            # Primeiro procura se já existe
-            search_params = {
-                "criteria[0][field]": 1,  # campo 1 = name
-                "criteria[0][searchtype]": "equals",
-                "criteria[0][value]": cpu_name,
-                "reset": "reset"
+            device_data = {
+                "name": device_name,
+                "designation": device_name,
+                "comment": creation_comment,
+                "entities_id": 0,
+                "is_recursive": 1
             }
-            search_response = requests.get(f"{GLPI_URL}/search/DeviceProcessor", 
-                                        headers=headers, 
-                                        params=search_params)
-            
-            cpu_id = None
-            if search_response.status_code == 200:
-                result = search_response.json()
-                if result.get("totalcount", 0) > 0:
-                    cpu_id = int(result["data"][0].get("2", 0))
-                    print(c(f"✅ Processador '{cpu_name}' encontrado (ID: {cpu_id})", 'green'))
-            
-            # Se não encontrou, cria
-            if not cpu_id:
-                cpu_data = {
-                    "name": cpu_name,
-                    "designation": cpu_name,
-                    "comment": "Criado automaticamente",
-                    "entities_id": 0,
-                    "is_recursive": 1
-                }
-                cpu_response = requests.post(f"{GLPI_URL}/DeviceProcessor", 
-                                            headers=headers, 
-                                            json={"input": cpu_data})
-                
-                if cpu_response.status_code == 201:
-                    cpu_id = cpu_response.json().get("id")
-            
-            # Vincula ao computador se tiver ID
-            if cpu_id:
-                link_data = {
-                    "items_id": computer_id,
-                    "itemtype": "Computer",
-                    "deviceprocessors_id": cpu_id
-                }
-                link_response = requests.post(f"{GLPI_URL}/Item_DeviceProcessor", 
-                            headers=headers, 
-                            json={"input": link_data})
-                
-                if not link_response.status_code in [200, 201]:
-                    print(c(f"❌ Erro ao vincular processador: {link_response.text}", 'red'))
+            create_response = client.post(device_type, json={"input": device_data})
+
+            if create_response.status_code == 201:
+                device_id = create_response.json().get("id")
+                cache.add(device_type, device_name, device_id)
+                return device_id
+
+            print(c(f"❌ Erro ao criar {label} '{device_name}': {create_response.text}", 'red'))
+            return None
         except Exception as e:
-            print(c(f"❌ Erro ao processar processador: {str(e)}", 'red'))
-    
-    # Processa memória RAM
-    if nb_memoria and str(nb_memoria).strip():
+            print(c(f"❌ Erro ao processar {label}: {str(e)}", 'red'))
+            return None
+
+def component_links(computer_id, nb_armazenamento, nb_processador, nb_memoria, client, device_ids=None):
+    """
+    Monta os vínculos Item_Device* de armazenamento, processador e memória RAM de um computador.
+
+    Args:
+        computer_id: ID do computador
+        nb_armazenamento: Armazenamento (ex: "SSD 256GB")
+        nb_processador: Processador (ex: "Intel i5")
+        nb_memoria: Memória RAM (ex: "8GB")
+        client: GLPIClient da sessão ativa
+        device_ids: IDs já resolvidos {(device_type, nome): id} (opcional, ex: fase de planejamento)
+
+    Returns:
+        list: Tuplas (itemtype do vínculo, dados do vínculo)
+    """
+    device_ids = device_ids or {}
+    components = [
+        ("DeviceHardDrive", nb_armazenamento),
+        ("DeviceProcessor", nb_processador),
+        ("DeviceMemory", nb_memoria),
+    ]
+
+    links = []
+    for device_type, value in components:
+        if not value or not str(value).strip():
+            continue
+
+        device_name = str(value).strip()
+        field, label, _ = DEVICE_TYPES[device_type]
+
+        device_id = device_ids.get((device_type, device_name)) or get_or_create_device(client, device_type, device_name)
+        if not device_id:
+            continue
+
+        link_data = {
+            "items_id": computer_id,
+            "itemtype": "Computer",
+            field: device_id
+        }
+        if device_type == "DeviceMemory":
+            link_data["size"] = device_name.replace("GB", "").strip()
+        links.append((f"Item_{device_type}", link_data))
+    return links
+
+def link_component(computer_id, nb_armazenamento, nb_processador, nb_memoria, client, device_ids=None, links=None,
+                   track=None, is_new=False):
+    """
+    Vincula armazenamento, processador e memória RAM a um computador.
+    Para computadores que já existiam, os vínculos já presentes no GLPI são pulados.
+
+    Args:
+        computer_id: ID do computador
+        nb_armazenamento: Armazenamento (ex: "SSD 256GB")
+        nb_processador: Processador (ex: "Intel i5")
+        nb_memoria: Memória RAM (ex: "8GB")
+        client: GLPIClient da sessão ativa
+        device_ids: IDs já resolvidos {(device_type, nome): id} (opcional, ex: fase de planejamento)
+        links: ComponentLinkWriter que envia os vínculos em lote (opcional; sem ele, envio imediato)
+        track: Função chamada antes de enfileirar cada vínculo; devolve o callback(ok)
+               executado após o envio (opcional, ex: journal da execução)
+        is_new: Computador acabou de ser criado (não tem vínculos; pula a verificação)
+    """
+    index = get_component_index()
+    for itemtype, link_data in component_links(computer_id, nb_armazenamento, nb_processador, nb_memoria,
+                                                client, device_ids):
+        field = DEVICE_TYPES[itemtype[len("Item_"):]][0]
+        device_id = link_data[field]
+        if not is_new:
+            index.load(client, itemtype, field)
+            if index.has(itemtype, computer_id, device_id):
+                continue
+        # Registra antes do envio para que o mesmo vínculo não seja enfileirado de novo na execução
+        index.add(itemtype, computer_id, device_id)
+        if links:
+            links.add(itemtype, link_data, track() if track else None)
+            continue
         try:
-            ram_name = str(nb_memoria).strip()
-            
-            # Primeiro procura se já existe
-            search_params = {
-                "criteria[0][field]": 1,  # campo 1 = name
-                "criteria[0][searchtype]": "equals",
-                "criteria[0][value]": ram_name,
-                "reset": "reset"
-            }
-            search_response = requests.get(f"{GLPI_URL}/search/DeviceMemory", 
-                                        headers=headers, 
-                                        params=search_params)
-            
-            ram_id = None
-            if search_response.status_code == 200:
-                result = search_response.json()
-                if result.get("totalcount", 0) > 0:
-                    ram_id = int(result["data"][0].get("2", 0))
-            
-            # Se não encontrou, cria
-            if not ram_id:
-                ram_data = {
-                    "name": ram_name,
-                    "designation": ram_name,
-                    "comment": "Criada automaticamente",
-                    "entities_id": 0,
-                    "is_recursive": 1
-                }
-                ram_response = requests.post(f"{GLPI_URL}/DeviceMemory", 
-                                            headers=headers, 
-                                            json={"input": ram_data})
-                
-                if ram_response.status_code == 201:
-                    ram_id = ram_response.json().get("id")
-            
-            # Vincula ao computador se tiver ID
-            if ram_id:
-                link_data = {
-                    "items_id": computer_id,
-                    "itemtype": "Computer",
-                    "devicememories_id": ram_id,
-                    "size": str(ram_name).replace("GB", "").strip()
-                }
-                link_response = requests.post(f"{GLPI_URL}/Item_DeviceMemory", 
-                            headers=headers, 
-                            json={"input": link_data})
-                
-                if not link_response.status_code in [200, 201]:
-                    print(c(f"❌ Erro ao vincular memória: {link_response.text}", 'red'))
+            link_response = client.post(itemtype, json={"input": link_data})
+            if not link_response.status_code in [200, 201]:
+                print(c(f"❌ Erro ao vincular {itemtype}: {link_response.text}", 'red'))
         except Exception as e:
-            print(c(f"❌ Erro ao processar memória: {str(e)}", 'red'))
-    
-  
\ No newline at end of file
+            print(c(f"❌ Erro ao vincular {itemtype}: {str(e)}", 'red'))
+
+
+class ComponentLinkWriter(BatchCreator):
+    """
+    Classe para enviar os vínculos Item_Device* em lote
+    Os vínculos de vários computadores ficam em uma fila por itemtype e são
+    criados com um único POST {"input": [...]} por tipo.
+    """
+
+    def describe(self, itemtype, count):
+        return f"📦 Vinculando {count} componente(s) {itemtype} em lote..."
+
+    def identity(self, itemtype, data):
+        # Um vínculo é o par computador/componente (o tamanho da memória não o identifica)
+        return ("itemtype", "items_id", DEVICE_TYPES[itemtype[len("Item_"):]][0])
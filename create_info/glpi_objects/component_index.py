@@ -0,0 +1,78 @@
+import threading
+from helper.colors import c
+from glpi_session.pagination import iter_items
+
+
+class ComponentLinkIndex:
+    """
+    Índice dos vínculos de componentes (Item_Device*) do GLPI durante uma execução
+    Guarda os pares (computador, componente) de cada Item_Device*, baixados uma
+    única vez por itemtype e atualizados a cada vínculo criado, para que rodar de
+    novo uma linha (--resume, --incremental) não vincule o mesmo componente duas
+    vezes ao computador.
+    """
+
+    def __init__(self, page_size=None):
+        self.page_size = page_size
+        self._links = set()
+        self._loaded = set()
+        self._lock = threading.RLock()
+
+    def is_loaded(self, itemtype):
+        """Indica se os vínculos do itemtype (ex: Item_DeviceMemory) já foram carregados"""
+        return itemtype in self._loaded
+
+    def load(self, client, itemtype, field):
+        """
+        Baixa (paginado) os vínculos de um Item_Device*
+
+        Args:
+            client: GLPIClient da sessão ativa
+            itemtype (str): Item_DeviceHardDrive, Item_DeviceProcessor ou Item_DeviceMemory
+            field (str): Campo do componente no vínculo (ex: devicememories_id)
+        """
+        with self._lock:
+            if itemtype in self._loaded:
+                return
+            try:
+                for link in iter_items(client, itemtype, page_size=self.page_size):
+                    if not isinstance(link, dict) or link.get("itemtype", "Computer") != "Computer":
+                        continue
+                    if link.get("items_id") and link.get(field):
+                        self._links.add((itemtype, int(link["items_id"]), int(link[field])))
+            except Exception as e:
+                print(c(f"⚠️ Não foi possível carregar os vínculos {itemtype}: {e}", 'yellow'))
+                return
+            self._loaded.add(itemtype)
+
+    def has(self, itemtype, computer_id, device_id):
+        return (itemtype, int(computer_id), int(device_id)) in self._links
+
+    def add(self, itemtype, computer_id, device_id):
+        """Registra um vínculo criado durante a execução"""
+        with self._lock:
+            self._links.add((itemtype, int(computer_id), int(device_id)))
+
+
+# Instância global do índice (válida durante a execução)
+_global_component_index = None
+_global_component_index_lock = threading.Lock()
+
+def get_component_index():
+    """
+    Função para obter a instância global do índice de vínculos de componentes
+
+    Returns:
+        ComponentLinkIndex: Instância do índice
+    """
+    global _global_component_index
+    with _global_component_index_lock:
+        if _global_component_index is None:
+            _global_component_index = ComponentLinkIndex()
+        return _global_component_index
+
+def reset_component_index():
+    """Descarta o índice global (ex: no início de uma nova execução)"""
+    global _global_component_index
+    with _global_component_index_lock:
+        _global_component_index = None
@@ -0,0 +1,89 @@
+import threading
+from helper.colors import c
+from glpi_session.pagination import iter_items
+
+
+class ContractLinkIndex:
+    """
+    Índice dos vínculos de contratos do GLPI durante uma execução
+    Guarda os pares (contrato, fornecedor) de Contract_Supplier e os vínculos
+    (contrato, itemtype, item) de Contract_Item, baixados uma única vez e
+    atualizados a cada vínculo criado, para que verificar um vínculo seja uma
+    consulta em memória e nenhum vínculo seja enviado duas vezes.
+    Os contratos em si ficam no cache de dropdowns (índice nome -> ID).
+    """
+
+    def __init__(self, page_size=None):
+        self.page_size = page_size
+        self._suppliers = set()
+        self._items = set()
+        self._loaded = set()
+        self._lock = threading.RLock()
+
+    def is_loaded(self, itemtype):
+        """Indica se os vínculos do itemtype (Contract_Supplier ou Contract_Item) já foram carregados"""
+        return itemtype in self._loaded
+
+    def load(self, client, itemtype):
+        """
+        Baixa (paginado) os vínculos Contract_Supplier ou Contract_Item
+
+        Args:
+            client: GLPIClient da sessão ativa
+            itemtype (str): Contract_Supplier ou Contract_Item
+        """
+        with self._lock:
+            if itemtype in self._loaded:
+                return
+            try:
+                for link in iter_items(client, itemtype, page_size=self.page_size):
+                    if not isinstance(link, dict) or not link.get("contracts_id"):
+                        continue
+                    if itemtype == "Contract_Supplier":
+                        self._suppliers.add((int(link["contracts_id"]), int(link.get("suppliers_id") or 0)))
+                    else:
+                        self._items.add((int(link["contracts_id"]), link.get("itemtype"), int(link.get("items_id") or 0)))
+            except Exception as e:
+                print(c(f"⚠️ Não foi possível carregar os vínculos {itemtype}: {e}", 'yellow'))
+                return
+            self._loaded.add(itemtype)
+
+    def has_supplier(self, contract_id, supplier_id):
+        return (int(contract_id), int(supplier_id)) in self._suppliers
+
+    def add_supplier(self, contract_id, supplier_id):
+        """Registra um vínculo contrato/fornecedor criado durante a execução"""
+        with self._lock:
+            self._suppliers.add((int(contract_id), int(supplier_id)))
+
+    def has_item(self, contract_id, itemtype, item_id):
+        return (int(contract_id), itemtype, int(item_id)) in self._items
+
+    def add_item(self, contract_id, itemtype, item_id):
+        """Registra um vínculo contrato/ativo criado durante a execução"""
+        with self._lock:
+            self._items.add((int(contract_id), itemtype, int(item_id)))
+
+
+# Instância global do índice (válida durante a execução)
+_global_contract_index = None
+_global_contract_index_lock = threading.Lock()
+
+def get_contract_index():
+    """
+    Função para obter a instância global do índice de vínculos de contratos
+
+    Returns:
+        ContractLinkIndex: Instância do índice
+    """
+    global _global_contract_index
+    with _global_contract_index_lock:
+        if _global_contract_index is None:
+            _global_contract_index = ContractLinkIndex()
+        return _global_contract_index
+
+def reset_contract_index():
+    """Descarta o índice global (ex: no início de uma nova execução)"""
+    global _global_contract_index
+    with _global_contract_index_lock:
+        _global_contract_index = None
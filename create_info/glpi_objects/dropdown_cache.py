@@ -0,0 +1,116 @@
+import threading
+from helper.colors import c
+from glpi_session.pagination import iter_items
+
+
+class DropdownCache:
+    """
+    Cache dos dados de referência (dropdowns) do GLPI durante uma execução
+    Guarda, por itemtype, um índice nome normalizado -> ID. A lista completa de
+    cada itemtype é baixada uma única vez e o índice é atualizado sempre que um
+    item novo é encontrado via busca ou criado.
+    Também funciona como camada de resolução compartilhada entre workers:
+    lock_for() garante que um mesmo item não seja buscado/criado em paralelo.
+    """
+
+    def __init__(self):
+        self._items = {}
+        self._loaded = set()
+        self._locks = {}
+        self._registry_lock = threading.Lock()
+
+    @staticmethod
+    def normalize(name):
+        """Normaliza o nome para comparação (espaços colapsados, sem diferenciar maiúsculas)"""
+        return " ".join(str(name).split()).casefold()
+
+    def is_loaded(self, itemtype):
+        """Indica se a lista do itemtype já foi carregada"""
+        return itemtype in self._loaded
+
+    def lock_for(self, *key):
+        """
+        Retorna o lock exclusivo de uma chave de resolução
+
+        Args:
+            *key: Partes da chave (ex: "Manufacturer", "Dell"). Textos são normalizados.
+
+        Returns:
+            threading.RLock: Lock a ser usado em bloco with
+        """
+        key = tuple(self.normalize(part) if isinstance(part, str) else part for part in key)
+        with self._registry_lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.RLock()
+            return lock
+
+    def load(self, client, itemtype):
+        """
+        Baixa a lista do itemtype (todas as páginas) e preenche o índice
+
+        Args:
+            client: GLPIClient da sessão ativa
+            itemtype (str): Tipo do item (Manufacturer, Supplier, PhoneModel...)
+        """
+        index = self._items.setdefault(itemtype, {})
+        try:
+            for item in iter_items(client, itemtype):
+                if isinstance(item, dict) and item.get("name") and item.get("id"):
+                    index.setdefault(self.normalize(item["name"]), int(item["id"]))
+        except Exception as e:
+            # Só marca como carregado se todas as páginas foram lidas
+            print(c(f"⚠️ Não foi possível carregar a lista de {itemtype}: {e}", 'yellow'))
+            return
+        self._loaded.add(itemtype)
+
+    def get(self, client, itemtype, name):
+        """
+        Retorna o ID do item pelo nome, carregando a lista na primeira consulta
+
+        Returns:
+            int: ID do item
+            None: Se o item não está no cache
+        """
+        if not self.is_loaded(itemtype):
+            # Apenas um worker baixa a lista; os demais aguardam o resultado
+            with self.lock_for("__load__", itemtype):
+                if not self.is_loaded(itemtype):
+                    self.load(client, itemtype)
+        return self._items.get(itemtype, {}).get(self.normalize(name))
+
+    def add(self, itemtype, name, item_id):
+        """Registra um item encontrado ou criado durante a execução"""
+        if name and item_id:
+            self._items.setdefault(itemtype, {})[self.normalize(name)] = int(item_id)
+
+    def clear(self):
+        """Descarta todo o conteúdo do cache"""
+        self._items.clear()
+        self._loaded.clear()
+        with self._registry_lock:
+            self._locks.clear()
+
+
+# Instância global do cache (válida durante a execução)
+_global_cache = None
+_global_cache_lock = threading.Lock()
+
+def get_dropdown_cache():
+    """
+    Função para obter a instância global do cache de dropdowns
+
+    Returns:
+        DropdownCache: Instância do cache
+    """
+    global _global_cache
+    with _global_cache_lock:
+        if _global_cache is None:
+            _global_cache = DropdownCache()
+        return _global_cache
+
+def reset_dropdown_cache():
+    """Descarta o cache global (ex: no início de uma nova execução)"""
+    global _global_cache
+    with _global_cache_lock:
+        _global_cache = None
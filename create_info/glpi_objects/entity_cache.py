@@ -0,0 +1,145 @@
+import threading
+from helper.colors import c
+from .dropdown_cache import DropdownCache
+from .generic_operations import create_many, BatchOutcomeUnknown
+from glpi_session.pagination import iter_items
+
+# Separador usado pelo GLPI no completename das entidades ("Entidade raiz > A > B")
+COMPLETENAME_SEPARATOR = " > "
+
+
+class EntityPathCache:
+    """
+    Cache dos caminhos de entidade durante uma execução
+    Guarda o índice caminho (A, B, C, D) -> ID montado a partir do completename
+    de todas as entidades do GLPI (baixadas uma única vez, página a página) e o
+    comentário atual de cada entidade, para evitar PUTs que não mudam nada.
+    """
+
+    def __init__(self, page_size=None):
+        self.page_size = page_size
+        self._paths = {}
+        self._comments = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def path_key(*names):
+        """Normaliza um caminho de entidade, ignorando níveis vazios no final"""
+        names = [str(name).strip() if name is not None else "" for name in names]
+        while names and not names[-1]:
+            names.pop()
+        return tuple(DropdownCache.normalize(name) for name in names)
+
+    def load(self, client):
+        """
+        Baixa todas as entidades (paginado) e monta o índice de caminhos
+
+        Args:
+            client: GLPIClient da sessão ativa
+        """
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                for entity in iter_items(client, "Entity", page_size=self.page_size):
+                    if isinstance(entity, dict) and entity.get("completename") and entity.get("id") is not None:
+                        # O primeiro nível do completename é a entidade raiz
+                        segments = str(entity["completename"]).split(COMPLETENAME_SEPARATOR)[1:]
+                        self._paths[self.path_key(*segments)] = int(entity["id"])
+                        self._comments[int(entity["id"])] = entity.get("comment") or ""
+            except Exception as e:
+                print(c(f"⚠️ Não foi possível carregar a lista de entidades: {e}", 'yellow'))
+                return
+
+            self._loaded = True
+            print(c(f"🏢 {len(self._paths)} caminho(s) de entidade carregado(s)", 'cyan'))
+
+    def get(self, *names):
+        """Retorna o ID da entidade do caminho (None se não está no cache)"""
+        key = self.path_key(*names)
+        return self._paths.get(key) if key else None
+
+    def add(self, names, entity_id, comment=None):
+        """Registra uma entidade encontrada ou criada durante a execução"""
+        key = self.path_key(*names)
+        if key and entity_id:
+            with self._lock:
+                self._paths[key] = int(entity_id)
+                self._comments.setdefault(int(entity_id), comment or "")
+
+    def comment_matches(self, entity_id, comment):
+        """Indica se o comentário guardado da entidade já é o informado"""
+        stored = self._comments.get(int(entity_id))
+        return stored is not None and str(stored).strip() == str(comment).strip()
+
+    def set_comment(self, entity_id, comment):
+        with self._lock:
+            self._comments[int(entity_id)] = str(comment)
+
+    def create_missing(self, client, paths):
+        """
+        Cria, nível a nível, as entidades que ainda não existem
+        Todas as entidades faltantes de um mesmo nível são criadas em um único POST.
+
+        Args:
+            client: GLPIClient da sessão ativa
+            paths: Iterável de caminhos (A, B, C, D)
+        """
+        self.load(client)
+        paths = [tuple(str(name).strip() if name is not None else "" for name in path) for path in paths]
+
+        for level in range(4):
+            missing = {}
+            for path in paths:
+                names = path[:level + 1]
+                if len(names) <= level or not names[level] or any(not name for name in names):
+                    continue
+                key = self.path_key(*names)
+                if key in self._paths or key in missing:
+                    continue
+                # Pai precisa existir (nível 0 fica na entidade raiz)
+                parent_id = self.get(*names[:-1]) if level else 0
+                if parent_id is None:
+                    continue
+                missing[key] = (names, {"name": names[-1], "entities_id": parent_id})
+
+            if not missing:
+                continue
+
+            print(c(f"🆕 [CRIANDO] {len(missing)} entidade(s) do nível {level + 1} em lote...", 'blue'))
+            pending = list(missing.values())
+            try:
+                ids = create_many(client, "Entity", [payload for _, payload in pending])
+            except BatchOutcomeUnknown as e:
+                # Resolvidas individualmente, com busca antes de criar
+                print(c(f"⚠️ Lote de entidades sem resposta conclusiva ({e})", 'yellow'))
+                continue
+            for (names, _), entity_id in zip(pending, ids):
+                if entity_id:
+                    self.add(names, entity_id)
+            # Itens que falharam no lote são resolvidos individualmente em create_entity_hierarchy
+
+
+# Instância global do cache (válida durante a execução)
+_global_entity_cache = None
+_global_entity_cache_lock = threading.Lock()
+
+def get_entity_cache():
+    """
+    Função para obter a instância global do cache de entidades
+
+    Returns:
+        EntityPathCache: Instância do cache
+    """
+    global _global_entity_cache
+    with _global_entity_cache_lock:
+        if _global_entity_cache is None:
+            _global_entity_cache = EntityPathCache()
+        return _global_entity_cache
+
+def reset_entity_cache():
+    """Descarta o cache global (ex: no início de uma nova execução)"""
+    global _global_entity_cache
+    with _global_entity_cache_lock:
+        _global_entity_cache = None
@@ -1,14 +1,16 @@
-from helper.read_config import APP_TOKEN, USER_TOKEN, GLPI_URL, HEADERS
+import threading
 import requests
 from helper.colors import c
+from .dropdown_cache import get_dropdown_cache
+from glpi_session.pagination import iter_items
 
-def get_or_create(session_token, endpoint, search_field, search_value, payload_extra=None, search_options=None):
+def get_or_create(client, endpoint, search_field, search_value, payload_extra=None, search_options=None):
     """
     Busca um item pelo campo especificado. Se não existir, cria o item.
     Retorna o ID do item encontrado ou criado.
     
     Args:
-        session_token: Token da sessão GLPI
+        client: GLPIClient da sessão ativa
         endpoint: Endpoint da API (Entity, Group, User, etc)
         search_field: Campo a ser usado na busca
         search_value: Valor a ser buscado
@@ -20,115 +22,395 @@ def get_or_create(session_token, endpoint, search_field, search_value, payload_e
         None: Se não foi possível encontrar ou criar o item
     """
     
-    headers = {**HEADERS, "Session-Token": session_token}
-    
-    # Para grupos, tenta busca direta primeiro
-    if endpoint == "Group":
-        try:
-            groups = requests.get(f"{GLPI_URL}/Group", headers=headers).json()
-            if isinstance(groups, list):
-                for group in groups:
+    # Evita que dois workers criem o mesmo item (mesmo nome e mesma entidade pai)
+    cache = get_dropdown_cache()
+    parent_id = (payload_extra or {}).get("entities_id")
+    with cache.lock_for(endpoint, search_value, parent_id):
+        # Para grupos, tenta busca direta primeiro
+        if endpoint == "Group":
+            try:
+                # Páginas são lidas sob demanda e a listagem para no primeiro grupo encontrado
+                for group in iter_items(client, "Group"):
                     if group.get("name") == search_value:
                         entity_id = group.get("entities_id")
                         if not payload_extra or not payload_extra.get("entities_id") or str(entity_id) == str(payload_extra.get("entities_id")):
                             found_id = int(group.get("id"))
                             print(c(f"✅ [OK] {endpoint} '{search_value}' encontrado (ID: {found_id})", 'green'))
                             return found_id
-        except Exception as e:
-            pass
+            except Exception as e:
+                pass
 
-    # Busca via API de busca
-    params = {"criteria[0][field]": 1, "criteria[0][searchtype]": "equals", "criteria[0][value]": search_value}
+        # Busca via API de busca
+        params = {"criteria[0][field]": 1, "criteria[0][searchtype]": "equals", "criteria[0][value]": search_value}
     
-    # Adiciona parâmetros de busca recursiva se necessário
-    if search_options and search_options.get("is_recursive"):
-        params["is_recursive"] = 1
+        # Adiciona parâmetros de busca recursiva se necessário
+        if search_options and search_options.get("is_recursive"):
+            params["is_recursive"] = 1
     
-    # Para entidades/grupos/operadoras, busca também por entities_id se fornecido
-    if endpoint in ["Entity", "Group", "LineOperator"] and payload_extra and "entities_id" in payload_extra:
-        params["criteria[1][field]"] = 80  # entities_id
-        params["criteria[1][searchtype]"] = "equals"
-        params["criteria[1][value]"] = payload_extra["entities_id"]
+        # Para entidades/grupos/operadoras, busca também por entities_id se fornecido
+        if endpoint in ["Entity", "Group", "LineOperator"] and payload_extra and "entities_id" in payload_extra:
+            params["criteria[1][field]"] = 80  # entities_id
+            params["criteria[1][searchtype]"] = "equals"
+            params["criteria[1][value]"] = payload_extra["entities_id"]
     
-    search = requests.get(f"{GLPI_URL}/search/{endpoint}", headers=headers, params=params)
-    resp = search.json()
+        search = client.get(f"search/{endpoint}", params=params)
+        resp = search.json()
     
-    # Corrige caso a resposta seja uma lista inesperada
-    if isinstance(resp, list):
-        for item in resp:
-            if isinstance(item, dict):
-                if (str(item.get("1", "")) == str(search_value)) or (item.get("name", "") == str(search_value)):
-                    item_id = int(item.get("id", item.get("2", 0)))
-                    print(f"✅ [OK] {endpoint} '{search_value}' encontrado (ID: {item_id})", 'green')
-                    return item_id
-        resp = {"totalcount": 0}
+        # Corrige caso a resposta seja uma lista inesperada
+        if isinstance(resp, list):
+            for item in resp:
+                if isinstance(item, dict):
+                    if (str(item.get("1", "")) == str(search_value)) or (item.get("name", "") == str(search_value)):
+                        item_id = int(item.get("id", item.get("2", 0)))
+                        print(f"✅ [OK] {endpoint} '{search_value}' encontrado (ID: {item_id})", 'green')
+                        return item_id
+            resp = {"totalcount": 0}
     
-    if resp.get("totalcount", 0) > 0:
-        item_id = int(resp["data"][0].get("id", resp["data"][0].get("2", 0)))
-        print(f"✅ [OK] {endpoint} '{search_value}' encontrado (ID: {item_id})", 'green')
-        return item_id
+        if resp.get("totalcount", 0) > 0:
+            item_id = int(resp["data"][0].get("id", resp["data"][0].get("2", 0)))
+            print(f"✅ [OK] {endpoint} '{search_value}' encontrado (ID: {item_id})", 'green')
+            return item_id
     
-    # Para entidades, verifica se já existe via busca direta primeiro
-    if endpoint == "Entity":
-        try:
-            entities_list = requests.get(f"{GLPI_URL}/Entity", headers=headers).json()
-            if isinstance(entities_list, list):
-                for entity in entities_list:
+        # Para entidades, verifica se já existe via busca direta primeiro
+        if endpoint == "Entity":
+            try:
+                for entity in iter_items(client, "Entity"):
                     if entity.get("name") == search_value:
                         parent_id = entity.get("entities_id", "") or entity.get("parent_id", "")
                         if not payload_extra or not payload_extra.get("entities_id") or str(parent_id) == str(payload_extra.get("entities_id")):
                             found_id = int(entity.get("id"))
                             return found_id
-        except Exception as e:
-            print(c(f"[DEBUG] Erro na verificação prévia: {e}", 'yellow'))
+            except Exception as e:
+                print(c(f"[DEBUG] Erro na verificação prévia: {e}", 'yellow'))
 
-    print(c(f"🆕 [CRIANDO] {endpoint} '{search_value}'...", 'blue'))
-    payload = {"input": {search_field: search_value}}
-    if payload_extra:
-        payload["input"].update(payload_extra)
+        print(c(f"🆕 [CRIANDO] {endpoint} '{search_value}'...", 'blue'))
+        payload = {"input": {search_field: search_value}}
+        if payload_extra:
+            payload["input"].update(payload_extra)
     
-    r = requests.post(f"{GLPI_URL}/{endpoint}", headers=headers, json=payload)
-    try:
-        r.raise_for_status()
-        item_id = r.json()["id"]
-        print(c(f"✅ [OK] {endpoint} '{search_value}' criado (ID: {item_id})", 'green'))
-        return item_id
-    except Exception as e:
-        print(c(f"❌ [ERRO] Não foi possível criar {endpoint} '{search_value}'. Resposta da API:", 'red'))
-        print(r.text)
-        # Se erro for de duplicidade, buscar novamente e retornar o ID
-        if "já existe" in r.text or "already exists" in r.text or "Duplicate entry" in r.text:
-            print(c(f"🔄 [BUSCA EXTRA] {endpoint} '{search_value}' já existe, buscando ID...", 'yellow'))
-            # Busca manual considerando nome e parent (entities_id)
-            search_params = {"criteria[0][field]": 1, "criteria[0][searchtype]": "equals", "criteria[0][value]": search_value}
-            if endpoint in ["Entity", "Group"] and payload_extra and "entities_id" in payload_extra:
-                search_params["criteria[1][field]"] = 4
-                search_params["criteria[1][searchtype]"] = "equals"
-                search_params["criteria[1][value]"] = payload_extra["entities_id"]
-            search2 = requests.get(f"{GLPI_URL}/search/{endpoint}", headers=headers, params=search_params)
-            print(c(f"[DEBUG] Resposta da busca por nome+parent: {search2.text}", 'yellow'))
-            resp2 = search2.json()
-            found_id = None
-            if isinstance(resp2, list):
-                for item in resp2:
-                    if isinstance(item, dict):
-                        nome_match = (str(item.get("1", "")) == str(search_value)) or (item.get("name", "") == str(search_value))
-                        if not nome_match and "completename" in item:
-                            nome_match = item["completename"].endswith(str(search_value))
-                        if nome_match:
-                            parent_id = item.get("entities_id") or item.get("4") or item.get("parent_id")
-                            parent_match = True
-                            if endpoint in ["Entity", "Group"] and payload_extra and "entities_id" in payload_extra:
-                                parent_match = str(parent_id) == str(payload_extra["entities_id"])
-                            if parent_match:
-                                found_id = int(item.get("id", item.get("2", 0)))
-                                break
-                if found_id:
-                    print(c(f"✅ [OK] {endpoint} '{search_value}' encontrado após erro (ID: {found_id})", 'green'))
-                    return found_id
-                print(c(f"❌ [ERRO] {endpoint} '{search_value}' não encontrado após erro de duplicidade.", 'red'))
-                print(c(f"[DEBUG] Resposta da busca extra: {resp2}", 'yellow'))
+        r = client.post(endpoint, json=payload)
+        try:
+            r.raise_for_status()
+            item_id = r.json()["id"]
+            print(c(f"✅ [OK] {endpoint} '{search_value}' criado (ID: {item_id})", 'green'))
+            return item_id
+        except Exception as e:
+            print(c(f"❌ [ERRO] Não foi possível criar {endpoint} '{search_value}'. Resposta da API:", 'red'))
+            print(r.text)
+            # Se erro for de duplicidade, buscar novamente e retornar o ID
+            if "já existe" in r.text or "already exists" in r.text or "Duplicate entry" in r.text:
+                print(c(f"🔄 [BUSCA EXTRA] {endpoint} '{search_value}' já existe, buscando ID...", 'yellow'))
+                # Busca manual considerando nome e parent (entities_id)
+                search_params = {"criteria[0][field]": 1, "criteria[0][searchtype]": "equals", "criteria[0][value]": search_value}
+                if endpoint in ["Entity", "Group"] and payload_extra and "entities_id" in payload_extra:
+                    search_params["criteria[1][field]"] = 4
+                    search_params["criteria[1][searchtype]"] = "equals"
+                    search_params["criteria[1][value]"] = payload_extra["entities_id"]
+                search2 = client.get(f"search/{endpoint}", params=search_params)
+                print(c(f"[DEBUG] Resposta da busca por nome+parent: {search2.text}", 'yellow'))
+                resp2 = search2.json()
+                found_id = None
+                if isinstance(resp2, list):
+                    for item in resp2:
+                        if isinstance(item, dict):
+                            nome_match = (str(item.get("1", "")) == str(search_value)) or (item.get("name", "") == str(search_value))
+                            if not nome_match and "completename" in item:
+                                nome_match = item["completename"].endswith(str(search_value))
+                            if nome_match:
+                                parent_id = item.get("entities_id") or item.get("4") or item.get("parent_id")
+                                parent_match = True
+                                if endpoint in ["Entity", "Group"] and payload_extra and "entities_id" in payload_extra:
+                                    parent_match = str(parent_id) == str(payload_extra["entities_id"])
+                                if parent_match:
+                                    found_id = int(item.get("id", item.get("2", 0)))
+                                    break
+                    if found_id:
+                        print(c(f"✅ [OK] {endpoint} '{search_value}' encontrado após erro (ID: {found_id})", 'green'))
+                        return found_id
+                    print(c(f"❌ [ERRO] {endpoint} '{search_value}' não encontrado após erro de duplicidade.", 'red'))
+                    print(c(f"[DEBUG] Resposta da busca extra: {resp2}", 'yellow'))
             
-            # Debug listing removed for cleaner output
-        print(c(f"❌ [ERRO] {endpoint} '{search_value}' não encontrado após erro de duplicidade.", 'red'))
-        return None
+                # Debug listing removed for cleaner output
+            print(c(f"❌ [ERRO] {endpoint} '{search_value}' não encontrado após erro de duplicidade.", 'red'))
+            return None
+
+
+class BatchOutcomeUnknown(Exception):
+    """
+    O POST em lote não teve resposta conclusiva (timeout, conexão, 5xx): o GLPI
+    pode ter gravado parte ou todos os itens, então nenhum deles pode ser
+    reenviado sem antes verificar se já existe.
+    """
+
+
+def create_many(client, endpoint, inputs):
+    """
+    Cria vários itens em uma única requisição usando o "input" em array da API.
+
+    Args:
+        client: GLPIClient da sessão ativa
+        endpoint: Endpoint da API (Entity, Computer, Phone, etc)
+        inputs: Lista de payloads (um por item)
+
+    Returns:
+        list: IDs na mesma ordem dos payloads (None para os itens que a API informou como falha)
+
+    Raises:
+        BatchOutcomeUnknown: Se não é possível saber quais itens foram criados
+    """
+    ids = [None] * len(inputs)
+    if not inputs:
+        return ids
+    try:
+        response = client.post(endpoint, json={"input": inputs})
+    except (requests.ConnectionError, requests.Timeout) as e:
+        raise BatchOutcomeUnknown(f"sem resposta: {e}") from e
+    if response.status_code >= 500:
+        raise BatchOutcomeUnknown(f"status {response.status_code}")
+    if response.status_code not in (200, 201, 207):
+        # Lote recusado pela API (4xx): nenhum item foi criado
+        print(c(f"⚠️ Falha ao criar {endpoint} em lote: {response.status_code} {response.text[:200]}", 'yellow'))
+        return ids
+    try:
+        data = response.json()
+    except ValueError as e:
+        raise BatchOutcomeUnknown(f"resposta inválida: {e}") from e
+
+    # Sucesso parcial (207) devolve [ids, mensagens de erro]
+    if isinstance(data, list) and data and isinstance(data[0], list):
+        data = data[0]
+    if not isinstance(data, list) or len(data) < len(inputs):
+        raise BatchOutcomeUnknown("resposta sem o resultado de todos os itens")
+
+    for position, item in enumerate(data[:len(inputs)]):
+        if isinstance(item, dict) and item.get("id"):
+            ids[position] = int(item["id"])
+    return ids
+
+
+# Campos numéricos além dos IDs (*_id) e flags (is_*), comparados como número
+NUMERIC_FIELDS = frozenset({"value", "warranty_value", "warranty_duration", "authtype"})
+
+
+def _is_numeric_field(field):
+    return field.endswith("_id") or field.startswith("is_") or field in NUMERIC_FIELDS
+
+
+def _same_value(field, current, desired):
+    """
+    Compara um valor do GLPI com o da planilha
+    IDs, flags e valores são comparados como número (IDs vazios valem 0); os demais
+    campos (serial, IMEI, CPF, telefone...) como texto, para não igualar "0123" e "123".
+    """
+    numeric = _is_numeric_field(field)
+    empty = (None, "", 0, "0") if numeric else (None, "")
+    if current in empty and desired in empty:
+        return True
+    if current is None or desired is None:
+        return False
+    if numeric:
+        try:
+            return float(current) == float(desired)
+        except (TypeError, ValueError):
+            pass
+    return str(current).strip() == str(desired).strip()
+
+
+def changed_fields(current, desired):
+    """
+    Campos do payload cujo valor difere do item atual no GLPI
+
+    Args:
+        current (dict): Valores atuais do item
+        desired (dict): Payload montado a partir da planilha
+
+    Returns:
+        dict: Apenas os campos alterados
+    """
+    return {field: value for field, value in desired.items()
+            if not _same_value(field, current.get(field), value)}
+
+
+def put_item(client, itemtype, item_id, data):
+    """
+    Envia o PUT de um item e confere a resposta
+
+    Raises:
+        RuntimeError: Se a API recusar a atualização (4xx/5xx)
+    """
+    response = client.put(f"{itemtype}/{item_id}", json={"input": data})
+    if response.status_code not in (200, 201):
+        raise RuntimeError(f"Falha ao atualizar {itemtype} {item_id} (Status: {response.status_code}): "
+                           f"{response.text[:200]}")
+    return response
+
+
+def update_changed(client, itemtype, item_id, desired, current=None):
+    """
+    Atualiza só os campos alterados de um item (ou não faz nada, se nada mudou)
+    Evita reescrever o item inteiro, o que gera histórico (glpi_logs) e dispara
+    as regras de negócio do GLPI mesmo quando os dados são os mesmos.
+
+    Args:
+        client: GLPIClient da sessão ativa
+        itemtype: Tipo do item (Computer, Phone, Line, User...)
+        item_id: ID do item
+        desired (dict): Payload montado a partir da planilha
+        current (dict): Valores atuais já conhecidos (se None, faz um GET do item)
+
+    Returns:
+        dict: Campos enviados no PUT (vazio se nada mudou)
+
+    Raises:
+        RuntimeError: Se a API recusar a atualização
+    """
+    if current is None:
+        response = client.get(f"{itemtype}/{item_id}")
+        current = response.json() if response.status_code == 200 else None
+    if not isinstance(current, dict):
+        # Valores atuais indisponíveis: envia o payload completo
+        changes = dict(desired)
+    else:
+        changes = changed_fields(current, desired)
+    if changes:
+        put_item(client, itemtype, item_id, changes)
+    return changes
+
+class BatchCreator:
+    """
+    Classe para criar itens de vários ativos em lote (vínculos, Infocom...)
+    Os itens ficam em uma fila por itemtype e são criados com um único POST
+    {"input": [...]} quando a fila atinge o tamanho do lote (ou no flush final).
+    Apenas os itens que a API informou como falha são reenviados individualmente;
+    se o lote ficou sem resposta conclusiva, cada item é procurado no ativo
+    (sub-itens, ver exists) e só os que não existem são enviados de novo.
+    Pode ser usada por vários workers ao mesmo tempo.
+    """
+
+    def __init__(self, client, batch_size=50):
+        """
+        Args:
+            client: GLPIClient da sessão ativa
+            batch_size (int): Quantidade de itens criados por requisição
+        """
+        self.client = client
+        self.batch_size = max(1, int(batch_size))
+        self._queues = {}
+        self._lock = threading.Lock()
+        self._flush_locks = {}
+
+    def _flush_lock(self, itemtype):
+        with self._lock:
+            lock = self._flush_locks.get(itemtype)
+            if lock is None:
+                lock = self._flush_locks[itemtype] = threading.Lock()
+            return lock
+
+    def describe(self, itemtype, count):
+        """Mensagem exibida no envio de um lote"""
+        return f"📦 Criando {count} {itemtype}(s) em lote..."
+
+    def create_one(self, itemtype, data):
+        """
+        Cria um item que falhou no lote
+
+        Returns:
+            bool: True se o item foi criado
+        """
+        try:
+            response = self.client.post(itemtype, json={"input": data})
+            if response.status_code in [200, 201]:
+                return True
+            print(c(f"❌ Erro ao criar {itemtype}: {response.text}", 'red'))
+        except Exception as e:
+            print(c(f"❌ Erro ao criar {itemtype}: {str(e)}", 'red'))
+        return False
+
+    def identity(self, itemtype, data):
+        """Campos que identificam o item entre os sub-itens do ativo (padrão: todos os campos enviados)"""
+        return tuple(data)
+
+    def exists(self, itemtype, data):
+        """
+        Verifica se o item já existe no ativo (ex: Computer/<id>/Item_DeviceMemory)
+
+        Returns:
+            bool: True se há um sub-item com os mesmos campos de identificação
+
+        Raises:
+            requests.RequestException: Se a verificação não pôde ser feita
+        """
+        fields = self.identity(itemtype, data)
+        response = self.client.get(f"{data['itemtype']}/{data['items_id']}/{itemtype}")
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        items = response.json()
+        if isinstance(items, dict):
+            items = [items]
+        return any(isinstance(item, dict) and all(str(item.get(field)) == str(data.get(field)) for field in fields)
+                   for item in items or [])
+
+    def recover_one(self, itemtype, data):
+        """
+        Item de um lote sem resposta conclusiva: cria só se ainda não existir
+
+        Returns:
+            bool: True se o item existe (ou foi criado agora)
+        """
+        try:
+            if self.exists(itemtype, data):
+                return True
+        except Exception as e:
+            # Sem saber se o item existe, não reenvia (evita duplicar)
+            print(c(f"❌ Não foi possível verificar {itemtype} após falha no lote: {e}", 'red'))
+            return False
+        return self.create_one(itemtype, data)
+
+    def add(self, itemtype, data, callback=None):
+        """
+        Coloca um item na fila
+
+        Args:
+            itemtype: Tipo do item (ex: Item_DeviceMemory, Infocom)
+            data: Dados do item
+            callback: Função chamada com (ok) depois do envio (opcional)
+        """
+        with self._lock:
+            queue = self._queues.setdefault(itemtype, [])
+            queue.append((data, callback))
+            full = len(queue) >= self.batch_size
+        if full:
+            self._flush(itemtype)
+
+    def flush(self):
+        """Envia todos os itens que ainda estão na fila"""
+        with self._lock:
+            itemtypes = list(self._queues)
+        for itemtype in itemtypes:
+            self._flush(itemtype)
+
+    def _flush(self, itemtype):
+        with self._flush_lock(itemtype):
+            with self._lock:
+                batch = self._queues.pop(itemtype, [])
+            if not batch:
+                return
+
+            print(c(self.describe(itemtype, len(batch)), 'cyan'))
+            try:
+                ids = create_many(self.client, itemtype, [data for data, _ in batch])
+                retry = self.create_one
+            except BatchOutcomeUnknown as e:
+                print(c(f"⚠️ Lote de {itemtype} sem resposta conclusiva ({e}), verificando item a item...", 'yellow'))
+                ids = [None] * len(batch)
+                retry = self.recover_one
+
+            for (data, callback), item_id in zip(batch, ids):
+                # Só os itens que falharam no lote são reenviados um a um
+                ok = bool(item_id) or retry(itemtype, data)
+                if callback:
+                    try:
+                        callback(ok)
+                    except Exception as e:
+                        print(c(f"❌ Erro ao finalizar {itemtype}: {e}", 'red'))
@@ -0,0 +1,172 @@
+import threading
+from helper.colors import c
+from .dropdown_cache import DropdownCache, get_dropdown_cache
+from glpi_session.pagination import iter_items
+
+# Campos da busca de usuários (search options do GLPI)
+USER_FIELD_NAME = 1
+USER_FIELD_ID = 2
+USER_FIELD_EMAIL = 5
+
+# Campos descritivos comparados na atualização de usuários existentes: campo da busca -> atributo
+USER_DETAIL_FIELDS = {
+    9: "firstname",
+    34: "realname",
+    11: "mobile",
+    16: "comment",
+    22: "registration_number",
+}
+
+# Dropdowns comparados na atualização: a busca devolve o nome, resolvido para o ID pelo cache
+USER_DROPDOWN_FIELDS = {
+    81: ("usertitles_id", "UserTitle"),
+    82: ("usercategories_id", "UserCategory"),
+}
+
+# Separador usado pela busca do GLPI quando um campo tem vários valores
+MULTIVALUE_SEPARATOR = "$$##$$"
+
+
+class UserIndex:
+    """
+    Índice login/email -> ID dos usuários do GLPI durante uma execução
+    Montado uma única vez a partir da busca paginada de usuários (id, login,
+    email e os campos descritivos atualizados pelo input) e atualizado sempre
+    que um usuário é criado ou alterado, de modo que verificar se um usuário
+    existe e o que mudou nele é uma consulta em memória.
+    """
+
+    def __init__(self, page_size=None):
+        self.page_size = page_size
+        self._by_login = {}
+        self._by_email = {}
+        self._fields = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def is_loaded(self):
+        """Indica se o índice já foi carregado"""
+        return self._loaded
+
+    def load(self, client):
+        """
+        Carrega todos os usuários (paginado) no índice
+
+        Args:
+            client: GLPIClient da sessão ativa
+        """
+        with self._lock:
+            if self._loaded:
+                return
+
+            display = [USER_FIELD_ID, USER_FIELD_NAME, USER_FIELD_EMAIL, *USER_DETAIL_FIELDS, *USER_DROPDOWN_FIELDS]
+            params = {f"forcedisplay[{i}]": field for i, field in enumerate(display)}
+            try:
+                for row in iter_items(client, "search/User", params, page_size=self.page_size):
+                    if isinstance(row, dict):
+                        self._add_row(row)
+            except Exception as e:
+                print(c(f"⚠️ Não foi possível carregar o índice de usuários: {e}", 'yellow'))
+                return
+
+            self._loaded = True
+            print(c(f"👥 {len(self._by_login)} usuário(s) carregado(s) no índice", 'cyan'))
+
+    def _add_row(self, row):
+        user_id = row.get(str(USER_FIELD_ID)) or row.get("id")
+        if not user_id:
+            return
+        emails = str(row.get(str(USER_FIELD_EMAIL)) or "").split(MULTIVALUE_SEPARATOR)
+        self.add(row.get(str(USER_FIELD_NAME)), user_id, *emails)
+
+        fields = {attribute: row.get(str(field)) for field, attribute in USER_DETAIL_FIELDS.items()}
+        # Dropdowns ficam pelo nome até serem resolvidos em current()
+        for field, (attribute, itemtype) in USER_DROPDOWN_FIELDS.items():
+            fields[itemtype] = row.get(str(field))
+        self._fields[int(user_id)] = fields
+
+    def get(self, login):
+        """
+        Retorna o ID do usuário pelo login (ou por um email igual ao login)
+
+        Returns:
+            int: ID do usuário
+            None: Se o usuário não está no índice
+        """
+        key = DropdownCache.normalize(login)
+        return self._by_login.get(key) or self._by_email.get(key)
+
+    def add(self, login, user_id, *emails):
+        """Registra um usuário encontrado ou criado durante a execução"""
+        if not user_id:
+            return
+        with self._lock:
+            if login:
+                self._by_login[DropdownCache.normalize(login)] = int(user_id)
+            for email in emails:
+                if email and str(email).strip():
+                    self._by_email.setdefault(DropdownCache.normalize(email), int(user_id))
+
+    def current(self, client, user_id):
+        """
+        Valores atuais dos campos descritivos do usuário, vindos da busca do índice
+
+        Args:
+            client: GLPIClient da sessão ativa (para resolver cargo e categoria)
+            user_id: ID do usuário
+
+        Returns:
+            dict: Campos no formato do item (dropdowns como ID)
+            None: Se o usuário não tem os campos no índice (ex: encontrado fora dele)
+        """
+        with self._lock:
+            stored = dict(self._fields.get(int(user_id)) or {})
+        if not stored:
+            return None
+
+        current = {attribute: stored[attribute] for attribute in USER_DETAIL_FIELDS.values() if attribute in stored}
+        cache = get_dropdown_cache()
+        for attribute, itemtype in USER_DROPDOWN_FIELDS.values():
+            if attribute in stored:
+                current[attribute] = stored[attribute]
+                continue
+            name = stored.get(itemtype)
+            if not name:
+                current[attribute] = 0
+                continue
+            dropdown_id = cache.get(client, itemtype, name)
+            if dropdown_id is not None:
+                current[attribute] = dropdown_id
+            # Nome sem ID conhecido: o campo fica de fora e é tratado como alterado
+        return current
+
+    def remember(self, user_id, fields):
+        """Registra os valores gravados no usuário (criação ou atualização)"""
+        if not user_id:
+            return
+        with self._lock:
+            self._fields.setdefault(int(user_id), {}).update(fields)
+
+
+# Instância global do índice (válida durante a execução)
+_global_user_index = None
+_global_user_index_lock = threading.Lock()
+
+def get_user_index():
+    """
+    Função para obter a instância global do índice de usuários
+
+    Returns:
+        UserIndex: Instância do índice
+    """
+    global _global_user_index
+    with _global_user_index_lock:
+        if _global_user_index is None:
+            _global_user_index = UserIndex()
+        return _global_user_index
+
+def reset_user_index():
+    """Descarta o índice global (ex: no início de uma nova execução)"""
+    global _global_user_index
+    with _global_user_index_lock:
+        _global_user_index = None
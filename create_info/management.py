@@ -1,136 +1,144 @@
-import requests
-from helper.read_config import GLPI_URL, HEADERS
+from datetime import datetime
 from helper.colors import c
+from create_info.glpi_objects.dropdown_cache import get_dropdown_cache
+from create_info.glpi_objects.generic_operations import BatchCreator, changed_fields
+from create_info.glpi_objects.contract_index import get_contract_index
 
-def get_or_create_supplier(session_token, supplier_name, entities_id=0):
+def get_or_create_supplier(client, supplier_name, entities_id=0):
 
-    headers = {**HEADERS, "Session-Token": session_token}
+    cache = get_dropdown_cache()
     
-    try:
-        # Busca todos os suppliers
-        get_all_response = requests.get(f"{GLPI_URL}/Supplier", headers=headers)
-        
-        if get_all_response.status_code == 200:
-            all_suppliers = get_all_response.json()
-            # Procura pelo nome exato
-            if isinstance(all_suppliers, list):
-                for supplier in all_suppliers:
-                    if isinstance(supplier, dict) and supplier.get("name") == supplier_name:
-                        supplier_id = supplier.get("id")
-                        return supplier_id
+    with cache.lock_for("Supplier", supplier_name):
+        try:
+            # Consulta o cache da execução (lista de suppliers baixada uma única vez)
+            supplier_id = cache.get(client, "Supplier", supplier_name)
+            if supplier_id:
+                return supplier_id
         
-        # Se não encontrou, cria um novo fornecedor na entidade raiz
-        supplier_data = {
-            "name": supplier_name,
-            "entities_id": 0,  # Sempre entidade raiz
-            "is_recursive": 1,
-            "is_active": 1  # Criar supplier como ativo
-        }
+            # Se não encontrou, cria um novo fornecedor na entidade raiz
+            supplier_data = {
+                "name": supplier_name,
+                "entities_id": 0,  # Sempre entidade raiz
+                "is_recursive": 1,
+                "is_active": 1  # Criar supplier como ativo
+            }
         
-        create_response = requests.post(f"{GLPI_URL}/Supplier", headers=headers, json={"input": supplier_data})
+            create_response = client.post("Supplier", json={"input": supplier_data})
         
-        if create_response.status_code == 201:
-            supplier_id = create_response.json().get("id")
-            return supplier_id
-        else:
-            print(c(f"❌ Erro ao criar fornecedor '{supplier_name}'", 'red'))
-            return None
+            if create_response.status_code == 201:
+                supplier_id = create_response.json().get("id")
+                cache.add("Supplier", supplier_name, supplier_id)
+                return supplier_id
+            else:
+                print(c(f"❌ Erro ao criar fornecedor '{supplier_name}'", 'red'))
+                return None
             
-    except Exception as e:
-        print(c(f"❌ Erro ao processar fornecedor '{supplier_name}': {str(e)}", 'red'))
-        return None
+        except Exception as e:
+            print(c(f"❌ Erro ao processar fornecedor '{supplier_name}': {str(e)}", 'red'))
+            return None
 
-def get_or_create_contract(session_token, contract_name, entities_id=0, supplier_id=None):
+def get_or_create_contract(client, contract_name, entities_id=0, supplier_id=None):
 
-    headers = {**HEADERS, "Session-Token": session_token}
+    cache = get_dropdown_cache()
     
     print(c(f"🔍 Função get_or_create_contract chamada para '{contract_name}' com supplier_id={supplier_id}", 'blue'))
     
-    try:
+    with cache.lock_for("Contract", contract_name):
+        try:
         
-        # Busca todos os contratos
-        print(c(f"🔍 Buscando contrato '{contract_name}'...", 'blue'))
-        get_all_response = requests.get(f"{GLPI_URL}/Contract", headers=headers)
+            # Consulta o cache da execução (lista de contratos baixada uma única vez)
+            print(c(f"🔍 Buscando contrato '{contract_name}'...", 'blue'))
+            contract_id = cache.get(client, "Contract", contract_name)
         
-        if get_all_response.status_code == 200:
-            all_contracts = get_all_response.json()
-            print(c(f"🔍 Encontrados {len(all_contracts) if isinstance(all_contracts, list) else 0} contratos no total", 'yellow'))
+            if contract_id:
+                print(c(f"✅ Contrato '{contract_name}' encontrado (ID: {contract_id})", 'green'))
+            
+                # Se foi fornecido um supplier_id, vincula caso ainda não esteja vinculado
+                if supplier_id:
+                    link_contract_supplier(client, contract_id, supplier_id)
             
-            # Procura pelo nome exato
-            if isinstance(all_contracts, list):
-                for contract in all_contracts:
-                    if isinstance(contract, dict) and contract.get("name") == contract_name:
-                        contract_id = contract.get("id")
-                        print(c(f"✅ Contrato '{contract_name}' encontrado (ID: {contract_id})", 'green'))
-                        
-                        # Se foi fornecido um supplier_id, verificar se já está vinculado
-                        if supplier_id:
-                            # Verificar se o supplier já está vinculado
-                            supplier_check = requests.get(f"{GLPI_URL}/Contract/{contract_id}/Contract_Supplier", headers=headers)
-                            if supplier_check.status_code == 200:
-                                existing_suppliers = supplier_check.json()
-                                supplier_already_linked = False
-                                if existing_suppliers:
-                                    for sup in existing_suppliers:
-                                        if sup.get('suppliers_id') == supplier_id:
-                                            supplier_already_linked = True
-                                            break
-                                
-                                if not supplier_already_linked:
-                                    # Criar vinculação via Contract_Supplier
-                                    link_data = {
-                                        "contracts_id": contract_id,
-                                        "suppliers_id": supplier_id
-                                    }
-                                    link_response = requests.post(f"{GLPI_URL}/Contract_Supplier", headers=headers, json={"input": link_data})
-                                    if not link_response.status_code == 201:
-                                        print(c(f"⚠️ Erro ao vincular supplier: {link_response.status_code}", 'yellow'))
-                        
-                        return contract_id
+                return contract_id
         
-        # Se não encontrou, cria um novo contrato na entidade raiz
-        print(c(f"🔍 Contrato '{contract_name}' não encontrado na lista", 'yellow'))
-        print(c(f"⚠️ Contrato '{contract_name}' não encontrado, criando novo...", 'yellow'))
-        contract_data = {
-            "name": contract_name,
-            "entities_id": 0,  # Sempre entidade raiz
-            "is_recursive": 1
-        }
+            # Se não encontrou, cria um novo contrato na entidade raiz
+            print(c(f"🔍 Contrato '{contract_name}' não encontrado na lista", 'yellow'))
+            print(c(f"⚠️ Contrato '{contract_name}' não encontrado, criando novo...", 'yellow'))
+            contract_data = {
+                "name": contract_name,
+                "entities_id": 0,  # Sempre entidade raiz
+                "is_recursive": 1
+            }
         
-        if supplier_id:
-            print(c(f"📋 Criando contrato '{contract_name}' na entidade raiz (ID: 0) com supplier {supplier_id}", 'blue'))
-        else:
-            print(c(f"📋 Criando contrato '{contract_name}' na entidade raiz (ID: 0) sem supplier", 'blue'))
+            if supplier_id:
+                print(c(f"📋 Criando contrato '{contract_name}' na entidade raiz (ID: 0) com supplier {supplier_id}", 'blue'))
+            else:
+                print(c(f"📋 Criando contrato '{contract_name}' na entidade raiz (ID: 0) sem supplier", 'blue'))
         
-        create_response = requests.post(f"{GLPI_URL}/Contract", headers=headers, json={"input": contract_data})
+            create_response = client.post("Contract", json={"input": contract_data})
         
-        if create_response.status_code == 201:
-            contract_id = create_response.json().get("id")
+            if create_response.status_code == 201:
+                contract_id = create_response.json().get("id")
+                cache.add("Contract", contract_name, contract_id)
             
-            # Se foi fornecido supplier_id, criar a vinculação após criar o contrato
-            if supplier_id:
-                link_data = {
-                    "contracts_id": contract_id,
-                    "suppliers_id": supplier_id
-                }
-                link_response = requests.post(f"{GLPI_URL}/Contract_Supplier", headers=headers, json={"input": link_data})
-                if not link_response.status_code == 201:
-                    print(c(f"⚠️ Erro ao vincular supplier ao novo contrato: {link_response.status_code}", 'yellow'))
+                # Se foi fornecido supplier_id, criar a vinculação após criar o contrato
+                if supplier_id:
+                    link_contract_supplier(client, contract_id, supplier_id, is_new=True)
             
-            return contract_id
-        else:
-            print(c(f"❌ Erro ao criar contrato '{contract_name}'", 'red'))
-            return None
+                return contract_id
+            else:
+                print(c(f"❌ Erro ao criar contrato '{contract_name}'", 'red'))
+                return None
             
-    except Exception as e:
-        print(c(f"❌ Erro ao processar contrato '{contract_name}': {str(e)}", 'red'))
-        return None
+        except Exception as e:
+            print(c(f"❌ Erro ao processar contrato '{contract_name}': {str(e)}", 'red'))
+            return None
+
+def _supplier_linked_remote(client, contract_id, supplier_id):
+    """Consulta na API se o fornecedor já está vinculado ao contrato (sem o índice carregado)"""
+    supplier_check = client.get(f"Contract/{contract_id}/Contract_Supplier")
+    if supplier_check.status_code != 200:
+        return False
+    return any(sup.get('suppliers_id') == supplier_id for sup in supplier_check.json() or [])
 
-def link_contract_to_asset(session_token, asset_type, asset_id, contract_id):
+def link_contract_supplier(client, contract_id, supplier_id, is_new=False):
     """
-    Vincula um contrato a um ativo.
+    Vincula um fornecedor a um contrato, se o vínculo ainda não existir
+
+    Args:
+        client: GLPIClient da sessão ativa
+        contract_id: ID do contrato
+        supplier_id: ID do fornecedor
+        is_new: Contrato acabou de ser criado (não tem vínculos; pula a verificação)
+
+    Returns:
+        bool: True se o vínculo existe ou foi criado
+    """
+    index = get_contract_index()
+    if not is_new:
+        index.load(client, "Contract_Supplier")
+        if index.is_loaded("Contract_Supplier"):
+            linked = index.has_supplier(contract_id, supplier_id)
+        else:
+            linked = _supplier_linked_remote(client, contract_id, supplier_id)
+        if linked:
+            return True
+
+    # Criar vinculação via Contract_Supplier
+    link_data = {
+        "contracts_id": contract_id,
+        "suppliers_id": supplier_id
+    }
+    link_response = client.post("Contract_Supplier", json={"input": link_data})
+    if link_response.status_code != 201:
+        print(c(f"⚠️ Erro ao vincular supplier: {link_response.status_code}", 'yellow'))
+        return False
+    index.add_supplier(contract_id, supplier_id)
+    return True
+
+def link_contract_to_asset(client, asset_type, asset_id, contract_id, is_new=False):
+    """
+    Vincula um contrato a um ativo, se o vínculo ainda não existir.
+    Para ativos recém-criados (is_new) a verificação é pulada.
     """
-    headers = {**HEADERS, "Session-Token": session_token}
     
     try:
         # Define o endpoint correto baseado no tipo de ativo
@@ -145,15 +153,23 @@ def link_contract_to_asset(session_token, asset_type, asset_id, contract_id):
             print(c(f"⚠️ Tipo de ativo '{asset_type}' não suportado para contratos", 'yellow'))
             return False
         
-        # Cria a vinculação diretamente (sem verificar se já existe)
-        create_response = requests.post(f"{GLPI_URL}/{endpoint}", headers=headers, json={"input": item_data})
+        # Consulta o índice de vínculos (carregado uma única vez) antes de enviar
+        index = get_contract_index()
+        if not is_new:
+            index.load(client, "Contract_Item")
+            if index.has_item(contract_id, asset_type, asset_id):
+                return True
+
+        create_response = client.post(endpoint, json={"input": item_data})
         
         if create_response.status_code == 201:
+            index.add_item(contract_id, asset_type, asset_id)
             return True
         elif create_response.status_code == 400:
             # Pode ser que já existe - vamos aceitar como sucesso
             response_text = create_response.text.lower()
             if "duplicate" in response_text or "already exists" in response_text:
+                index.add_item(contract_id, asset_type, asset_id)
                 return True
             else:
                 print(c(f"❌ Erro 400 ao vincular contrato: {create_response.text}", 'red'))
@@ -167,136 +183,130 @@ def link_contract_to_asset(session_token, asset_type, asset_id, contract_id):
         print(c(f"❌ Erro ao vincular contrato: {str(e)}", 'red'))
         return False
 
-def create_management_info(session_token, asset_type, asset_id, buy_date=None, value=None, supplier_id=None):
-    headers = {**HEADERS, "Session-Token": session_token}
-    
-    try:
-        # Define o endpoint correto baseado no tipo de ativo
-        if asset_type == "Computer":
-            endpoint = "Infocom"
-            itemtype = "Computer"
-        elif asset_type == "Line":
-            endpoint = "Infocom"
-            itemtype = "Line"
-        else:
-            print(c(f"⚠️ Tipo de ativo '{asset_type}' não suportado para informações de management", 'yellow'))
-            return False
-        
-        # Verifica se já existe Infocom para este asset usando o endpoint direto
-        try:
-            check_url = f"{GLPI_URL}/{asset_type}/{asset_id}/Infocom"
-            check_response = requests.get(check_url, headers=headers)
-            
-            if check_response.status_code == 200:
-                existing_infocom = check_response.json()
-                if isinstance(existing_infocom, list) and len(existing_infocom) > 0:
-                    # Já existe Infocom, vamos atualizá-lo
-                    infocom_id = existing_infocom[0].get("id")
-                    
-                    # Prepara dados para atualização
-                    update_data = {}
-                    
-                    if buy_date:
-                        date_str = str(buy_date).strip()
-                        if ' ' in date_str:
-                            date_str = date_str.split(' ')[0]
-                        update_data["buy_date"] = date_str
-                        
-                    if value:
-                        try:
-                            value_float = float(str(value).strip().replace(',', '.'))
-                            update_data["value"] = value_float
-                        except ValueError:
-                            print(c(f"⚠️ Valor '{value}' não é numérico válido", 'yellow'))
-                    
-                    # Adicionar supplier_id se fornecido
-                    if supplier_id:
-                        update_data["suppliers_id"] = supplier_id
-                    
-                    if update_data:
-                        update_response = requests.put(f"{GLPI_URL}/Infocom/{infocom_id}", headers=headers, json={"input": update_data})
-                        
-                        if update_response.status_code == 200:
-                            return True
-                        else:
-                            print(c(f"⚠️ Erro ao atualizar Infocom: {update_response.text}", 'yellow'))
-                            return False
-                    else:
-                        return True
-                        
-        except Exception as e:
-            print(c(f"🔍 Erro ao verificar Infocom existente: {str(e)}", 'yellow'))
-        
-        # Prepara os dados de management
-        infocom_data = {
-            "items_id": asset_id,
-            "itemtype": itemtype
-        }
-        
-        # Processa a data no formato correto do GLPI (YYYY-MM-DD)
-        if buy_date:
-            date_str = str(buy_date).strip()
-            # Se a data tem formato datetime, extrai apenas a data
-            if ' ' in date_str:
-                date_str = date_str.split(' ')[0]
-            infocom_data["buy_date"] = date_str
-            
-        if value:
-            # Garante que o valor é numérico
-            try:
-                value_float = float(str(value).strip().replace(',', '.'))
-                infocom_data["value"] = value_float
-            except ValueError:
-                print(c(f"⚠️ Valor '{value}' não é numérico válido", 'yellow'))
-        
-        # Adicionar supplier_id se fornecido
-        if supplier_id:
-            infocom_data["suppliers_id"] = supplier_id
-        
-        # Usa o endpoint Infocom que sabemos que funciona
-        endpoint = "Infocom"
-        
-        # Prepara dados completos para criação
-        infocom_data = {
-            "items_id": asset_id,
-            "itemtype": itemtype
-        }
-        
-        # Processa a data no formato correto do GLPI (YYYY-MM-DD)
-        if buy_date:
-            date_str = str(buy_date).strip()
-            # Se a data tem formato datetime, extrai apenas a data
-            if ' ' in date_str:
-                date_str = date_str.split(' ')[0]
-            infocom_data["buy_date"] = date_str
-            
-        if value:
-            # Garante que o valor é numérico
+def infocom_fields(buy_date=None, value=None, supplier_id=None):
+    """
+    Monta os campos do Infocom (Management) no formato do GLPI
+
+    Args:
+        buy_date: Data de compra/início (YYYY-MM-DD, DD/MM/YYYY ou datetime)
+        value: Valor (aceita vírgula decimal)
+        supplier_id: ID do fornecedor
+
+    Returns:
+        dict: Campos preenchidos (buy_date, value, suppliers_id)
+    """
+    fields = {}
+    if buy_date and str(buy_date).strip():
+        date_str = str(buy_date).strip()
+        # Se a data tem formato datetime, extrai apenas a data
+        if ' ' in date_str:
+            date_str = date_str.split(' ')[0]
+        if '/' in date_str:
             try:
-                value_float = float(str(value).strip().replace(',', '.'))
-                infocom_data["value"] = value_float
+                date_str = datetime.strptime(date_str, '%d/%m/%Y').strftime('%Y-%m-%d')
             except ValueError:
-                print(c(f"⚠️ Valor '{value}' não é numérico válido", 'yellow'))
-        
-        # Tenta criar o Infocom
-        create_response = requests.post(f"{GLPI_URL}/{endpoint}", headers=headers, json={"input": infocom_data})
-        
-        if create_response.status_code == 201:
-            infocom_id = create_response.json().get("id")
-            return True
-        elif create_response.status_code == 400:
-            # Verifica se é erro de duplicata
-            response_text = create_response.text.lower()
-            if "duplicate" in response_text or "already exists" in response_text or "unicity" in response_text:
-                return True
-            else:
-                print(c(f"❌ Erro 400 ao criar informações de management: {create_response.text}", 'red'))
+                print(c(f"⚠️ Formato de data inválido: {date_str}", 'yellow'))
+                date_str = None
+        if date_str:
+            fields["buy_date"] = date_str
+
+    if value and str(value).strip():
+        # Garante que o valor é numérico
+        try:
+            fields["value"] = float(str(value).strip().replace(',', '.'))
+        except ValueError:
+            print(c(f"⚠️ Valor '{value}' não é numérico válido", 'yellow'))
+
+    if supplier_id:
+        fields["suppliers_id"] = supplier_id
+    return fields
+
+def _is_duplicate(response):
+    response_text = response.text.lower()
+    return "duplicate" in response_text or "already exists" in response_text or "unicity" in response_text
+
+def create_management_info(client, asset_type, asset_id, buy_date=None, value=None, supplier_id=None,
+                           entities_id=None, is_new=False, infocoms=None, track=None):
+    """
+    Cria ou atualiza, em uma única escrita, o Infocom (Management) de um ativo
+
+    Args:
+        client: GLPIClient da sessão ativa
+        asset_type: Tipo do ativo (Line, Computer)
+        asset_id: ID do ativo
+        buy_date, value, supplier_id: Dados do Infocom (ver infocom_fields)
+        entities_id: Entidade do Infocom na criação (opcional)
+        is_new: Ativo acabou de ser criado (não pode ter Infocom; pula a verificação)
+        infocoms: InfocomWriter que cria os Infocom de ativos novos em lote (opcional)
+        track: Função chamada antes de enfileirar; devolve o callback(ok) executado após o envio
+
+    Returns:
+        bool: True se sucesso (ou enfileirado), False se erro
+    """
+    if asset_type not in ("Computer", "Line"):
+        print(c(f"⚠️ Tipo de ativo '{asset_type}' não suportado para informações de management", 'yellow'))
+        return False
+
+    fields = infocom_fields(buy_date, value, supplier_id)
+    if not fields:
+        return True
+
+    try:
+        if not is_new:
+            # Verifica se já existe Infocom para este asset usando o endpoint direto
+            check_response = client.get(f"{asset_type}/{asset_id}/Infocom")
+            existing = check_response.json() if check_response.status_code == 200 else None
+            if isinstance(existing, dict):
+                existing = [existing]
+            if isinstance(existing, list) and existing and existing[0].get("id"):
+                infocom_id = existing[0]["id"]
+                # Só os campos alterados; sem alterações não há escrita
+                changes = changed_fields(existing[0], fields)
+                if not changes:
+                    return True
+                update_response = client.put(f"Infocom/{infocom_id}", json={"input": changes})
+                if update_response.status_code == 200:
+                    return True
+                print(c(f"⚠️ Erro ao atualizar Infocom: {update_response.text}", 'yellow'))
                 return False
-        else:
-            print(c(f"❌ Erro ao criar informações de management - Status: {create_response.status_code}", 'red'))
-            return False
 
-                
+        infocom_data = dict(fields, items_id=asset_id, itemtype=asset_type)
+        if entities_id is not None:
+            infocom_data["entities_id"] = entities_id
+
+        if infocoms:
+            infocoms.add("Infocom", infocom_data, track() if track else None)
+            return True
+
+        create_response = client.post("Infocom", json={"input": infocom_data})
+        if create_response.status_code in [200, 201]:
+            return True
+        if create_response.status_code == 400 and _is_duplicate(create_response):
+            return True
+        print(c(f"❌ Erro ao criar informações de management - Status: {create_response.status_code}: {create_response.text}", 'red'))
+        return False
+
     except Exception as e:
         print(c(f"❌ Erro ao processar informações de management: {str(e)}", 'red'))
-        return False
\ No newline at end of file
+        return False
+
+
+class InfocomWriter(BatchCreator):
+    """
+    Classe para criar o Infocom (Management) de vários ativos novos em lote
+    Ativos recém-criados ainda não têm Infocom, então os de vários ativos são
+    criados com um único POST {"input": [...]}. Os que falharem no lote passam
+    pelo fluxo individual (com verificação de existência).
+    """
+
+    def describe(self, itemtype, count):
+        return f"📦 Criando {count} Infocom(s) em lote..."
+
+    def identity(self, itemtype, data):
+        # Cada ativo tem um único Infocom
+        return ("itemtype", "items_id")
+
+    def create_one(self, itemtype, data):
+        return create_management_info(self.client, data["itemtype"], data["items_id"],
+                                      buy_date=data.get("buy_date"), value=data.get("value"),
+                                      supplier_id=data.get("suppliers_id"), entities_id=data.get("entities_id"))
@@ -0,0 +1,267 @@
+"""
+Fase de planejamento: resolve os objetos de referência antes de criar os ativos
+"""
+from concurrent.futures import ThreadPoolExecutor
+from helper.colors import c
+from create_info.create_entity_hierarchy import create_entity_hierarchy
+from create_info.create_users import get_or_create_user_title
+from create_info.get_or_create import get_or_create_manufacturer, get_or_create_model, get_or_create_device
+from create_info.glpi_objects.dropdown_cache import DropdownCache, get_dropdown_cache
+from create_info.glpi_objects.entity_cache import get_entity_cache
+from create_info.management import get_or_create_supplier, get_or_create_contract
+
+
+def _text(value):
+    """Retorna o valor como texto sem espaços nas pontas (None se vazio)"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def row_key(row):
+    """
+    Chave natural de uma linha da planilha, estável entre versões da planilha
+    Formada pelo email principal (corporativo, se houver), número da linha,
+    IMEI e serial do notebook; usada pelo modo incremental para reconhecer a
+    mesma linha mesmo se ela mudar de posição.
+
+    Args:
+        row: RowRecord da linha
+
+    Returns:
+        str: Chave da linha (None se a linha não tem nenhum identificador)
+    """
+    parts = [DropdownCache.normalize(value) if value else "" for value in
+             (row.email_corp or row.email, row.linha, row.cel_imei, row.nb_serial)]
+    return "|".join(parts) if any(parts) else None
+
+
+class ReferencePlan:
+    """
+    IDs dos objetos de referência resolvidos para a execução
+    Cada objeto (caminho de entidade, fabricante, modelo, fornecedor, contrato,
+    cargo, componente e operadora) é buscado/criado uma única vez. Os métodos
+    consultam o mapa e, se o item não foi planejado, resolvem na hora e guardam
+    o resultado. Operadoras não são criadas: as desconhecidas ficam em
+    unknown_operators com as linhas da planilha que as usam.
+    """
+
+    def __init__(self):
+        self.entities = {}
+        self.manufacturers = {}
+        self.models = {}
+        self.suppliers = {}
+        self.contracts = {}
+        self.user_titles = {}
+        self.devices = {}
+        self.operators = {}
+        self.unknown_operators = {}
+
+    @staticmethod
+    def _key(*parts):
+        return tuple(DropdownCache.normalize(part) if part is not None else None for part in parts)
+
+    def _resolve(self, mapping, key, resolver):
+        """Consulta o mapa e, se necessário, resolve e guarda o ID (falhas não são guardadas)"""
+        item_id = mapping.get(key)
+        if item_id is None:
+            item_id = resolver()
+            if item_id:
+                mapping[key] = item_id
+        return item_id
+
+    def entity(self, client, ent_a, ent_b=None, ent_c=None, ent_d=None):
+        """ID da entidade mais profunda do caminho A > B > C > D"""
+        path = (_text(ent_a), _text(ent_b), _text(ent_c), _text(ent_d))
+        return self._resolve(self.entities, self._key(*path),
+                             lambda: create_entity_hierarchy(client, ent_a, ent_b, ent_c, ent_d))
+
+    def manufacturer(self, client, name):
+        name = _text(name)
+        if not name:
+            return None
+        return self._resolve(self.manufacturers, self._key(name),
+                             lambda: get_or_create_manufacturer(client, name))
+
+    def model(self, client, name, model_type):
+        """model_type: 'Computer' ou 'Phone'"""
+        name = _text(name)
+        if not name:
+            return None
+        return self._resolve(self.models, self._key(model_type, name),
+                             lambda: get_or_create_model(client, name, model_type))
+
+    def supplier(self, client, name):
+        name = _text(name)
+        if not name:
+            return None
+        return self._resolve(self.suppliers, self._key(name),
+                             lambda: get_or_create_supplier(client, name))
+
+    def contract(self, client, name, supplier_name=None):
+        """ID do contrato, já vinculado ao fornecedor (se informado)"""
+        name, supplier_name = _text(name), _text(supplier_name)
+        if not name:
+            return None
+        supplier_id = self.supplier(client, supplier_name) if supplier_name else None
+        return self._resolve(self.contracts, self._key(name, supplier_name),
+                             lambda: get_or_create_contract(client, name, supplier_id=supplier_id))
+
+    def operator(self, client, name):
+        """ID da operadora de linha (índice nome normalizado -> ID carregado uma única vez)"""
+        name = _text(name)
+        if not name:
+            return None
+        return self._resolve(self.operators, self._key(name),
+                             lambda: get_dropdown_cache().get(client, "LineOperator", name))
+
+    def user_title(self, client, name):
+        name = _text(name)
+        if not name:
+            return None
+        return self._resolve(self.user_titles, self._key(name),
+                             lambda: get_or_create_user_title(client, name))
+
+    def device(self, client, device_type, name):
+        """Os IDs ficam em self.devices no formato {(device_type, nome): id} aceito por link_component"""
+        name = _text(name)
+        if not name:
+            return None
+        return self._resolve(self.devices, (device_type, name),
+                             lambda: get_or_create_device(client, device_type, name))
+
+
+def _row_is_skipped(row):
+    """Replica as validações de main que descartam a linha antes de criar os ativos"""
+    if not row.ent_a:
+        return True
+    if row.nome:
+        email = row.email_corp or row.email
+        if not email or '@' not in email:
+            return True
+    return False
+
+
+def collect_references(rows):
+    """
+    Varre a planilha e coleta o conjunto distinto de referências usadas
+
+    Args:
+        rows: Iterável de (número da linha, RowRecord), sem o cabeçalho
+
+    Returns:
+        tuple: (tarefas (tipo, argumentos) na ordem em que devem ser resolvidas,
+                {operadora normalizada: (nome, [números das linhas que a usam])})
+    """
+    entities, titles, suppliers, contracts = {}, {}, {}, {}
+    manufacturers, models, devices, operators = {}, {}, {}, {}
+    operator_rows = {}
+
+    def add(target, key, args):
+        target.setdefault(ReferencePlan._key(*key), args)
+
+    for idx, row in rows:
+        if _row_is_skipped(row):
+            continue
+
+        path = (row.ent_a, row.ent_b, row.ent_c, row.ent_d)
+        add(entities, path, path)
+
+        if row.nome and row.posicao:
+            add(titles, (row.posicao,), (row.posicao,))
+
+        if row.linha and row.linha_operadora:
+            add(operators, (row.linha_operadora,), (row.linha_operadora,))
+            key = ReferencePlan._key(row.linha_operadora)
+            operator_rows.setdefault(key, (row.linha_operadora, []))[1].append(idx)
+
+        if row.linha and row.contrato_linha:
+            add(contracts, (row.contrato_linha, row.fornecedor_linha), (row.contrato_linha, row.fornecedor_linha))
+        if row.linha and row.fornecedor_linha:
+            add(suppliers, (row.fornecedor_linha,), (row.fornecedor_linha,))
+
+        if row.cel_modelo:
+            add(models, ("Phone", row.cel_modelo), (row.cel_modelo, "Phone"))
+            if row.cel_marca:
+                add(manufacturers, (row.cel_marca,), (row.cel_marca,))
+
+        if row.nb_modelo:
+            add(models, ("Computer", row.nb_modelo), (row.nb_modelo, "Computer"))
+            # Mesmo tratamento de main, que sempre converte a marca do notebook para texto
+            add(manufacturers, (str(row.nb_marca),), (str(row.nb_marca),))
+            if row.contrato_notebook:
+                add(contracts, (row.contrato_notebook, row.fornecedor_notebook),
+                    (row.contrato_notebook, row.fornecedor_notebook))
+            if row.fornecedor_notebook:
+                add(suppliers, (row.fornecedor_notebook,), (row.fornecedor_notebook,))
+            for device_type, name in (("DeviceHardDrive", row.nb_armazenamento),
+                                      ("DeviceProcessor", row.nb_processador),
+                                      ("DeviceMemory", row.nb_memoria)):
+                if name:
+                    add(devices, (device_type, name), (device_type, name))
+
+    # Fornecedores antes dos contratos, que dependem deles
+    tasks = (
+        [("entity", args) for args in entities.values()]
+        + [("user_title", args) for args in titles.values()]
+        + [("manufacturer", args) for args in manufacturers.values()]
+        + [("model", args) for args in models.values()]
+        + [("supplier", args) for args in suppliers.values()]
+        + [("contract", args) for args in contracts.values()]
+        + [("device", args) for args in devices.values()]
+        + [("operator", args) for args in operators.values()]
+    )
+    return tasks, operator_rows
+
+
+def build_reference_plan(client, rows, workers=1):
+    """
+    Resolve (busca ou cria) uma única vez cada referência distinta da planilha
+
+    Args:
+        client: GLPIClient da sessão ativa
+        rows: Iterável de (número da linha, RowRecord), sem o cabeçalho
+        workers: Número de referências resolvidas em paralelo
+
+    Returns:
+        ReferencePlan: Mapas de IDs resolvidos
+    """
+    plan = ReferencePlan()
+    tasks, operator_rows = collect_references(rows)
+    print(c(f"🗺️ Planejamento: {len(tasks)} referência(s) distinta(s) a resolver", 'cyan'))
+
+    def run(task):
+        kind, args = task
+        try:
+            getattr(plan, kind)(client, *args)
+        except Exception as e:
+            print(c(f"⚠️ Falha ao resolver {kind} {args}: {e}", 'yellow'))
+
+    # Entidades faltantes são criadas nível a nível, um POST por nível
+    try:
+        get_entity_cache().create_missing(client, [args for kind, args in tasks if kind == "entity"])
+    except Exception as e:
+        print(c(f"⚠️ Falha ao criar entidades em lote: {e}", 'yellow'))
+
+    # Entidades, cargos, fabricantes e modelos são independentes entre si; fornecedores
+    # precisam estar resolvidos antes dos contratos, então cada grupo roda em sequência
+    groups = {}
+    for task in tasks:
+        groups.setdefault("contract" if task[0] == "contract" else "base", []).append(task)
+
+    for group in ("base", "contract"):
+        group_tasks = groups.get(group, [])
+        if workers <= 1:
+            for task in group_tasks:
+                run(task)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(run, group_tasks))
+
+    # Operadoras desconhecidas são reportadas de uma vez, com todas as linhas que as usam
+    for key, (name, row_numbers) in operator_rows.items():
+        if plan.operators.get(key) is None:
+            plan.unknown_operators.setdefault(name, []).extend(row_numbers)
+
+    return plan
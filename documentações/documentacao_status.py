@@ -20,17 +20,19 @@ para indicar o sucesso/falha do input de cada tipo de item no GLPI.
 🔧 FUNCIONALIDADES IMPLEMENTADAS:
 
 1. Funções de Atualização:
-   - update_status_column(wb, row_idx, column_idx, status)
-   - save_excel_file(wb)
+   - update_status_column(writer, row_idx, column_idx, status)
+   - StatusWriter (helper/status_writer.py)
 
 2. Atualização Automática:
    - Após cada tentativa de criação de item
    - Status "OK" para sucesso, "ERRO" para falha
    - Status vazio "" quando não há item para processar
 
-3. Salvamento Contínuo:
-   - Salva planilha após cada linha processada
-   - Garante que status não seja perdido em caso de erro
+3. Salvamento por Checkpoint:
+   - Salva planilha a cada STATUS_SAVE_EVERY_ROWS linhas ou STATUS_SAVE_EVERY_SECONDS segundos
+   - Salva também no encerramento (normal, exceção ou SIGTERM)
+   - Entre checkpoints, cada status é anexado ao journal <planilha>.status.journal
+   - Se a execução cair, o journal é reaplicado na próxima execução
 
 4. Tratamento de Erros:
    - Em caso de erro geral na linha, marca todas as colunas como "ERRO"
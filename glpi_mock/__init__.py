@@ -0,0 +1,6 @@
+from .server import MockGLPIServer, GLPIStore
+
+__all__ = [
+    'MockGLPIServer',
+    'GLPIStore'
+]
@@ -0,0 +1,35 @@
+import argparse
+from helper.colors import c
+from glpi_mock.server import MockGLPIServer
+
+
+def parse_args():
+    """Lê as opções de linha de comando do servidor simulado"""
+    parser = argparse.ArgumentParser(description="Servidor local que simula a API REST do GLPI")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Porta (padrão: 8080)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência fixa por requisição, em segundos")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latência extra aleatória máxima, em segundos")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração das requisições que devolvem 500")
+    parser.add_argument("--bad-request-rate", type=float, default=0.0, help="Fração das requisições que devolvem 400")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fração das requisições que simulam timeout")
+    parser.add_argument("--timeout-delay", type=float, default=60.0, help="Atraso das requisições com timeout, em segundos")
+    parser.add_argument("--session-lifetime", type=float, default=None,
+                        help="Segundos até um token de sessão expirar (padrão: não expira)")
+    parser.add_argument("--page-limit", type=int, default=1000, help="Máximo de itens por página (padrão: 1000)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = MockGLPIServer(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, bad_request_rate=args.bad_request_rate,
+        timeout_rate=args.timeout_rate, timeout_delay=args.timeout_delay, page_limit=args.page_limit,
+        session_lifetime=args.session_lifetime
+    )
+    print(c(f"🧪 GLPI simulado em {server.url} (use como GLPI_URL)", 'cyan'))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(c("👋 Servidor encerrado", 'yellow'))
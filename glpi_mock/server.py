@@ -0,0 +1,450 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Campos da busca (search options) -> atributo do item, por itemtype
+# Campos que não estão no mapa são procurados pelo próprio nome (ex: "name")
+SEARCH_FIELDS = {
+    "*": {1: "name", 2: "id", 5: "serial", 6: "otherserial", 80: "entities_id"},
+    "Entity": {4: "entities_id"},
+    "Line": {70: "users_id"},
+    "User": {5: "email", 9: "firstname", 11: "mobile", 16: "comment", 22: "registration_number",
+             33: "name", 34: "realname", 81: "usertitles_id", 82: "usercategories_id"},
+}
+
+# Campos da busca que são dropdowns: a busca devolve o nome do item referenciado
+DROPDOWN_FIELDS = {"usertitles_id": "UserTitle", "usercategories_id": "UserCategory"}
+
+# Campos exibidos na busca quando não há forcedisplay
+DEFAULT_DISPLAY = (1, 2, 80)
+
+# Separador usado pelo GLPI quando um campo da busca tem vários valores
+MULTIVALUE_SEPARATOR = "$$##$$"
+
+# Itemtypes com nome único (a criação de um nome repetido devolve erro de duplicidade)
+UNIQUE_NAMES = {"User"}
+
+# Operadoras cadastradas por padrão
+DEFAULT_OPERATORS = ("Vivo", "Claro", "TIM", "Oi")
+
+
+def foreign_key(itemtype):
+    """Nome do campo de chave estrangeira do itemtype (ex: Entity -> entities_id)"""
+    name = itemtype.lower()
+    if name.endswith("y") and not name.endswith("ey"):
+        return f"{name[:-1]}ies_id"
+    return f"{name}s_id"
+
+
+class GLPIStore:
+    """
+    Armazenamento em memória dos itens do servidor simulado
+    Cada itemtype tem seu próprio dicionário id -> item e sua sequência de IDs.
+    """
+
+    def __init__(self, operators=DEFAULT_OPERATORS):
+        self.items = {}
+        self.next_ids = {}
+        self.lock = threading.RLock()
+
+        # Entidade raiz (ID 0), como em uma instalação do GLPI
+        self.items["Entity"] = {0: {"id": 0, "name": "Root entity", "completename": "Root entity",
+                                    "entities_id": 0, "level": 1, "comment": ""}}
+        self.next_ids["Entity"] = 1
+        for operator in operators:
+            self.add("LineOperator", {"name": operator, "entities_id": 0, "is_recursive": 1})
+        # Categoria padrão dos usuários criados pelo input (usercategories_id = 1)
+        self.add("UserCategory", {"name": "Ativo", "entities_id": 0, "is_recursive": 1})
+
+    def table(self, itemtype):
+        return self.items.setdefault(itemtype, {})
+
+    def add(self, itemtype, data):
+        """
+        Cria um item
+
+        Returns:
+            tuple: (id, mensagem de erro)
+        """
+        if not isinstance(data, dict):
+            return None, "Input inválido"
+        with self.lock:
+            table = self.table(itemtype)
+            if itemtype in UNIQUE_NAMES and data.get("name"):
+                if any(item.get("name") == data["name"] for item in table.values()):
+                    return None, f"Duplicate entry '{data['name']}' for key 'unicity'"
+
+            item_id = self.next_ids.get(itemtype, 1)
+            self.next_ids[itemtype] = item_id + 1
+            item = dict(data, id=item_id)
+
+            if itemtype == "Entity":
+                parent = self.table("Entity").get(int(item.get("entities_id") or 0), self.table("Entity")[0])
+                item["entities_id"] = parent["id"]
+                item["completename"] = f"{parent['completename']} > {item.get('name', '')}"
+                item["level"] = parent.get("level", 1) + 1
+            if itemtype == "UserEmail" and item.get("users_id") in self.table("User"):
+                user = self.table("User")[item["users_id"]]
+                user.setdefault("emails", []).append(item.get("email"))
+
+            table[item_id] = item
+            return item_id, None
+
+    def update(self, itemtype, item_id, data):
+        with self.lock:
+            item = self.table(itemtype).get(item_id)
+            if item is None or not isinstance(data, dict):
+                return False
+            item.update({key: value for key, value in data.items() if key != "id"})
+            return True
+
+    def delete(self, itemtype, item_id):
+        with self.lock:
+            return self.table(itemtype).pop(item_id, None) is not None
+
+    def field_value(self, itemtype, item, field):
+        """Valor de um campo da busca para o item"""
+        attribute = SEARCH_FIELDS.get(itemtype, {}).get(field) or SEARCH_FIELDS["*"].get(field) or field
+        if itemtype == "User" and attribute == "email":
+            return MULTIVALUE_SEPARATOR.join(email for email in item.get("emails", []) if email) or None
+        if attribute in DROPDOWN_FIELDS:
+            try:
+                referenced = self.table(DROPDOWN_FIELDS[attribute]).get(int(item.get(attribute) or 0))
+            except (TypeError, ValueError):
+                referenced = None
+            return referenced.get("name") if referenced else None
+        return item.get(str(attribute))
+
+
+class MockGLPIServer:
+    """
+    Servidor HTTP local que simula a API REST do GLPI
+    Implementa os endpoints usados pelo projeto (initSession/killSession,
+    search/<itemtype>, GET/POST/PUT/DELETE de itens, sub-itens como
+    Line/<id>/Infocom e Contract/<id>/Contract_Supplier) com latência,
+    injeção de erros e paginação configuráveis, para medir e testar o input
+    sem um GLPI real.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 bad_request_rate=0.0, timeout_rate=0.0, timeout_delay=60.0, page_limit=1000,
+                 operators=DEFAULT_OPERATORS, random_seed=None, session_lifetime=None):
+        """
+        Inicializa o servidor (use start() para começar a atender)
+
+        Args:
+            host (str): Endereço de escuta
+            port (int): Porta (0 = escolhe uma porta livre)
+            latency (float): Latência fixa (segundos) de cada requisição
+            jitter (float): Latência extra aleatória (0 a jitter segundos)
+            error_rate (float): Fração das requisições que devolvem 500
+            bad_request_rate (float): Fração das requisições que devolvem 400
+            timeout_rate (float): Fração das requisições que demoram timeout_delay segundos
+            timeout_delay (float): Atraso usado para simular timeouts
+            page_limit (int): Máximo de itens por página em listas e buscas
+            operators (tuple): Operadoras de linha cadastradas na inicialização
+            random_seed (int): Semente do gerador usado na latência e nos erros
+            session_lifetime (float): Segundos até um token de sessão expirar (None = não expira)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bad_request_rate = bad_request_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_delay = timeout_delay
+        self.page_limit = page_limit
+        self.store = GLPIStore(operators)
+        self.session_lifetime = session_lifetime
+        # token -> instante de criação
+        self.sessions = {}
+        self.requests = {}
+        self._random = random.Random(random_seed)
+        self._stats_lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """URL base da API simulada (equivalente a GLPI_URL)"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/apirest.php"
+
+    def start(self):
+        """Começa a atender em uma thread em segundo plano"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Encerra o servidor"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def serve_forever(self):
+        """Atende na thread atual até ser interrompido"""
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count(self, method, endpoint):
+        with self._stats_lock:
+            key = f"{method} {endpoint}"
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def stats(self):
+        """
+        Returns:
+            dict: Número de requisições recebidas por "MÉTODO endpoint"
+        """
+        with self._stats_lock:
+            return dict(self.requests)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.requests.clear()
+
+    def session_valid(self, token):
+        """Indica se o token de sessão existe e ainda não expirou"""
+        created = self.sessions.get(token)
+        if created is None:
+            return False
+        if self.session_lifetime is not None and time.monotonic() - created > self.session_lifetime:
+            self.sessions.pop(token, None)
+            return False
+        return True
+
+    def expire_sessions(self):
+        """Invalida todos os tokens de sessão (simula expiração no meio da execução)"""
+        self.sessions.clear()
+
+    def chaos(self):
+        """
+        Aplica a latência e sorteia a falha simulada da requisição
+
+        Returns:
+            tuple: (status, corpo) da falha ou None se a requisição deve seguir
+        """
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        roll = self._random.random()
+        if roll < self.timeout_rate:
+            time.sleep(self.timeout_delay)
+            return 504, ["ERROR", "Tempo limite simulado"]
+        roll -= self.timeout_rate
+        if roll < self.error_rate:
+            return 500, ["ERROR", "Erro interno simulado"]
+        roll -= self.error_rate
+        if roll < self.bad_request_rate:
+            return 400, ["ERROR_BAD_REQUEST", "Erro simulado"]
+        return None
+
+
+def _parse_range(value, limit):
+    """Converte "a-b" em (início, fim) limitado a limit itens (padrão do GLPI: 0-49)"""
+    match = re.match(r"^(\d+)-(\d+)$", str(value or "0-49"))
+    start, end = (int(match.group(1)), int(match.group(2))) if match else (0, 49)
+    end = max(start, min(end, start + limit - 1))
+    return start, end
+
+
+def _make_handler(server):
+    store = server.store
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Cabeçalho e corpo são enviados em escritas separadas; sem isso o Nagle
+        # somado ao ACK atrasado adiciona ~40 ms a cada resposta em keep-alive
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            # Silencioso: o volume de requisições em benchmarks é grande
+            pass
+
+        def _send(self, status, body, headers=None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _body(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if not length:
+                return {}
+            try:
+                return json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return None
+
+        def _dispatch(self, method):
+            parsed = urlparse(self.path)
+            path = parsed.path
+            if "/apirest.php" in path:
+                path = path.split("/apirest.php", 1)[1]
+            parts = [part for part in path.strip("/").split("/") if part]
+            params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+            body = self._body() if method in ("POST", "PUT") else {}
+
+            endpoint = "/".join(parts[:2]) if parts[:1] == ["search"] else (parts[0] if parts else "")
+            if len(parts) > 2 and parts[0] != "search":
+                endpoint = f"{parts[0]}/:id/{parts[2]}"
+            server.count(method, endpoint)
+
+            failure = server.chaos()
+            if failure:
+                return self._send(*failure)
+
+            if parts == ["initSession"]:
+                token = uuid.uuid4().hex
+                server.sessions[token] = time.monotonic()
+                return self._send(200, {"session_token": token})
+
+            token = self.headers.get("Session-Token")
+            if not server.session_valid(token):
+                return self._send(401, ["ERROR_SESSION_TOKEN_INVALID", "session_token seems incorrect"])
+
+            if parts == ["killSession"]:
+                server.sessions.pop(token, None)
+                return self._send(200, [])
+            if not parts:
+                return self._send(400, ["ERROR_RESOURCE_NOT_FOUND_NOR_COMMONDBTM", ""])
+            if body is None:
+                return self._send(400, ["ERROR_JSON_PAYLOAD_INVALID", ""])
+
+            if parts[0] == "search" and len(parts) == 2 and method == "GET":
+                return self._search(parts[1], params)
+            itemtype = parts[0]
+            item_id = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+
+            if method == "GET" and item_id is None:
+                return self._list(itemtype, list(store.table(itemtype).values()), params)
+            if method == "GET" and len(parts) == 3:
+                return self._list(parts[2], self._sub_items(itemtype, item_id, parts[2]), params)
+            if method == "GET":
+                item = store.table(itemtype).get(item_id)
+                if item is None:
+                    return self._send(404, ["ERROR_ITEM_NOT_FOUND", ""])
+                return self._send(200, item)
+            if method == "POST":
+                return self._create(itemtype, body.get("input") if isinstance(body, dict) else None)
+            if method == "PUT":
+                data = body.get("input") if isinstance(body, dict) else None
+                target = item_id if item_id is not None else (data or {}).get("id")
+                if target is None or not store.update(itemtype, int(target), data):
+                    return self._send(400, ["ERROR_GLPI_UPDATE", "Item não encontrado"])
+                return self._send(200, [{str(target): True, "message": ""}])
+            if method == "DELETE":
+                if item_id is None or not store.delete(itemtype, item_id):
+                    return self._send(400, ["ERROR_GLPI_DELETE", "Item não encontrado"])
+                return self._send(200, [{str(item_id): True, "message": ""}])
+            return self._send(405, ["ERROR_METHOD_NOT_ALLOWED", ""])
+
+        def _sub_items(self, itemtype, item_id, sub_itemtype):
+            key = foreign_key(itemtype)
+            return [item for item in store.table(sub_itemtype).values()
+                    if (item.get("itemtype") == itemtype and item.get("items_id") == item_id)
+                    or item.get(key) == item_id]
+
+        def _list(self, itemtype, items, params):
+            start, end = _parse_range(params.get("range"), server.page_limit)
+            total = len(items)
+            page = items[start:end + 1]
+            headers = {"Content-Range": f"{start}-{start + max(len(page), 1) - 1}/{total}",
+                       "Accept-Range": f"{itemtype} {server.page_limit}"}
+            return self._send(206 if len(page) < total else 200, page, headers)
+
+        def _create(self, itemtype, data):
+            if isinstance(data, list):
+                results, failures = [], []
+                for entry in data:
+                    item_id, error = store.add(itemtype, entry)
+                    results.append({"id": item_id or False, "message": error or ""})
+                    if error:
+                        failures.append(error)
+                if data and len(failures) == len(data):
+                    return self._send(400, ["ERROR_GLPI_ADD", failures])
+                if failures:
+                    return self._send(207, [results, failures])
+                return self._send(201, results)
+
+            item_id, error = store.add(itemtype, data)
+            if error:
+                return self._send(400, ["ERROR_GLPI_ADD", error])
+            return self._send(201, {"id": item_id, "message": ""})
+
+        def _search(self, itemtype, params):
+            criteria = {}
+            display = []
+            for key, value in params.items():
+                match = re.match(r"^criteria\[(\d+)\]\[(\w+)\]$", key)
+                if match:
+                    criteria.setdefault(int(match.group(1)), {})[match.group(2)] = value
+                match = re.match(r"^forcedisplay\[(\d+)\]$", key)
+                if match:
+                    display.append(int(value) if str(value).isdigit() else value)
+
+            def field(value):
+                return int(value) if str(value).isdigit() else value
+
+            def matches(item):
+                result = None
+                for _, criterion in sorted(criteria.items()):
+                    current = store.field_value(itemtype, item, field(criterion.get("field", 1)))
+                    expected = str(criterion.get("value", ""))
+                    current_text = "" if current is None else str(current)
+                    if criterion.get("searchtype", "contains") == "equals":
+                        ok = current_text == expected or expected in current_text.split(MULTIVALUE_SEPARATOR)
+                    else:
+                        ok = expected.casefold() in current_text.casefold()
+                    link = criterion.get("link", "AND").upper()
+                    if result is None:
+                        result = ok
+                    elif link == "OR":
+                        result = result or ok
+                    else:
+                        result = result and ok
+                return True if result is None else result
+
+            found = [item for item in store.table(itemtype).values() if matches(item)]
+            start, end = _parse_range(params.get("range"), server.page_limit)
+            page = found[start:end + 1]
+            columns = display or list(DEFAULT_DISPLAY)
+            data = [{str(column): store.field_value(itemtype, item, column) for column in columns} for item in page]
+            headers = {"Content-Range": f"{start}-{start + max(len(page), 1) - 1}/{len(found)}"}
+            body = {"totalcount": len(found), "count": len(page), "data": data}
+            return self._send(206 if len(page) < len(found) else 200, body, headers)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_PUT(self):
+            self._dispatch("PUT")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+    return Handler
@@ -0,0 +1,126 @@
+import time
+import threading
+from contextlib import contextmanager
+from glpi_session.retry import TRANSIENT_STATUS
+
+
+class AdaptiveConcurrency:
+    """
+    Controle adaptativo (AIMD) do número de requisições simultâneas à API
+    A cada janela de requisições concluídas compara o p95 da latência e a taxa
+    de erros com as metas: dentro das metas o limite sobe 1 (aumento aditivo);
+    fora delas o limite é multiplicado por decrease_factor (redução multiplicativa).
+    """
+
+    def __init__(self, initial=2, min_limit=1, max_limit=16, target_p95=1.0, max_error_rate=0.02,
+                 window=20, decrease_factor=0.5):
+        """
+        Args:
+            initial (int): Limite inicial de requisições simultâneas
+            min_limit, max_limit (int): Faixa permitida para o limite
+            target_p95 (float): Meta do p95 da latência (segundos)
+            max_error_rate (float): Taxa máxima de erros (5xx, 429, falha de conexão) na janela
+            window (int): Requisições concluídas entre dois ajustes
+            decrease_factor (float): Fator aplicado ao limite quando as metas são violadas
+        """
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.target_p95 = float(target_p95)
+        self.max_error_rate = float(max_error_rate)
+        self.window = max(1, int(window))
+        self.decrease_factor = float(decrease_factor)
+
+        self._limit = min(self.max_limit, max(self.min_limit, int(initial)))
+        self._in_flight = 0
+        self._latencies = []
+        self._errors = 0
+        self._cond = threading.Condition()
+
+        # Estatísticas da execução
+        self._increases = 0
+        self._decreases = 0
+        self._peak = self._limit
+        self._low = self._limit
+        self._started = self._last_change = time.monotonic()
+        self._limit_seconds = 0.0
+
+    @property
+    def limit(self):
+        """Limite atual de requisições simultâneas"""
+        return self._limit
+
+    @contextmanager
+    def slot(self):
+        """Ocupa uma vaga de requisição, esperando enquanto o limite estiver atingido"""
+        with self._cond:
+            while self._in_flight >= self._limit:
+                self._cond.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify()
+
+    def observe(self, latency, status):
+        """
+        Registra o resultado de uma requisição e ajusta o limite ao fim de cada janela
+
+        Args:
+            latency (float): Duração da requisição em segundos
+            status (int): Status HTTP (None se a requisição falhou sem resposta)
+        """
+        with self._cond:
+            self._latencies.append(latency)
+            if status is None or status in TRANSIENT_STATUS:
+                self._errors += 1
+            if len(self._latencies) < self.window:
+                return
+
+            latencies = sorted(self._latencies)
+            p95 = latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))]
+            error_rate = self._errors / len(latencies)
+            self._latencies = []
+            self._errors = 0
+
+            if p95 <= self.target_p95 and error_rate <= self.max_error_rate:
+                new_limit = min(self.max_limit, self._limit + 1)
+            else:
+                new_limit = max(self.min_limit, int(self._limit * self.decrease_factor))
+            if new_limit == self._limit:
+                return
+
+            now = time.monotonic()
+            self._limit_seconds += self._limit * (now - self._last_change)
+            self._last_change = now
+            if new_limit > self._limit:
+                self._increases += 1
+            else:
+                self._decreases += 1
+            self._limit = new_limit
+            self._peak = max(self._peak, new_limit)
+            self._low = min(self._low, new_limit)
+            self._cond.notify_all()
+
+    def summary(self):
+        """
+        Resumo do controle na execução
+
+        Returns:
+            dict: limit (atual), min, max, avg (média no tempo), increases e decreases
+        """
+        with self._cond:
+            now = time.monotonic()
+            elapsed = now - self._started
+            weighted = self._limit_seconds + self._limit * (now - self._last_change)
+            return {
+                "limit": self._limit,
+                "min": self._low,
+                "max": self._peak,
+                "avg": round(weighted / elapsed, 2) if elapsed > 0 else float(self._limit),
+                "increases": self._increases,
+                "decreases": self._decreases,
+                "target_p95_ms": round(self.target_p95 * 1000, 1),
+                "max_error_rate": self.max_error_rate,
+            }
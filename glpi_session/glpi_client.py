@@ -0,0 +1,162 @@
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from helper.read_config import HEADERS
+from glpi_session.http_metrics import HTTPMetrics
+from glpi_session.retry import RetryPolicy, IDEMPOTENT_METHODS
+from glpi_session.session_pool import is_session_expired
+
+
+class GLPIClient:
+    """
+    Cliente HTTP da API REST do GLPI
+    Mantém um requests.Session com pool de conexões keep-alive, de modo que
+    as chamadas reaproveitam a mesma conexão TCP/TLS em vez de abrir uma nova
+    a cada requisição.
+    """
+
+    def __init__(self, base_url, session_token=None, pool_size=10, timeout=30, retry_policy=None):
+        """
+        Inicializa o cliente
+
+        Args:
+            base_url (str): URL base da API (ex: http://host/glpi/apirest.php)
+            session_token (str): Token de sessão do GLPI (opcional, pode ser definido depois)
+            pool_size (int): Número máximo de conexões mantidas no pool
+            timeout (float): Timeout padrão (segundos) de cada requisição
+            retry_policy (RetryPolicy): Política de novas tentativas (padrão: RetryPolicy())
+        """
+        self.base_url = str(base_url).rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.session_token = None
+        self.retry_policy = retry_policy or RetryPolicy()
+
+        # Métricas de cada requisição (contagem, status, latência e bytes por endpoint)
+        self.metrics = HTTPMetrics()
+
+        # Controle adaptativo de requisições simultâneas (AdaptiveConcurrency, opcional)
+        self.concurrency = None
+
+        # Pool de sessões (SessionPool, opcional); sem ele é usado session_token
+        self.sessions = None
+
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        self.http.headers.update(HEADERS)
+
+        if session_token:
+            self.set_session_token(session_token)
+
+    def set_session_token(self, session_token):
+        """Define o token de sessão enviado em todas as requisições"""
+        self.session_token = session_token
+        self.http.headers["Session-Token"] = session_token
+
+    def url(self, endpoint):
+        """Monta a URL completa de um endpoint (ex: 'search/User')"""
+        return f"{self.base_url}/{str(endpoint).lstrip('/')}"
+
+    def request(self, method, endpoint, retry=None, **kwargs):
+        """
+        Executa uma requisição na API usando o pool de conexões
+        Falhas transitórias (5xx, 429, conexão, timeout) de métodos idempotentes
+        são repetidas conforme a política de novas tentativas. POSTs só são
+        repetidos aqui com retry=True; quem cria itens deve verificar o resultado
+        antes de reenviar (ver post_asset).
+        Com um pool de sessões, cada thread envia o token do seu slot e um 401 de
+        sessão expirada renova o token e repete a requisição uma vez.
+
+        Args:
+            method (str): Método HTTP (GET, POST, PUT, DELETE)
+            endpoint (str): Endpoint relativo à URL base
+            retry (bool): Força (True) ou desativa (False) as novas tentativas
+            **kwargs: Argumentos repassados ao requests (params, json, timeout...)
+
+        Returns:
+            requests.Response: Resposta da API
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if retry is None:
+            retry = method.upper() in IDEMPOTENT_METHODS
+
+        # initSession autentica pelos headers fixos; um Session-Token explícito não é trocado
+        token = None
+        if self.sessions is not None and endpoint != "initSession" and "Session-Token" not in (kwargs.get("headers") or {}):
+            token = self.sessions.token()
+        renewed = False
+
+        attempt = 1
+        while True:
+            if token:
+                kwargs["headers"] = dict(kwargs.get("headers") or {}, **{"Session-Token": token})
+            try:
+                response = self._send(method, endpoint, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                delay = self.retry_policy.backoff(attempt) if retry else None
+                if delay is None:
+                    raise
+            else:
+                # Requisição recusada pela sessão expirada: nada foi gravado, pode repetir
+                if token and not renewed and is_session_expired(response):
+                    token = self.sessions.renew(token)
+                    renewed = True
+                    continue
+                if not retry or not self.retry_policy.is_transient(response):
+                    return response
+                delay = self.retry_policy.backoff(attempt, response)
+                if delay is None:
+                    return response
+
+            self.metrics.record_retry(method, endpoint)
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(self, method, endpoint, **kwargs):
+        """Executa uma única tentativa e registra suas métricas"""
+        if self.concurrency is None:
+            return self._timed_send(method, endpoint, **kwargs)
+        with self.concurrency.slot():
+            return self._timed_send(method, endpoint, **kwargs)
+
+    def _timed_send(self, method, endpoint, **kwargs):
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self.http.request(method, self.url(endpoint), **kwargs)
+            return response
+        finally:
+            latency = time.perf_counter() - started
+            status = response.status_code if response is not None else None
+            self.metrics.record(method, endpoint, status, latency,
+                                len(response.content) if response is not None else 0)
+            if self.concurrency is not None:
+                self.concurrency.observe(latency, status)
+
+    @property
+    def request_count(self):
+        """Total de requisições feitas por este cliente"""
+        return self.metrics.request_count
+
+    @property
+    def network_seconds(self):
+        """Tempo total (segundos) gasto esperando a API"""
+        return self.metrics.total_seconds
+
+    def get(self, endpoint, **kwargs):
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint, **kwargs):
+        return self.request("POST", endpoint, **kwargs)
+
+    def put(self, endpoint, **kwargs):
+        return self.request("PUT", endpoint, **kwargs)
+
+    def delete(self, endpoint, **kwargs):
+        return self.request("DELETE", endpoint, **kwargs)
+
+    def close(self):
+        """Fecha todas as conexões do pool"""
+        self.http.close()
@@ -1,14 +1,26 @@
-import requests
-from helper.read_config import GLPI_URL, HEADERS, APP_TOKEN, USER_TOKEN, HEADERS
+from helper.read_config import GLPI_URL, HTTP_POOL_SIZE, HTTP_TIMEOUT, RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+from glpi_session.glpi_client import GLPIClient
+from glpi_session.retry import RetryPolicy
+from glpi_session.session_pool import SessionPool
 
 
-def kill_session(session_token):
-    """Encerra a sessão na API do GLPI."""
-    requests.get(f"{GLPI_URL}/killSession", headers={**HEADERS, "Session-Token": session_token})
-
-def init_session():
-    """Inicia uma sessão na API do GLPI e retorna o token de sessão."""
-    r = requests.get(f"{GLPI_URL}/initSession", headers=HEADERS)
-    r.raise_for_status()
-    return r.json()["session_token"]
+def kill_session(client):
+    """Encerra as sessões na API do GLPI e fecha as conexões do cliente."""
+    try:
+        if client.sessions is not None:
+            client.sessions.close()
+        else:
+            client.get("killSession")
+    finally:
+        client.close()
 
+def init_session(pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT, base_url=None, sessions=1):
+    """
+    Inicia as sessões na API do GLPI e retorna um GLPIClient autenticado.
+    Com sessions > 1 cada thread usa um token próprio (o GLPI serializa as
+    requisições de uma mesma sessão); tokens expirados são renovados sozinhos.
+    """
+    policy = RetryPolicy(RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+    client = GLPIClient(base_url or GLPI_URL, pool_size=pool_size, timeout=timeout, retry_policy=policy)
+    client.sessions = SessionPool(client, sessions).open()
+    return client
@@ -0,0 +1,174 @@
+import os
+import re
+import json
+import threading
+from array import array
+
+# Segmentos numéricos do endpoint viram ":id" para agrupar as métricas (ex: Line/12/Infocom)
+_ID_SEGMENT = re.compile(r"^\d+$")
+
+
+def endpoint_label(endpoint):
+    """
+    Normaliza o endpoint para uso como rótulo das métricas
+
+    Args:
+        endpoint (str): Endpoint relativo (ex: 'Line/12/Infocom', 'search/User')
+
+    Returns:
+        tuple: (rótulo do endpoint, itemtype)
+    """
+    parts = [part for part in str(endpoint).split("?")[0].strip("/").split("/") if part]
+    label = "/".join(":id" if _ID_SEGMENT.match(part) else part for part in parts)
+    if parts[:1] == ["search"] and len(parts) > 1:
+        itemtype = parts[1]
+    else:
+        itemtype = parts[0] if parts else ""
+    return label, itemtype
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    position = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[position]
+
+
+class HTTPMetrics:
+    """
+    Métricas das requisições feitas à API do GLPI durante uma execução
+    Agrupa por método + endpoint (IDs trocados por ":id") e guarda contagem,
+    status HTTP, latências (para p50/p95/p99) e bytes recebidos.
+    Pode ser usada por vários workers ao mesmo tempo.
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, method, endpoint, status, latency, size=0):
+        """
+        Registra uma requisição
+
+        Args:
+            method (str): Método HTTP
+            endpoint (str): Endpoint relativo
+            status (int): Status HTTP (None se a requisição falhou sem resposta)
+            latency (float): Duração em segundos
+            size (int): Bytes recebidos no corpo da resposta
+        """
+        label, itemtype = endpoint_label(endpoint)
+        key = (method.upper(), label)
+        with self._lock:
+            entry = self._endpoints.get(key)
+            if entry is None:
+                entry = self._endpoints[key] = {
+                    "itemtype": itemtype, "count": 0, "errors": 0, "retries": 0, "bytes": 0,
+                    "status": {}, "latencies": array('d'),
+                }
+            entry["count"] += 1
+            entry["bytes"] += size or 0
+            status_key = str(status) if status is not None else "exception"
+            entry["status"][status_key] = entry["status"].get(status_key, 0) + 1
+            if status is None or status >= 400:
+                entry["errors"] += 1
+            entry["latencies"].append(latency)
+
+    def record_retry(self, method, endpoint):
+        """Registra que a requisição será repetida (após uma falha transitória já registrada)"""
+        key = (method.upper(), endpoint_label(endpoint)[0])
+        with self._lock:
+            if key in self._endpoints:
+                self._endpoints[key]["retries"] += 1
+
+    @property
+    def request_count(self):
+        with self._lock:
+            return sum(entry["count"] for entry in self._endpoints.values())
+
+    @property
+    def total_seconds(self):
+        with self._lock:
+            return sum(sum(entry["latencies"]) for entry in self._endpoints.values())
+
+    def summary(self):
+        """
+        Resumo por endpoint, ordenado pelo tempo total gasto
+
+        Returns:
+            list: Dicionários com method, endpoint, itemtype, count, errors, retries, status,
+                  bytes, total_seconds, avg_ms, p50_ms, p95_ms e p99_ms
+        """
+        with self._lock:
+            items = [(key, dict(entry, latencies=sorted(entry["latencies"]), status=dict(entry["status"])))
+                     for key, entry in self._endpoints.items()]
+
+        rows = []
+        for (method, label), entry in items:
+            latencies = entry["latencies"]
+            total = sum(latencies)
+            rows.append({
+                "method": method,
+                "endpoint": label,
+                "itemtype": entry["itemtype"],
+                "count": entry["count"],
+                "errors": entry["errors"],
+                "retries": entry["retries"],
+                "status": entry["status"],
+                "bytes": entry["bytes"],
+                "total_seconds": round(total, 3),
+                "avg_ms": round(total / len(latencies) * 1000, 1) if latencies else 0.0,
+                "p50_ms": round(_percentile(latencies, 0.50) * 1000, 1),
+                "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+                "p99_ms": round(_percentile(latencies, 0.99) * 1000, 1),
+            })
+        rows.sort(key=lambda row: -row["total_seconds"])
+        return rows
+
+    def write_json(self, path):
+        """Grava o resumo em JSON"""
+        _ensure_dir(path)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"endpoints": self.summary()}, f, ensure_ascii=False, indent=2)
+
+    def write_prometheus(self, path):
+        """Grava as métricas no formato textfile do Prometheus (node_exporter)"""
+        lines = [
+            "# HELP glpi_http_requests_total Requisições feitas à API do GLPI",
+            "# TYPE glpi_http_requests_total counter",
+        ]
+        summary = self.summary()
+        for row in summary:
+            for status, count in sorted(row["status"].items()):
+                lines.append(f'glpi_http_requests_total{{method="{row["method"]}",endpoint="{row["endpoint"]}",'
+                             f'itemtype="{row["itemtype"]}",status="{status}"}} {count}')
+        lines += [
+            "# HELP glpi_http_request_duration_seconds Latência das requisições à API do GLPI",
+            "# TYPE glpi_http_request_duration_seconds summary",
+        ]
+        for row in summary:
+            labels = f'method="{row["method"]}",endpoint="{row["endpoint"]}",itemtype="{row["itemtype"]}"'
+            for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                lines.append(f'glpi_http_request_duration_seconds{{{labels},quantile="{quantile}"}} {row[key] / 1000}')
+            lines.append(f'glpi_http_request_duration_seconds_sum{{{labels}}} {row["total_seconds"]}')
+            lines.append(f'glpi_http_request_duration_seconds_count{{{labels}}} {row["count"]}')
+        lines += [
+            "# HELP glpi_http_response_bytes_total Bytes recebidos da API do GLPI",
+            "# TYPE glpi_http_response_bytes_total counter",
+        ]
+        for row in summary:
+            lines.append(f'glpi_http_response_bytes_total{{method="{row["method"]}",endpoint="{row["endpoint"]}",'
+                         f'itemtype="{row["itemtype"]}"}} {row["bytes"]}')
+
+        # Escrita atômica: o node_exporter pode ler o arquivo a qualquer momento
+        _ensure_dir(path)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, path)
+
+
+def _ensure_dir(path):
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.exists(directory):
+        os.makedirs(directory)
@@ -0,0 +1,62 @@
+from helper.read_config import PAGE_SIZE
+
+
+def content_range_total(response):
+    """Lê o total de itens do header Content-Range ("0-999/1234"); None se ausente"""
+    content_range = response.headers.get("Content-Range", "") if hasattr(response, "headers") else ""
+    try:
+        return int(content_range.rsplit("/", 1)[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def iter_items(client, endpoint, params=None, page_size=None):
+    """
+    Percorre todos os itens de um endpoint de listagem ou de busca, página a página
+    Cada página é pedida com range=a-b e a próxima começa logo depois do último
+    item recebido (o servidor pode limitar a página abaixo do pedido). O fim é
+    detectado pelo total do Content-Range (ou totalcount da busca) ou, se não
+    houver total, por uma página incompleta. Os itens são entregues sob demanda,
+    sem guardar as páginas anteriores em memória.
+
+    Args:
+        client: GLPIClient da sessão ativa
+        endpoint (str): Endpoint de listagem (ex: 'Entity') ou de busca (ex: 'search/User')
+        params (dict): Parâmetros extras da requisição (criteria, forcedisplay...)
+        page_size (int): Itens por página (padrão: PAGE_SIZE)
+
+    Yields:
+        dict: Cada item retornado pela API (linhas de 'data' no caso de busca)
+
+    Raises:
+        requests.HTTPError: Se a API responder com erro
+    """
+    page_size = max(1, int(page_size or PAGE_SIZE))
+    start = 0
+    while True:
+        page_params = dict(params or {}, range=f"{start}-{start + page_size - 1}")
+        response = client.get(endpoint, params=page_params)
+        # O GLPI responde 400 (ERROR_RANGE_EXCEED_TOTAL) quando o início passa do total
+        if response.status_code == 400 and start > 0:
+            return
+        response.raise_for_status()
+
+        result = response.json()
+        if isinstance(result, dict):
+            items = result.get("data") or []
+            total = result.get("totalcount")
+        else:
+            items = result if isinstance(result, list) else []
+            total = None
+        total = content_range_total(response) if total is None else int(total)
+
+        yield from items
+
+        start += len(items)
+        if not items:
+            return
+        if total is not None:
+            if start >= total:
+                return
+        elif len(items) < page_size:
+            return
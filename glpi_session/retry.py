@@ -0,0 +1,100 @@
+import time
+import random
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+# Status HTTP considerados falhas transitórias
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+# Métodos que podem ser repetidos sem verificação (não criam itens duplicados)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE"}
+
+# Prazo da linha em processamento (por thread)
+_local = threading.local()
+
+
+@contextmanager
+def row_budget(seconds):
+    """
+    Limita o tempo total de novas tentativas dentro do bloco (ex: uma linha da planilha)
+
+    Args:
+        seconds (float): Tempo máximo do bloco (None ou 0 = sem limite)
+    """
+    previous = getattr(_local, "deadline", None)
+    _local.deadline = time.monotonic() + seconds if seconds else None
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def remaining_budget():
+    """Segundos restantes do prazo da linha atual (None se não há prazo)"""
+    deadline = getattr(_local, "deadline", None)
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class RetryPolicy:
+    """
+    Política de novas tentativas para falhas transitórias da API
+    Usa backoff exponencial limitado com jitter completo, respeita o header
+    Retry-After e nunca ultrapassa o prazo da linha em processamento.
+    """
+
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=30.0):
+        """
+        Args:
+            max_attempts (int): Número máximo de tentativas (incluindo a primeira)
+            base_delay (float): Espera base (segundos) da primeira nova tentativa
+            max_delay (float): Espera máxima (segundos) entre tentativas
+        """
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+
+    @staticmethod
+    def is_transient(response):
+        """Indica se a resposta é uma falha transitória (5xx, 429)"""
+        return response is not None and response.status_code in TRANSIENT_STATUS
+
+    @staticmethod
+    def retry_after(response):
+        """Lê o header Retry-After (segundos ou data HTTP); None se ausente"""
+        value = response.headers.get("Retry-After") if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def backoff(self, attempt, response=None):
+        """
+        Calcula a espera antes da próxima tentativa
+
+        Args:
+            attempt (int): Número de tentativas já feitas (1 = só a primeira)
+            response: Resposta da última tentativa (para Retry-After)
+
+        Returns:
+            float: Segundos a esperar
+            None: Se não deve haver nova tentativa (limite de tentativas ou prazo da linha)
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        delay = self.retry_after(response)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        delay = min(delay, self.max_delay)
+
+        remaining = remaining_budget()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
@@ -0,0 +1,80 @@
+import threading
+from helper.colors import c
+
+
+def is_session_expired(response):
+    """Indica se a resposta é o 401 do GLPI para token de sessão inválido ou expirado"""
+    if response is None or response.status_code != 401:
+        return False
+    text = response.text or ""
+    return "ERROR_SESSION_TOKEN_INVALID" in text or "session_token seems incorrect" in text
+
+
+class SessionPool:
+    """
+    Pool de tokens de sessão do GLPI
+    O GLPI serializa as requisições de uma mesma sessão PHP, então cada thread
+    usa um token fixo do pool (distribuídos em rodízio) e workers paralelos não
+    esperam uns pelos outros. Um token expirado é renovado com um novo initSession.
+    """
+
+    def __init__(self, client, size=1):
+        """
+        Args:
+            client: GLPIClient usado para abrir e encerrar as sessões
+            size (int): Número de sessões mantidas
+        """
+        self.client = client
+        self.size = max(1, int(size))
+        self.tokens = []
+        self.renewals = 0
+        self._next = 0
+        self._local = threading.local()
+        self._lock = threading.RLock()
+
+    def _open_token(self):
+        r = self.client.get("initSession")
+        r.raise_for_status()
+        return r.json()["session_token"]
+
+    def open(self):
+        """Abre as sessões do pool"""
+        self.tokens = [self._open_token() for _ in range(self.size)]
+        return self
+
+    def token(self):
+        """Token de sessão da thread atual"""
+        slot = getattr(self._local, "slot", None)
+        if slot is None:
+            with self._lock:
+                slot = self._local.slot = self._next % len(self.tokens)
+                self._next += 1
+        return self.tokens[slot]
+
+    def renew(self, expired_token):
+        """
+        Substitui um token expirado por uma nova sessão
+
+        Args:
+            expired_token (str): Token recusado pela API
+
+        Returns:
+            str: Token a usar (o novo, ou o que outra thread já renovou)
+        """
+        with self._lock:
+            if expired_token not in self.tokens:
+                return self.token()
+            slot = self.tokens.index(expired_token)
+            print(c("🔑 Sessão do GLPI expirada, abrindo uma nova...", 'yellow'))
+            self.tokens[slot] = self._open_token()
+            self.renewals += 1
+            return self.tokens[slot]
+
+    def close(self):
+        """Encerra todas as sessões do pool"""
+        for token in self.tokens:
+            try:
+                self.client.get("killSession", headers={"Session-Token": token})
+            except Exception as e:
+                print(c(f"⚠️ Não foi possível encerrar uma sessão: {e}", 'yellow'))
+        self.tokens = []
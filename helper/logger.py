@@ -155,8 +155,16 @@ class GLPILogger:
         emoji = "✅" if status == "OK" else "❌" if status == "ERRO" else "⚪"
         self._log_and_print('INFO', f"{emoji} Status {column_name}: {status}", 'cyan', show_terminal)
     
-    def statistics(self, total, success, errors, show_terminal=True):
-        """Log de estatísticas finais"""
+    def statistics(self, total, success, errors, show_terminal=True, http_summary=None, concurrency=None):
+        """
+        Log de estatísticas finais
+        
+        Args:
+            total, success, errors (int): Contadores de linhas
+            show_terminal (bool): Se deve exibir no terminal
+            http_summary (list): Resumo por endpoint de HTTPMetrics.summary() (opcional)
+            concurrency (dict): Resumo de AdaptiveConcurrency.summary() (opcional)
+        """
         self.separator("ESTATÍSTICAS FINAIS", show_terminal)
         self._log_and_print('INFO', f"📊 Total processado: {total}", 'cyan', show_terminal)
         self._log_and_print('INFO', f"✅ Sucessos: {success}", 'green', show_terminal)
@@ -165,6 +173,32 @@ class GLPILogger:
         if total > 0:
             success_rate = (success / total) * 100
             self._log_and_print('INFO', f"📈 Taxa de sucesso: {success_rate:.1f}%", 'cyan', show_terminal)
+        
+        if concurrency:
+            self._log_and_print('INFO', f"🎚️ Concorrência adaptativa: atual {concurrency['limit']} | "
+                                        f"mín {concurrency['min']} | máx {concurrency['max']} | média {concurrency['avg']} "
+                                        f"({concurrency['increases']} aumento(s), {concurrency['decreases']} redução(ões); "
+                                        f"meta p95 {concurrency['target_p95_ms']:.0f} ms, erros {concurrency['max_error_rate']:.0%})",
+                                'cyan', show_terminal)
+
+        if http_summary:
+            self.http_statistics(http_summary, show_terminal)
+    
+    def http_statistics(self, http_summary, show_terminal=True, limit=15):
+        """Log da tabela de requisições por endpoint (ordenada pelo tempo total)"""
+        self.separator("REQUISIÇÕES HTTP", show_terminal)
+        total_requests = sum(row["count"] for row in http_summary)
+        total_seconds = sum(row["total_seconds"] for row in http_summary)
+        self._log_and_print('INFO', f"🌐 {total_requests} requisição(ões) em {total_seconds:.1f}s", 'cyan', show_terminal)
+        header = f"{'Endpoint':<36} {'Qtd':>7} {'Erros':>6} {'Total s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'KB':>9}"
+        self._log_and_print('INFO', header, 'cyan', show_terminal)
+        for row in http_summary[:limit]:
+            name = f"{row['method']} {row['endpoint']}"[:36]
+            line = (f"{name:<36} {row['count']:>7} {row['errors']:>6} {row['total_seconds']:>8.2f} "
+                    f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['bytes'] / 1024:>9.1f}")
+            self._log_and_print('INFO', line, None, show_terminal)
+        if len(http_summary) > limit:
+            self._log_and_print('INFO', f"... e mais {len(http_summary) - limit} endpoint(s) (ver arquivo de métricas)", None, show_terminal)
     
     def close(self):
         """Fecha o logger e salva informações finais"""
@@ -14,3 +14,52 @@ HEADERS = {
     "App-Token": APP_TOKEN,
     "Authorization": f"user_token {USER_TOKEN}"
 }
+
+
+# Pool de conexões e timeout (segundos) das requisições à API
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+
+# Máximo de sessões (tokens) abertas no GLPI; cada worker usa uma sessão própria
+GLPI_SESSIONS = int(os.getenv("GLPI_SESSIONS", "4"))
+
+# Checkpoint das colunas de status: salva a planilha a cada N linhas ou T segundos
+STATUS_SAVE_EVERY_ROWS = int(os.getenv("STATUS_SAVE_EVERY_ROWS", "100"))
+STATUS_SAVE_EVERY_SECONDS = float(os.getenv("STATUS_SAVE_EVERY_SECONDS", "30"))
+# Intervalo mínimo entre os fsync do journal de status (0 = a cada linha)
+STATUS_FSYNC_SECONDS = float(os.getenv("STATUS_FSYNC_SECONDS", "1"))
+# Planilha gerada pelo modo --stream com os status (padrão: <planilha>.out.xlsx; a entrada não é alterada)
+STREAM_OUTPUT_PATH = os.getenv("STREAM_OUTPUT_PATH")
+
+# Itens por página nas listagens completas da API (range=a-b)
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "1000"))
+
+# Quantidade de Computers, Phones e Lines novos criados por requisição (1 = um a um)
+ASSET_BATCH_SIZE = int(os.getenv("ASSET_BATCH_SIZE", "50"))
+
+# Atualização de itens existentes: envia só os campos alterados (0 = sempre envia o payload completo)
+UPDATE_ONLY_CHANGED = os.getenv("UPDATE_ONLY_CHANGED", "1").strip().lower() not in ("0", "false", "no")
+
+# Novas tentativas em falhas transitórias (5xx, 429, timeout): backoff exponencial com jitter
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+# Tempo máximo (segundos) de novas tentativas por linha da planilha (0 = sem limite)
+ROW_TIME_BUDGET = float(os.getenv("ROW_TIME_BUDGET", "120"))
+
+# Controle adaptativo de concorrência (--adaptive): limite de requisições simultâneas
+# sobe enquanto o p95 da latência e a taxa de erros ficam dentro das metas
+ADAPTIVE_MAX_CONCURRENCY = int(os.getenv("ADAPTIVE_MAX_CONCURRENCY", "16"))
+ADAPTIVE_TARGET_P95_MS = float(os.getenv("ADAPTIVE_TARGET_P95_MS", "1000"))
+ADAPTIVE_MAX_ERROR_RATE = float(os.getenv("ADAPTIVE_MAX_ERROR_RATE", "0.02"))
+ADAPTIVE_WINDOW = int(os.getenv("ADAPTIVE_WINDOW", "20"))
+
+# Arquivos com as métricas HTTP da execução (JSON e textfile do Prometheus; vazio = não grava)
+HTTP_METRICS_JSON = os.getenv("HTTP_METRICS_JSON", "logs/http_metrics.json")
+HTTP_METRICS_PROM = os.getenv("HTTP_METRICS_PROM", "")
+
+# Banco SQLite com o progresso de cada linha, usado por --resume (padrão: <planilha>.run.db)
+RUN_JOURNAL_PATH = os.getenv("RUN_JOURNAL_PATH")
+
+# Banco SQLite com o hash e os IDs de cada linha já enviada, usado por --incremental (padrão: <planilha>.state.db)
+ROW_STATE_PATH = os.getenv("ROW_STATE_PATH")
@@ -0,0 +1,232 @@
+import datetime
+import unicodedata
+
+
+def _text(value):
+    """Texto sem espaços nas pontas (números inteiros sem '.0'); None se vazio"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    return text or None
+
+
+def _id(value):
+    """ID numérico (int); valores não numéricos ficam como texto"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    text = _text(value)
+    if text is not None and text.isdigit():
+        return int(text)
+    return text
+
+
+def _number(value):
+    """Número (aceita vírgula decimal); valores não numéricos ficam como texto"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    text = _text(value)
+    if text is None:
+        return None
+    try:
+        return float(text.replace(',', '.'))
+    except ValueError:
+        return text
+
+
+def _date(value):
+    """Datas do Excel ficam como datetime; textos (DD/MM/YYYY, YYYY-MM-DD) sem espaços"""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value
+    return _text(value)
+
+
+def _raw(value):
+    return value
+
+
+# Colunas do layout padrão da planilha, na ordem: (campo, cabeçalhos aceitos, conversão)
+COLUMNS = (
+    ("nome", ("Nome do User", "Nome"), _text),
+    ("email", ("email",), _text),
+    ("cpf", ("CPF",), _text),
+    ("email_corp", ("Email corp", "Email corporativo"), _text),
+    ("celular_pessoal", ("Celular pessoal",), _text),
+    ("posicao", ("Posição", "Cargo"), _text),
+    ("comentario_user", ("Comentario", "Comentario user"), _text),
+    ("status_user", ("Status", "Status user"), _id),
+    ("ent_a", ("Raiz", "Entidade A"), _text),
+    ("ent_b", ("new BU", "Entidade B"), _text),
+    ("ent_c", ("cliente", "Entidade C"), _text),
+    ("ent_d", ("Projeto", "Entidade D"), _text),
+    ("ent_comment", ("Dimensoes",), _text),
+    ("linha", ("Linha",), _text),
+    ("linha_operadora", ("Operadora",), _text),
+    ("contrato_linha", ("Contrato Linha",), _text),
+    ("line_status", ("Status linha",), _id),
+    ("line_type", ("Tipo de Linha",), _id),
+    ("fornecedor_linha", ("Fornecedor Linha",), _text),
+    ("data_inicial_linha", ("Data Inicial linha",), _date),
+    ("valor_linha", ("Valor linha",), _number),
+    ("cel_type", ("Tipo de Celular",), _id),
+    ("cel_marca", ("Marca do Celular",), _text),
+    ("cel_modelo", ("Modelo do Celular",), _text),
+    ("cel_imei", ("IMEI do Celular",), _text),
+    ("cel_status", ("Status telefone",), _id),
+    ("cel_coment", ("Comentario celular",), _text),
+    ("nb_marca", ("Fabricante Notebook",), _text),
+    ("nb_modelo", ("Modelo do Notebook",), _text),
+    ("nb_type", ("Tipo de computador",), _id),
+    ("nb_serial", ("Serial Number do Notebook",), _text),
+    ("nb_ativo", ("Ativo Notebook",), _text),
+    ("nb_armazenamento", ("Armazenamento Notebook",), _text),
+    ("nb_processador", ("Processador Notebook",), _text),
+    ("nb_memoria", ("Memoria RAM Notebook",), _text),
+    ("contrato_notebook", ("Contrato Notebook",), _text),
+    ("comprado_em_notebook", ("Comprado em Notebook",), _date),
+    ("fornecedor_notebook", ("Fornecedor do Notebook",), _text),
+    ("nb_coment", ("Comentario note",), _text),
+    ("nb_status", ("Status Notebook",), _id),
+)
+
+# Colunas de status preenchidas pelo input: (campo, cabeçalhos aceitos)
+STATUS_COLUMNS = (
+    ("input_user", ("Input User",)),
+    ("input_line", ("Input Line",)),
+    ("input_mobile", ("Input Mobile",)),
+    ("input_notebook", ("Input Notebook",)),
+)
+
+INPUT_FIELDS = tuple(name for name, _, _ in COLUMNS)
+STATUS_FIELDS = tuple(name for name, _ in STATUS_COLUMNS)
+
+
+def normalize_header(value):
+    """Cabeçalho em forma canônica (sem acentos, espaços extras ou maiúsculas)"""
+    text = unicodedata.normalize("NFKD", str(value))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.split()).casefold()
+
+
+class RowRecord:
+    """
+    Linha da planilha já normalizada: um atributo por coluna do layout
+    (textos sem espaços nas pontas, IDs como int, datas e valores convertidos).
+    Colunas ausentes na planilha ficam como None.
+    """
+
+    __slots__ = INPUT_FIELDS + STATUS_FIELDS
+
+    def inputs(self):
+        """Valores das colunas de entrada na ordem do layout padrão"""
+        return tuple(getattr(self, name) for name in INPUT_FIELDS)
+
+
+class RowSchema:
+    """
+    Mapeamento dos cabeçalhos da planilha para as colunas do layout
+    Montado uma única vez a partir da linha de cabeçalho, de modo que colunas
+    extras, fora de ordem ou ausentes não impedem o processamento: colunas
+    desconhecidas são ignoradas e as ausentes ficam vazias em todas as linhas.
+    Se nenhum cabeçalho for reconhecido, usa as posições do layout padrão.
+    """
+
+    def __init__(self, positions, status_columns, missing=(), unknown=(), added_status=()):
+        """
+        Args:
+            positions (dict): Campo -> índice (0-based) da coluna na planilha
+            status_columns (dict): Campo de status -> número (1-based) da coluna na planilha
+            missing (tuple): Campos de entrada sem coluna na planilha
+            unknown (tuple): Cabeçalhos da planilha que não fazem parte do layout
+            added_status (tuple): Campos de status sem coluna, acrescentados depois da última coluna
+        """
+        self.positions = positions
+        self.status_columns = status_columns
+        self.missing = tuple(missing)
+        self.unknown = tuple(unknown)
+        self.added_status = tuple(added_status)
+        # Plano de leitura: (campo, índice, conversão) compilado uma única vez
+        self._plan = tuple((name, positions.get(name), convert) for name, _, convert in COLUMNS)
+        self._plan += tuple((name, status_columns[name] - 1, _raw) for name in STATUS_FIELDS)
+
+    @classmethod
+    def default(cls):
+        """Layout padrão: 40 colunas de entrada seguidas das 4 colunas de status"""
+        positions = {name: index for index, name in enumerate(INPUT_FIELDS)}
+        status_columns = {name: len(INPUT_FIELDS) + offset + 1 for offset, name in enumerate(STATUS_FIELDS)}
+        return cls(positions, status_columns)
+
+    @classmethod
+    def from_header(cls, header):
+        """
+        Compila o schema a partir da linha de cabeçalho da planilha
+
+        Args:
+            header: Tupla com os valores da primeira linha
+
+        Returns:
+            RowSchema: Schema da planilha
+        """
+        header = tuple(header or ())
+        columns = {}
+        for index, value in enumerate(header):
+            if value is not None and str(value).strip():
+                columns.setdefault(normalize_header(value), index)
+
+        positions, known = {}, set()
+        for name, headers, _ in COLUMNS:
+            for alias in headers:
+                index = columns.get(normalize_header(alias))
+                if index is not None and index not in known:
+                    positions[name] = index
+                    known.add(index)
+                    break
+        if not positions:
+            return cls.default()
+
+        # Colunas de status ausentes são acrescentadas depois da última coluna
+        status_columns, added, next_column = {}, [], len(header) + 1
+        for name, headers in STATUS_COLUMNS:
+            index = next((columns[normalize_header(alias)] for alias in headers
+                          if normalize_header(alias) in columns), None)
+            if index is None or index in known:
+                status_columns[name] = next_column
+                added.append(name)
+                next_column += 1
+            else:
+                status_columns[name] = index + 1
+                known.add(index)
+
+        missing = [name for name in INPUT_FIELDS if name not in positions]
+        unknown = [str(value).strip() for index, value in enumerate(header)
+                   if index not in known and value is not None and str(value).strip()]
+        return cls(positions, status_columns, missing, unknown, added)
+
+    @staticmethod
+    def header_name(field):
+        """Cabeçalho padrão do campo (usado nas mensagens e nas colunas de status acrescentadas)"""
+        for name, headers in tuple((name, headers) for name, headers, _ in COLUMNS) + STATUS_COLUMNS:
+            if name == field:
+                return headers[0]
+        return field
+
+    def record(self, row):
+        """
+        Normaliza uma linha da planilha (uma única vez)
+
+        Args:
+            row: Tupla com os valores da linha
+
+        Returns:
+            RowRecord: Valores já convertidos
+        """
+        record = RowRecord()
+        size = len(row)
+        for name, index, convert in self._plan:
+            setattr(record, name, convert(row[index]) if index is not None and index < size else None)
+        return record
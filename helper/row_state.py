@@ -0,0 +1,161 @@
+import datetime
+import hashlib
+import sqlite3
+import threading
+import time
+from helper.run_journal import INPUT_COLUMNS, ID_KINDS
+
+
+def _normalize_cell(value):
+    """Valor da célula em forma canônica (espaços, datas e números inteiros)"""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def row_hash(row):
+    """
+    Calcula o hash das colunas de entrada de uma linha
+
+    Args:
+        row: Valores das colunas de entrada na ordem do layout padrão (RowRecord.inputs())
+
+    Returns:
+        str: Hash SHA-256 das colunas de entrada normalizadas
+    """
+    cells = tuple(_normalize_cell(value) for value in tuple(row[:INPUT_COLUMNS]))
+    cells += ("",) * (INPUT_COLUMNS - len(cells))
+    return hashlib.sha256(repr(cells).encode('utf-8')).hexdigest()
+
+
+class RowState:
+    """
+    Classe para guardar o estado das linhas já enviadas ao GLPI em um banco SQLite
+    Cada linha é identificada por uma chave natural (ver planner.row_key) e guarda
+    o hash das colunas de entrada e os IDs do usuário, linha, celular e notebook.
+    Diferente do RunJournal, o estado vale entre planilhas diferentes: no modo
+    incremental apenas as linhas novas ou com hash diferente são processadas, e
+    o estado de cada linha é gravado assim que ela é concluída sem erros.
+    """
+
+    def __init__(self, db_path):
+        """
+        Abre (ou cria) o arquivo de estado
+
+        Args:
+            db_path (str): Caminho do arquivo SQLite
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS row_state ("
+            " row_key TEXT PRIMARY KEY,"
+            " row_hash TEXT NOT NULL,"
+            " row INTEGER,"
+            " user_id INTEGER, line_id INTEGER, phone_id INTEGER, computer_id INTEGER,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def scan(self, rows):
+        """
+        Registra a chave e o hash de cada linha da planilha atual em uma tabela
+        temporária (em disco), sem manter a planilha inteira em memória.
+        Linhas repetidas (mesma chave) recebem um sufixo com a ocorrência.
+
+        Args:
+            rows: Iterável de (número da linha, chave, hash)
+        """
+        with self._lock:
+            self._conn.execute("DROP TABLE IF EXISTS temp.row_scan")
+            self._conn.execute(
+                "CREATE TEMP TABLE row_scan (row INTEGER PRIMARY KEY, raw_key TEXT NOT NULL,"
+                " row_key TEXT NOT NULL, row_hash TEXT NOT NULL)")
+            self._conn.executemany(
+                "INSERT INTO row_scan (row, raw_key, row_key, row_hash) VALUES (?, ?, ?, ?)",
+                ((row, key, key, digest) for row, key, digest in rows))
+            self._conn.execute("CREATE INDEX temp.row_scan_raw_key ON row_scan (raw_key, row)")
+            self._conn.execute("CREATE INDEX temp.row_scan_key ON row_scan (row_key)")
+            self._conn.execute(
+                "UPDATE row_scan SET row_key = raw_key || '#' || ("
+                " SELECT COUNT(*) FROM row_scan AS previous"
+                " WHERE previous.raw_key = row_scan.raw_key AND previous.row <= row_scan.row) "
+                "WHERE EXISTS (SELECT 1 FROM row_scan AS previous"
+                " WHERE previous.raw_key = row_scan.raw_key AND previous.row < row_scan.row)")
+            self._conn.commit()
+
+    def scanned(self):
+        """
+        Returns:
+            tuple: (linhas lidas, números das linhas cujo hash não mudou desde a última execução)
+        """
+        with self._lock:
+            (total,) = self._conn.execute("SELECT COUNT(*) FROM row_scan").fetchone()
+            cursor = self._conn.execute(
+                "SELECT scan.row FROM row_scan AS scan JOIN row_state AS state"
+                " ON state.row_key = scan.row_key AND state.row_hash = scan.row_hash")
+            return total, {row for (row,) in cursor}
+
+    def removed(self):
+        """
+        Returns:
+            list: Chaves gravadas que não aparecem na planilha atual (linhas removidas)
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT row_key FROM row_state WHERE row_key NOT IN (SELECT row_key FROM row_scan) ORDER BY row")
+            return [key for (key,) in cursor]
+
+    def entries(self, keys):
+        """
+        Returns:
+            list: (chave, número da linha, dict de IDs) das chaves informadas
+        """
+        keys = list(keys)
+        entries = []
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                cursor = self._conn.execute(
+                    f"SELECT row_key, row, {', '.join(ID_KINDS)} FROM row_state "
+                    f"WHERE row_key IN ({', '.join('?' * len(chunk))}) ORDER BY row", chunk)
+                for key, row, *ids in cursor:
+                    entries.append((key, row, {kind: item_id for kind, item_id in zip(ID_KINDS, ids) if item_id}))
+        return entries
+
+    def store(self, row_idx, ids):
+        """
+        Grava (ou substitui) o estado de uma linha concluída, com a chave e o hash lidos em scan()
+
+        Args:
+            row_idx (int): Número da linha
+            ids (dict): IDs do usuário, linha, celular e notebook da linha
+        """
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO row_state (row_key, row_hash, row, {', '.join(ID_KINDS)}, updated_at) "
+                f"SELECT row_key, row_hash, row, {', '.join('?' * len(ID_KINDS))}, ? FROM row_scan WHERE row = ?",
+                (*(ids.get(kind) for kind in ID_KINDS), time.time(), row_idx))
+            self._conn.commit()
+
+    def remove(self, keys):
+        """Descarta o estado das chaves informadas (linhas que saíram da planilha)"""
+        with self._lock:
+            self._conn.executemany("DELETE FROM row_state WHERE row_key = ?", ((key,) for key in keys))
+            self._conn.commit()
+
+    def clear(self):
+        """Descarta todo o estado (ex: execução completa após o reset do GLPI)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM row_state")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
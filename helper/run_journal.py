@@ -0,0 +1,175 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from helper.colors import c
+
+# Colunas de entrada do layout (as colunas de status não entram no fingerprint nem no hash)
+INPUT_COLUMNS = 40
+
+# Tipos de ID guardados por linha
+ID_KINDS = ("user_id", "line_id", "phone_id", "computer_id")
+
+
+def sheet_fingerprint(rows):
+    """
+    Calcula o fingerprint do conteúdo de entrada da planilha
+    Usa as colunas de entrada já mapeadas pelo schema, de modo que as colunas de
+    status (em qualquer posição) não mudam o fingerprint a cada checkpoint.
+
+    Args:
+        rows: Iterável com os valores de entrada de cada linha (RowRecord.inputs()), sem o cabeçalho
+
+    Returns:
+        str: Hash SHA-256 das colunas de entrada
+    """
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(repr(tuple(row[:INPUT_COLUMNS])).encode('utf-8'))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class RunJournal:
+    """
+    Classe para registrar o progresso da execução em um banco SQLite
+    Cada linha da planilha (identificada pelo fingerprint da planilha e pelo
+    número da linha) guarda seu estado (running, done, failed) e os IDs do
+    usuário, linha, celular e notebook criados. Uma execução com --resume pula
+    as linhas já concluídas e reprocessa apenas as que falharam ou não terminaram.
+    Uma linha só é concluída quando todos os seus ativos (inclusive os criados
+    em lote) foram finalizados.
+    """
+
+    def __init__(self, db_path, fingerprint, on_done=None):
+        """
+        Abre (ou cria) o journal
+
+        Args:
+            db_path (str): Caminho do arquivo SQLite
+            fingerprint (str): Fingerprint da planilha (sheet_fingerprint)
+            on_done: Função chamada com (linha, dict de IDs) quando uma linha é concluída sem erros (opcional)
+        """
+        self.db_path = db_path
+        self.fingerprint = fingerprint
+        self.on_done = on_done
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._failed = set()
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS run_rows ("
+            " fingerprint TEXT NOT NULL,"
+            " row INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " user_id INTEGER, line_id INTEGER, phone_id INTEGER, computer_id INTEGER,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (fingerprint, row))"
+        )
+        self._conn.commit()
+
+    def clear(self):
+        """Descarta o progresso registrado para esta planilha (execução do zero)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM run_rows WHERE fingerprint = ?", (self.fingerprint,))
+            self._conn.commit()
+
+    def completed_rows(self):
+        """
+        Returns:
+            set: Números das linhas já concluídas com sucesso
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT row FROM run_rows WHERE fingerprint = ? AND status = 'done'", (self.fingerprint,))
+            return {row for (row,) in cursor}
+
+    def begin(self, row_idx):
+        """Marca o início do processamento de uma linha"""
+        with self._lock:
+            self._pending[row_idx] = 1
+            self._failed.discard(row_idx)
+            self._conn.execute(
+                "INSERT INTO run_rows (fingerprint, row, status, updated_at) VALUES (?, ?, 'running', ?) "
+                "ON CONFLICT (fingerprint, row) DO UPDATE SET status = 'running', updated_at = excluded.updated_at",
+                (self.fingerprint, row_idx, time.time()))
+            self._conn.commit()
+
+    def record(self, row_idx, kind, item_id):
+        """
+        Guarda o ID de um item criado para a linha
+
+        Args:
+            row_idx (int): Número da linha
+            kind (str): Tipo do ID (user_id, line_id, phone_id, computer_id)
+            item_id (int): ID no GLPI
+        """
+        if kind not in ID_KINDS or not item_id or item_id is True:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE run_rows SET {kind} = ?, updated_at = ? WHERE fingerprint = ? AND row = ?",
+                (int(item_id), time.time(), self.fingerprint, row_idx))
+            self._conn.commit()
+
+    def hold(self, row_idx):
+        """Registra um ativo da linha que ainda será finalizado (ex: criação em lote)"""
+        with self._lock:
+            self._pending[row_idx] = self._pending.get(row_idx, 0) + 1
+
+    def release(self, row_idx, ok=True):
+        """
+        Finaliza um ativo (ou a própria linha) e conclui a linha quando nada mais estiver pendente
+
+        Args:
+            row_idx (int): Número da linha
+            ok (bool): Se o item foi processado com sucesso
+        """
+        with self._lock:
+            if not ok:
+                self._failed.add(row_idx)
+            remaining = self._pending.get(row_idx, 1) - 1
+            if remaining > 0:
+                self._pending[row_idx] = remaining
+                return
+
+            self._pending.pop(row_idx, None)
+            status = "failed" if row_idx in self._failed else "done"
+            self._failed.discard(row_idx)
+            self._conn.execute(
+                "UPDATE run_rows SET status = ?, updated_at = ? WHERE fingerprint = ? AND row = ?",
+                (status, time.time(), self.fingerprint, row_idx))
+            self._conn.commit()
+            if status != "done" or not self.on_done:
+                return
+            found = self._conn.execute(
+                f"SELECT {', '.join(ID_KINDS)} FROM run_rows WHERE fingerprint = ? AND row = ?",
+                (self.fingerprint, row_idx)).fetchone() or ()
+        self.on_done(row_idx, {kind: item_id for kind, item_id in zip(ID_KINDS, found) if item_id})
+
+    def fail(self, row_idx):
+        """
+        Marca a linha como falha (ex: usuário ou linha com ERRO na planilha)
+        A linha continua pendente até ser finalizada, mas não será concluída: --resume a reprocessa.
+        """
+        with self._lock:
+            if row_idx in self._pending:
+                self._failed.add(row_idx)
+                return
+            self._conn.execute(
+                "UPDATE run_rows SET status = 'failed', updated_at = ? WHERE fingerprint = ? AND row = ?",
+                (time.time(), self.fingerprint, row_idx))
+            self._conn.commit()
+
+    def finish(self, row_idx, ok):
+        """Marca o fim de process_row para a linha (os ativos em lote podem terminar depois)"""
+        self.release(row_idx, ok)
+
+    def close(self):
+        with self._lock:
+            if self._pending:
+                print(c(f"⚠️ {len(self._pending)} linha(s) não finalizada(s) no journal de execução", 'yellow'))
+            self._conn.close()
@@ -0,0 +1,310 @@
+import os
+import sys
+import json
+import time
+import atexit
+import signal
+import sqlite3
+import threading
+import openpyxl
+from helper.colors import c
+from helper.row_schema import RowSchema
+
+
+def stream_output_path(file_path):
+    """Planilha de saída do modo streaming: <nome>.out.xlsx ao lado da planilha de entrada"""
+    return f"{os.path.splitext(file_path)[0]}.out.xlsx"
+
+
+class StatusWriter:
+    """
+    Classe para gerenciar a gravação das colunas de status na planilha
+    Os status ficam em memória e a planilha só é regravada em checkpoints
+    (a cada N linhas, a cada T segundos e no encerramento). Cada status também
+    é anexado a um journal em disco, de modo que nada se perde entre checkpoints.
+    Pode ser usada por vários workers ao mesmo tempo.
+    
+    Sem workbook (modo streaming, wb=None) os status ficam apenas no journal e
+    são mesclados no encerramento em uma planilha de saída separada, lendo e
+    gravando as linhas em streaming, de modo que a memória não cresce com o
+    tamanho da planilha e a planilha de entrada (com formatação, validações e
+    comentários) nunca é regravada.
+    """
+
+    def __init__(self, wb, file_path, every_rows=100, every_seconds=30, journal_path=None, columns=None,
+                 fsync_seconds=1.0, output_path=None, base_path=None):
+        """
+        Inicializa o gravador de status
+
+        Args:
+            wb: Workbook do openpyxl (None = modo streaming)
+            file_path (str): Caminho onde a planilha é salva
+            every_rows (int): Salva a planilha a cada N linhas processadas
+            every_seconds (float): Salva a planilha se passaram T segundos do último salvamento
+            journal_path (str): Caminho do journal (padrão: <planilha>.status.journal)
+            columns (dict): Campo de status -> número da coluna (padrão: colunas 41-44 do layout padrão)
+            fsync_seconds (float): Intervalo mínimo entre os fsync do journal (0 = a cada linha)
+            output_path (str): Modo streaming: planilha gerada com os status (padrão: <planilha>.out.xlsx);
+                               a planilha de entrada nunca é substituída
+            base_path (str): Modo streaming: planilha na qual os status são mesclados (padrão: a de entrada;
+                             ex: a saída de uma execução anterior, ao retomar)
+        """
+        self.wb = wb
+        self.file_path = file_path
+        self.every_rows = max(1, int(every_rows))
+        self.every_seconds = float(every_seconds)
+        self.journal_path = journal_path or f"{file_path}.status.journal"
+        self.streaming = wb is None
+        self.columns = dict(columns or RowSchema.default().status_columns)
+        self.fsync_seconds = float(fsync_seconds)
+        self.output_path = output_path or stream_output_path(file_path)
+        self.base_path = base_path or file_path
+
+        self.pending = {}
+        self.rows_since_save = 0
+        self.last_save = time.monotonic()
+        self.last_fsync = self.last_save
+        self.closed = False
+        self.io_seconds = 0.0
+        self._lock = threading.RLock()
+
+        # Recupera status de uma execução anterior interrompida antes do checkpoint
+        # (no modo streaming o journal inteiro é lido apenas na mesclagem final)
+        if not self.streaming:
+            self._replay_journal()
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def _read_journal(self):
+        """Lê as entradas (linha, coluna, valor) registradas no journal"""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                    yield entry["row"], entry["column"], entry["value"]
+                except (ValueError, KeyError):
+                    # Última linha pode estar incompleta se o processo caiu durante a escrita
+                    continue
+
+    def _replay_journal(self):
+        """Carrega para memória os status registrados no journal e ainda não salvos"""
+        recovered = 0
+        for row_idx, column_idx, value in self._read_journal():
+            self.pending[(row_idx, column_idx)] = value
+            recovered += 1
+
+        if recovered:
+            print(c(f"🔄 {recovered} status recuperado(s) do journal '{self.journal_path}'", 'cyan'))
+
+    def set(self, row_idx, column_idx, value):
+        """
+        Registra o status de uma célula (em memória e no journal)
+
+        Args:
+            row_idx (int): Índice da linha (1-based)
+            column_idx (int): Índice da coluna (1-based)
+            value (str): Valor do status
+        """
+        line = json.dumps({"row": row_idx, "column": column_idx, "value": value}, ensure_ascii=False) + "\n"
+        with self._lock:
+            if not self.streaming:
+                self.pending[(row_idx, column_idx)] = value
+            self._journal.write(line)
+            self._journal.flush()
+
+    def row_done(self):
+        """
+        Marca o fim de uma linha e salva a planilha se a política de checkpoint exigir
+        O journal é levado ao disco (fsync) no máximo a cada fsync_seconds, fora da
+        trava compartilhada, para não serializar os workers a cada linha.
+        """
+        with self._lock:
+            self.rows_since_save += 1
+            now = time.monotonic()
+            if self.rows_since_save >= self.every_rows or now - self.last_save >= self.every_seconds:
+                self.checkpoint()
+                return
+            if self.closed or now - self.last_fsync < self.fsync_seconds:
+                return
+            self.last_fsync = now
+            fd = self._journal.fileno()
+        self._fsync(fd)
+
+    @staticmethod
+    def _fsync(fd):
+        try:
+            os.fsync(fd)
+        except (OSError, ValueError):
+            # O journal pode ter sido fechado por close() enquanto isso
+            pass
+
+    def checkpoint(self):
+        """
+        Aplica os status pendentes na planilha e salva o arquivo
+
+        Returns:
+            bool: True se salvou (ou não havia nada pendente), False se erro
+        """
+        with self._lock:
+            # No modo streaming o journal já é o checkpoint; a planilha só é gravada no final
+            if self.streaming or not self.pending:
+                if self.streaming and not self.closed:
+                    self._fsync(self._journal.fileno())
+                    self.last_fsync = time.monotonic()
+                self.rows_since_save = 0
+                self.last_save = time.monotonic()
+                return True
+
+            started = time.perf_counter()
+            try:
+                sheet = self.wb.active
+                for (row_idx, column_idx), value in self.pending.items():
+                    sheet.cell(row=row_idx, column=column_idx).value = value
+                self.wb.save(self.file_path)
+            except Exception as e:
+                print(c(f"❌ Erro ao salvar planilha: {e}", 'red'))
+                return False
+            finally:
+                self.io_seconds += time.perf_counter() - started
+
+            # Tudo que estava no journal agora está na planilha
+            self.pending.clear()
+            self._journal.truncate(0)
+            self._journal.seek(0)
+            self.rows_since_save = 0
+            self.last_save = time.monotonic()
+            return True
+
+    def close(self):
+        """
+        Faz o checkpoint final e remove o journal
+
+        Returns:
+            bool: True se a planilha foi salva com sucesso
+        """
+        with self._lock:
+            if self.closed:
+                return True
+            if self.streaming:
+                os.fsync(self._journal.fileno())
+                self._journal.close()
+                started = time.perf_counter()
+                saved = self._merge_journal()
+                self.io_seconds += time.perf_counter() - started
+            else:
+                saved = self.checkpoint()
+                self._journal.close()
+            if saved and os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self.closed = True
+            return saved
+
+    def _sorted_journal(self, db_path):
+        """
+        Ordena as entradas do journal por linha em um SQLite temporário (em disco)
+
+        Returns:
+            tuple: (conexão, quantidade de entradas)
+        """
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE status (seq INTEGER PRIMARY KEY, row INTEGER, col INTEGER, value TEXT)")
+        conn.executemany("INSERT INTO status (row, col, value) VALUES (?, ?, ?)",
+                         ((row_idx, column_idx, json.dumps(value)) for row_idx, column_idx, value in self._read_journal()))
+        conn.execute("CREATE INDEX status_row ON status (row, seq)")
+        conn.commit()
+        (count,) = conn.execute("SELECT COUNT(*) FROM status").fetchone()
+        return conn, count
+
+    @staticmethod
+    def _statuses_by_row(conn):
+        """
+        Percorre os status em ordem de linha (o último registrado em cada célula prevalece)
+
+        Yields:
+            tuple: (linha, dict coluna -> valor)
+        """
+        current, values = None, {}
+        for row_idx, column_idx, value in conn.execute("SELECT row, col, value FROM status ORDER BY row, seq"):
+            if row_idx != current:
+                if values:
+                    yield current, values
+                current, values = row_idx, {}
+            values[column_idx] = json.loads(value)
+        if values:
+            yield current, values
+
+    def _merge_journal(self):
+        """
+        Mescla os status do journal em streaming na planilha de saída (output_path)
+        A planilha base é lida em modo somente leitura e gravada linha a linha em
+        um arquivo temporário (write-only), que vira a planilha de saída no final;
+        a planilha de entrada não é alterada. Todas as abas são copiadas (só os
+        valores) e os status entram na aba ativa. O journal é ordenado por linha
+        em disco, de modo que a memória não cresce com a quantidade de status.
+
+        Returns:
+            bool: True se a planilha de saída foi gravada com sucesso
+        """
+        temp_path = f"{self.output_path}.tmp"
+        sort_path = f"{self.journal_path}.sort.db"
+        if os.path.exists(sort_path):
+            os.remove(sort_path)
+        conn = None
+        try:
+            conn, _ = self._sorted_journal(sort_path)
+            source = openpyxl.load_workbook(self.base_path, read_only=True)
+            target = openpyxl.Workbook(write_only=True)
+            active_title = source.active.title
+            for index, source_sheet in enumerate(source.worksheets):
+                out_sheet = target.create_sheet(source_sheet.title)
+                if source_sheet.title != active_title:
+                    for row in source_sheet.iter_rows(values_only=True):
+                        out_sheet.append(row)
+                    continue
+
+                target.active = index
+                statuses = self._statuses_by_row(conn)
+                pending = next(statuses, None)
+                last_row = 0
+                for row_idx, row in enumerate(source_sheet.iter_rows(values_only=True), start=1):
+                    last_row = row_idx
+                    # Status de linhas que não existem mais na planilha são descartados
+                    while pending and pending[0] < row_idx:
+                        pending = next(statuses, None)
+                    if pending and pending[0] == row_idx:
+                        row_statuses = pending[1]
+                        row = list(row)
+                        width = max(row_statuses)
+                        if len(row) < width:
+                            row.extend([None] * (width - len(row)))
+                        for column_idx, value in row_statuses.items():
+                            row[column_idx - 1] = value
+                        pending = next(statuses, None)
+                    out_sheet.append(row)
+                if pending:
+                    print(c(f"⚠️ Status de linhas após a linha {last_row} ignorados na mesclagem", 'yellow'))
+
+            source.close()
+            target.save(temp_path)
+            os.replace(temp_path, self.output_path)
+            return True
+        except Exception as e:
+            print(c(f"❌ Erro ao mesclar status na planilha: {e}", 'red'))
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+        finally:
+            if conn is not None:
+                conn.close()
+            if os.path.exists(sort_path):
+                os.remove(sort_path)
+
+    def register_exit_handlers(self):
+        """Garante o checkpoint final na saída do processo e ao receber SIGTERM"""
+        atexit.register(self.close)
+        try:
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+        except ValueError:
+            # signal só pode ser configurado na thread principal
+            pass
@@ -1,483 +1,831 @@
 
-import requests
-from create_info.glpi_objects.component import link_component
+from create_info.glpi_objects.component import link_component, ComponentLinkWriter
 from remove_data.remove_data import reset_glpi
 from helper.colors import c
-from create_info.create_entity_hierarchy import create_entity_hierarchy
+from create_info.create_entity_hierarchy import update_entity_comment
 from create_info.create_users import create_user
 from glpi_session.glpi_session import init_session, kill_session
+from glpi_session.retry import row_budget
+from glpi_session.concurrency import AdaptiveConcurrency
 from create_info.create_asset import create_asset
-from create_info.get_or_create import get_or_create_manufacturer, get_or_create_model, get_or_create
-from create_info.management import get_or_create_contract, link_contract_to_asset, create_management_info, get_or_create_supplier
-from helper.read_config import GLPI_URL, HEADERS
+from create_info.asset_batch import AssetBatchWriter
+from create_info.glpi_objects.dropdown_cache import reset_dropdown_cache
+from create_info.glpi_objects.entity_cache import reset_entity_cache
+from create_info.glpi_objects.user_index import reset_user_index
+from create_info.glpi_objects.contract_index import reset_contract_index
+from create_info.glpi_objects.component_index import reset_component_index
+from create_info.glpi_objects.asset_index import reset_asset_index
+from create_info.management import link_contract_to_asset, create_management_info, InfocomWriter
+from create_info.planner import ReferencePlan, build_reference_plan, row_key
 from helper.logger import get_logger, close_logger
-import openpyxl
+from helper.status_writer import StatusWriter, stream_output_path
+from helper.run_journal import RunJournal, sheet_fingerprint
+from helper.row_state import RowState, row_hash
+from helper.row_schema import RowSchema
 import openpyxl
 import os
-from helper.read_config import FILE_PATH
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait, as_completed
+from helper.read_config import GLPI_URL, FILE_PATH, HTTP_POOL_SIZE, STATUS_SAVE_EVERY_ROWS, STATUS_SAVE_EVERY_SECONDS, STATUS_FSYNC_SECONDS, STREAM_OUTPUT_PATH, ASSET_BATCH_SIZE, RUN_JOURNAL_PATH, HTTP_METRICS_JSON, HTTP_METRICS_PROM, ROW_TIME_BUDGET
+from helper.read_config import GLPI_SESSIONS, ADAPTIVE_MAX_CONCURRENCY, ADAPTIVE_TARGET_P95_MS, ADAPTIVE_MAX_ERROR_RATE, ADAPTIVE_WINDOW, ROW_STATE_PATH
 
 total_processado = 0
 total_sucesso = 0
 total_erro = 0
-session = None
+client = None
+
+# Linhas contadas como sucesso e linhas cujo ativo em lote falhou depois (contadas como erro)
+_rows_ok = set()
+_rows_failed = set()
+_counters_lock = threading.Lock()
+
+# Tempos da última execução (usados pelo benchmark)
+run_stats = {}
+
+# Tipo de ativo -> ID guardado no journal da execução
+ASSET_ID_KINDS = {"Line": "line_id", "Phone": "phone_id", "Computer": "computer_id"}
 
-def update_status_column(wb, row_idx, column_idx, status, description=None):
+# Tipo de ativo -> campo de status da planilha
+ASSET_STATUS_FIELDS = {"Line": "input_line", "Phone": "input_mobile", "Computer": "input_notebook"}
+
+def update_status_column(writer, row_idx, column_idx, status, description=None, journal=None):
     """
     Atualiza uma coluna de status na planilha
+    Um status ERRO também marca a linha como falha no journal, para que --resume a reprocesse.
     
     Args:
-        wb: Workbook do openpyxl
+        writer: StatusWriter da execução (grava em memória/journal até o próximo checkpoint)
         row_idx: Índice da linha (1-based)
-        column_idx: Índice da coluna (1-based) 
+        column_idx: Índice da coluna (1-based) ou campo de status do schema (ex: "input_user")
         status: Status básico ("OK", "ERRO", "" ou descrição específica)
         description: Descrição específica do erro (opcional)
+        journal: RunJournal da execução (opcional)
     """
+    if journal and status == "ERRO":
+        journal.fail(row_idx)
     try:
-        sheet = wb.active
-        
         # Se tem descrição específica, usa ela; senão usa o status
         final_status = description if description else status
+        column_idx = writer.columns.get(column_idx, column_idx)
         
-        sheet.cell(row=row_idx, column=column_idx).value = final_status
+        writer.set(row_idx, column_idx, final_status)
         return True
     except Exception as e:
         logger = get_logger()
         logger.error(f"Erro ao atualizar status na coluna {column_idx}: {e}")
         return False
 
-def save_excel_file(wb):
-    """Salva o arquivo Excel com as atualizações de status"""
-    try:
-        wb.save(FILE_PATH)
-        return True
-    except Exception as e:
-        print(c(f"❌ Erro ao salvar planilha: {e}", 'red'))
-        return False
+def _submit_asset(client, writer, assets, asset_type, payload, on_done, journal=None, idx=None):
+    """
+    Cria/atualiza o ativo e chama on_done(asset_id, error_message, created)
+    
+    Args:
+        client: GLPIClient da sessão ativa
+        writer: StatusWriter da execução
+        assets: AssetBatchWriter (criação em lote) ou None (criação individual)
+        asset_type: Tipo do ativo (Line, Phone, Computer)
+        payload: Dados do ativo
+        on_done: Função que finaliza o ativo (status, contrato, componentes...)
+        journal: RunJournal da execução (opcional)
+        idx: Índice da linha (1-based), usado no journal e nos status
+    """
+    if assets:
+        # No lote, on_done roda depois de process_row: a falha não chega ao tratamento da linha
+        finish_batched = on_done
+
+        def on_done(asset_id, error, created=False):
+            try:
+                finish_batched(asset_id, error, created)
+            except Exception as e:
+                get_logger().error(f"Erro ao finalizar {asset_type} da linha {idx}: {e}")
+                update_status_column(writer, idx, ASSET_STATUS_FIELDS[asset_type], "ERRO",
+                                     f"Erro geral: {str(e)[:50]}...", journal=journal)
+                _count_failure(idx)
+
+    if journal:
+        # A linha só é concluída no journal depois que o ativo for finalizado
+        journal.hold(idx)
+        finish_asset = on_done
+
+        def on_done(asset_id, error, created=False):
+            ok = False
+            try:
+                finish_asset(asset_id, error, created)
+                ok = bool(asset_id)
+                journal.record(idx, ASSET_ID_KINDS[asset_type], asset_id)
+            finally:
+                journal.release(idx, ok)
+
+    if assets:
+        # Ativos novos só são criados no envio do lote; on_done roda nesse momento
+        assets.submit(asset_type, payload, on_done)
+    else:
+        on_done(*create_asset(client, asset_type, payload))
 
-def main():
-    global total_processado, total_sucesso, total_erro, session
+def _journal_tracker(journal, idx):
+    """
+    Segura a linha no journal até cada item em lote (vínculo, Infocom) ser enviado
     
-    # Inicializa o logger
-    logger = get_logger()
+    Returns:
+        function: track() para link_component e create_management_info (None sem journal)
+    """
+    if not journal:
+        return None
+
+    def track():
+        journal.hold(idx)
+        # Falha desses itens não invalida a linha (mesmo comportamento do envio imediato)
+        return lambda ok: journal.release(idx)
+    return track
+
+def process_row(client, writer, idx, row, plan, assets=None, journal=None, links=None, infocoms=None):
+    """
+    Processa uma linha da planilha (entidades, usuário, linha, celular e notebook)
     
-    ### Valida se o arquivo existe
+    Args:
+        client: GLPIClient da sessão ativa
+        writer: StatusWriter da execução
+        idx: Índice da linha (1-based)
+        row: RowRecord com os valores da linha já normalizados
+        plan: ReferencePlan com os objetos de referência já resolvidos
+        assets: AssetBatchWriter para criar os ativos em lote (opcional)
+        journal: RunJournal que registra o progresso da linha (opcional)
+        links: ComponentLinkWriter para vincular os componentes em lote (opcional)
+        infocoms: InfocomWriter para criar o Infocom dos ativos novos em lote (opcional)
+    
+    Returns:
+        bool: True se a linha foi processada, False se houve erro geral
+        None: Se a linha foi ignorada (não entra nas estatísticas)
+    """
+    logger = get_logger()
+    logger.line_processing(idx)
     try:
-        logger.process_start("Processo de Input de dados no GLPI")
-
-        if not os.path.exists(FILE_PATH):
-            logger.error(f"Arquivo '{FILE_PATH}' não encontrado!")
-            return total_processado, total_sucesso, total_erro
-            
-        wb = openpyxl.load_workbook(FILE_PATH)
-        sheet = wb.active
-        if sheet.max_row < 2:
-            logger.error("Planilha vazia ou sem dados!")
-            return
-        session = init_session()
-    except Exception as e:
-        logger.error(f"Erro ao processar arquivo: {str(e)}")
-        if session:
-            kill_session(session)
-        return
+        # Cria entidades em cascata e pega o ID do último nível preenchido
+        if not row.ent_a:
+            logger.error(f"Entidade A obrigatória na linha {idx}")
+            return None
+        
+        entidade_final_id = None
+        entidade_final_id = plan.entity(client, row.ent_a, row.ent_b, row.ent_c, row.ent_d)
+        if entidade_final_id and row.ent_comment:
+            update_entity_comment(client, entidade_final_id, row.ent_comment)
 
-    ### Itera sobre as linhas da planilha, pulando o cabeçalho
-    for idx, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-        logger.line_processing(idx)
-        try:
-            # Desempacota os campos da linha (incluindo novos campos de usuário)
-            nome, email, cpf, email_corp, celular_pessoal, posicao, comentario_user, status_user, ent_a, ent_b, ent_c, ent_d, ent_comment, linha, linha_operadora, contrato_linha, line_status, line_type, fornecedor_linha, data_inicial_linha, valor_linha, cel_type, cel_marca, cel_modelo, cel_imei, cel_status, cel_coment, nb_marca, nb_modelo, nb_type, nb_serial, nb_ativo, nb_armazenamento, nb_processador, nb_memoria, contrato_notebook, comprado_em_notebook, fornecedor_notebook, nb_coment, nb_status, input_user, input_line, input_mobile, input_notebook = row
+        if not entidade_final_id:
+            logger.error(f"Falha ao criar hierarquia de entidades na linha {idx}")
+            return None
 
+        # Cria usuário e vincula sempre ao grupo 'User' e ao perfil Self-Service
+        user_id = None
+        if row.nome:
+            # Prioriza email corporativo se disponível, senão usa email padrão
+            email_principal = row.email_corp or row.email
             
-            # Cria entidades em cascata e pega o ID do último nível preenchido
-            if not ent_a:
-                logger.error(f"Entidade A obrigatória na linha {idx}")
-                continue
+            # Validação de email obrigatório
+            if not email_principal:
+                error_msg = "Email obrigatório ausente"
+                logger.error(f"{error_msg} para o usuário '{row.nome}' na linha {idx}")
+                update_status_column(writer, idx, "input_user", "ERRO", error_msg, journal=journal)
+                return None
             
-            entidade_final_id = None
-            entidade_final_id = create_entity_hierarchy(session, ent_a, ent_b, ent_c, ent_d, ent_comment)
-
-            if not entidade_final_id:
-                logger.error(f"Falha ao criar hierarquia de entidades na linha {idx}")
-                continue
-
-            # Cria usuário e vincula sempre ao grupo 'User' e ao perfil Self-Service
-            user_id = None
-            if nome and str(nome).strip():
-                # Prioriza email corporativo se disponível, senão usa email padrão
-                email_principal = email_corp if email_corp and str(email_corp).strip() else email
-                
-                # Validação de email obrigatório
-                if not email_principal or not email_principal.strip():
-                    error_msg = "Email obrigatório ausente"
-                    logger.error(f"{error_msg} para o usuário '{nome}' na linha {idx}")
-                    update_status_column(wb, idx, 41, "ERRO", error_msg)
-                    continue
-                
-                # Verifica se o email tem formato válido (deve conter @)
-                email_clean = str(email_principal).strip()
-                if '@' not in email_clean:
-                    error_msg = "Email inválido (sem @)"
-                    logger.error(f"{error_msg}: '{email_clean}' para o usuário '{nome}' na linha {idx}")
-                    update_status_column(wb, idx, 41, "ERRO", error_msg)
-                    continue
-                
-                perfil_id = 1  # ID do perfil a ser vinculado
-                
-                # Prepara email para uso (adiciona @ se necessário)
-                email_param = f"@{email_clean}" if not email_clean.startswith('@') else email_clean
-                
-                # Tratamento de CPF (agora opcional)
-                cpf_formatado = None
-                if cpf and str(cpf).strip():
-                    cpf_formatado = str(cpf).zfill(11)
-                    logger.debug(f"CPF fornecido e formatado: {cpf_formatado}")
-                else:
-                    logger.debug(f"CPF não fornecido - campo opcional")
-                
-                # Processa informações adicionais do usuário
-                celular_formatado = None
-                if celular_pessoal and str(celular_pessoal).strip():
-                    celular_formatado = str(celular_pessoal).strip()
-                    logger.debug(f"Celular pessoal fornecido: {celular_formatado}")
-                
-                posicao_formatada = None
-                if posicao and str(posicao).strip():
-                    posicao_formatada = str(posicao).strip()
-                    logger.debug(f"Posição fornecida: {posicao_formatada}")
-                    
-                comentario_formatado = None
-                if comentario_user and str(comentario_user).strip():
-                    comentario_formatado = str(comentario_user).strip()
-                    logger.debug(f"Comentário fornecido: {comentario_formatado}")
-
-                user_id, user_error = create_user(
-                    session, nome, email_param, perfil_id, entidade_final_id, 
-                    status_user, cpf_formatado, celular_formatado, 
-                    posicao_formatada, comentario_formatado
-                )
+            # Verifica se o email tem formato válido (deve conter @)
+            email_clean = email_principal
+            if '@' not in email_clean:
+                error_msg = "Email inválido (sem @)"
+                logger.error(f"{error_msg}: '{email_clean}' para o usuário '{row.nome}' na linha {idx}")
+                update_status_column(writer, idx, "input_user", "ERRO", error_msg, journal=journal)
+                return None
+            
+            perfil_id = 1  # ID do perfil a ser vinculado
+            
+            # Prepara email para uso (adiciona @ se necessário)
+            email_param = f"@{email_clean}" if not email_clean.startswith('@') else email_clean
+            
+            # Tratamento de CPF (agora opcional)
+            cpf_formatado = None
+            if row.cpf:
+                cpf_formatado = row.cpf.zfill(11)
+                logger.debug(f"CPF fornecido e formatado: {cpf_formatado}")
+            else:
+                logger.debug(f"CPF não fornecido - campo opcional")
+            
+            # Processa informações adicionais do usuário
+            celular_formatado = None
+            if row.celular_pessoal:
+                celular_formatado = row.celular_pessoal
+                logger.debug(f"Celular pessoal fornecido: {celular_formatado}")
+            
+            posicao_formatada = None
+            if row.posicao:
+                posicao_formatada = row.posicao
+                logger.debug(f"Posição fornecida: {posicao_formatada}")
                 
-                # Atualiza status do usuário na planilha
-                if user_id:
-                    update_status_column(wb, idx, 41, "OK")  # Coluna 41 = Input User
-                    logger.success(f"Usuário criado (ID: {user_id}) - Status atualizado: OK")
-                else:
-                    error_msg = user_error if user_error else "Falha ao criar usuário"
-                    update_status_column(wb, idx, 41, "ERRO", error_msg)
-                    logger.error(f"Falha ao criar usuário: {error_msg} - Status atualizado: {error_msg}")
+            comentario_formatado = None
+            if row.comentario_user:
+                comentario_formatado = row.comentario_user
+                logger.debug(f"Comentário fornecido: {comentario_formatado}")
+
+            user_id, user_error = create_user(
+                client, row.nome, email_param, perfil_id, entidade_final_id, 
+                row.status_user, cpf_formatado, celular_formatado, 
+                posicao_formatada, comentario_formatado
+            )
+            
+            # Atualiza status do usuário na planilha
+            # Usuário existente cuja atualização falhou: mantém o ID para os ativos, mas marca ERRO
+            if user_id and not user_error:
+                update_status_column(writer, idx, "input_user", "OK")
+                if journal:
+                    journal.record(idx, "user_id", user_id)
+                logger.success(f"Usuário criado (ID: {user_id}) - Status atualizado: OK")
             else:
-                # Se não há usuário para processar, marca como vazio
-                if not nome or str(nome).strip() == "":
-                    update_status_column(wb, idx, 41, "")
-                    logger.debug(f"Sem usuário para processar na linha {idx}")
-
-            # Cria ativos vinculados à entidade/usuário (apenas se campo preenchido)
-            if linha:
-                # Validação: verifica se operadora foi informada
-                if not linha_operadora or not str(linha_operadora).strip():
-                    error_msg = "Operadora não informada"
-                    logger.error(f"Linha '{linha}' não pode ser criada: {error_msg}")
-                    update_status_column(wb, idx, 42, "ERRO", error_msg)
-                else:
-                    # Busca ou cria a operadora
-                    operators_response = requests.get(f"{GLPI_URL}/LineOperator", headers={**HEADERS, "Session-Token": session})
-                    operators_list = operators_response.json()
-                    
-                    operator_id = None
+                error_msg = user_error if user_error else "Falha ao criar usuário"
+                update_status_column(writer, idx, "input_user", "ERRO", error_msg, journal=journal)
+                logger.error(f"Falha ao criar usuário: {error_msg} - Status atualizado: {error_msg}")
+        else:
+            # Se não há usuário para processar, marca como vazio
+            if not row.nome:
+                update_status_column(writer, idx, "input_user", "")
+                logger.debug(f"Sem usuário para processar na linha {idx}")
+
+        # Cria ativos vinculados à entidade/usuário (apenas se campo preenchido)
+        if row.linha:
+            # Validação: verifica se operadora foi informada
+            if not row.linha_operadora:
+                error_msg = "Operadora não informada"
+                logger.error(f"Linha '{row.linha}' não pode ser criada: {error_msg}")
+                update_status_column(writer, idx, "input_line", "ERRO", error_msg, journal=journal)
+            else:
+                # Operadora resolvida no planejamento (índice carregado uma única vez)
+                operator_id = plan.operator(client, row.linha_operadora)
+                                
+                if operator_id and operator_id > 0:  # Garante que o ID é válido
+                    print(c(f"✅ [OK] Operadora '{row.linha_operadora}' vinculada com sucesso", 'green'))
+
+                    line_data = {
+                    "name": row.linha,
+                    "entities_id": entidade_final_id,
+                    "users_id": user_id if user_id else 0,  # Usa 0 como fallback
+                    "lineoperators_id": operator_id,
+                    "linetypes_id": row.line_type,
+                    "states_id": row.line_status  # Para linhas, o campo correto é states_id
+                    }
                     
-                    # Procura na lista de operadoras
-                    if isinstance(operators_list, list):
-                        for operator in operators_list:
-                            if operator.get("name") == str(linha_operadora).strip():
-                                operator_id = operator.get("id")
-                                break
-                                    
-                    if operator_id and operator_id > 0:  # Garante que o ID é válido
-                        print(c(f"✅ [OK] Operadora '{linha_operadora}' vinculada com sucesso", 'green'))
-
-                        line_data = {
-                        "name": linha,
-                        "entities_id": entidade_final_id,
-                        "users_id": user_id if user_id else 0,  # Usa 0 como fallback
-                        "lineoperators_id": operator_id,
-                        "linetypes_id": line_type,
-                        "states_id": line_status  # Para linhas, o campo correto é states_id
-                        }
-                        
-                        # Remove o buy_date do payload da linha (será adicionado no Infocom)
-                        if "buy_date" in line_data:
-                            data_inicial_formatada = line_data.pop("buy_date")
+                    # Remove o buy_date do payload da linha (será adicionado no Infocom)
+                    if "buy_date" in line_data:
+                        data_inicial_formatada = line_data.pop("buy_date")
 
-                        # Cria a linha primeiro
-                        line_id, line_error = create_asset(session, "Line", line_data)
-                        
+                    # Finaliza a linha (status, infocom, contrato) assim que o ID estiver disponível
+                    def on_line_done(line_id, line_error, created=False):
+                        supplier_id = None
+                    
                         # Atualiza status da linha na planilha
                         if line_id:
-                            update_status_column(wb, idx, 42, "OK")  # Coluna 42 = Input Line
-                            logger.item_created("Line", line_id, linha)
-                            
-                            # Adiciona data inicial no Infocom (Management) da linha
-                            if data_inicial_linha and str(data_inicial_linha).strip():
-                                from create_info.line_infocom import create_or_update_line_infocom
-                                
-                                # Converte data se necessário
-                                data_formatada = str(data_inicial_linha).strip()
-                                if '/' in data_formatada:
-                                    try:
-                                        from datetime import datetime
-                                        data_obj = datetime.strptime(data_formatada, '%d/%m/%Y')
-                                        data_formatada = data_obj.strftime('%Y-%m-%d')
-                                    except:
-                                        print(c(f"⚠️ Formato de data inválido: {data_formatada}", 'yellow'))
-                                        data_formatada = None
-                                
-                                if data_formatada:
-                                    infocom_success = create_or_update_line_infocom(
-                                        session, line_id, buy_date=data_formatada, 
-                                        entities_id=entidade_final_id
-                                    )
-                                    if infocom_success:
-                                        print(c(f"📅 Data inicial salva no Management: {data_formatada}", 'green'))
-                                    else:
-                                        print(c(f"⚠️ Falha ao salvar data inicial no Management", 'yellow'))
+                            update_status_column(writer, idx, "input_line", "OK")
+                            logger.item_created("Line", line_id, row.linha)
                         else:
                             error_msg = line_error if line_error else "Falha ao criar linha"
-                            update_status_column(wb, idx, 42, "ERRO", error_msg)
+                            update_status_column(writer, idx, "input_line", "ERRO", error_msg, journal=journal)
                             logger.item_failed("Line", error_msg)
-                        
+                    
                         # Se a linha foi criada com sucesso, processa informações adicionais
                         if line_id:
                             # Processa contrato da linha
-                            if contrato_linha and str(contrato_linha).strip():
+                            if row.contrato_linha:
                                 supplier_id = None
-                                
+                            
                                 # Primeiro cria/busca o fornecedor se fornecido (na entidade raiz)
-                                if fornecedor_linha and str(fornecedor_linha).strip():
-                                    supplier_id = get_or_create_supplier(session, str(fornecedor_linha).strip())
-                                
+                                if row.fornecedor_linha:
+                                    supplier_id = plan.supplier(client, row.fornecedor_linha)
+                            
                                 # Cria/busca o contrato com o fornecedor (na entidade raiz)
-                                contract_id = get_or_create_contract(session, str(contrato_linha).strip(), supplier_id=supplier_id)
+                                contract_id = plan.contract(client, row.contrato_linha, row.fornecedor_linha)
                                 if contract_id:
-                                    link_contract_to_asset(session, "Line", line_id, contract_id)
-                            
-                            # Adiciona informações de Management
-                            if data_inicial_linha or valor_linha:
+                                    link_contract_to_asset(client, "Line", line_id, contract_id, is_new=created)
+                        
+                            # Data inicial, valor e fornecedor vão em uma única escrita do Infocom (Management)
+                            if row.data_inicial_linha or row.valor_linha:
                                 create_management_info(
-                                    session, 
+                                    client, 
                                     "Line", 
                                     line_id,
-                                    buy_date=data_inicial_linha if data_inicial_linha and str(data_inicial_linha).strip() else None,
-                                    value=valor_linha if valor_linha and str(valor_linha).strip() else None,
-                                    supplier_id=supplier_id
+                                    buy_date=row.data_inicial_linha,
+                                    value=row.valor_linha,
+                                    supplier_id=supplier_id,
+                                    entities_id=entidade_final_id,
+                                    is_new=created,
+                                    infocoms=infocoms,
+                                    track=_journal_tracker(journal, idx)
                                 )
-                            
+                        
                             # Processa fornecedor da linha (caso não tenha contrato mas tenha fornecedor)
-                            if not contrato_linha and fornecedor_linha and str(fornecedor_linha).strip():
-                                supplier_id = get_or_create_supplier(session, str(fornecedor_linha).strip())
+                            if not row.contrato_linha and row.fornecedor_linha:
+                                supplier_id = plan.supplier(client, row.fornecedor_linha)
                                 # Fornecedor criado na entidade raiz para uso futuro ou outros propósitos
-                    else:
-                        error_msg = f"Operadora '{linha_operadora}' não encontrada"
-                        logger.error(f"Não foi possível encontrar a operadora '{linha_operadora}'")
-                        update_status_column(wb, idx, 42, "ERRO", error_msg)  # Erro na operadora = erro na linha
-            else:
-                # Se não há linha para processar, marca como vazio
-                if not linha or str(linha).strip() == "":
-                    update_status_column(wb, idx, 42, "")
-                    logger.debug(f"Sem linha para processar na linha {idx}")
-
-            # Verifica se celular foi processado ou se não há celular
-            if cel_modelo:
-                # Format phone name to include brand and IMEI
-                phone_name = cel_modelo
-                if cel_marca and cel_imei and str(cel_imei).strip():
-                    phone_name = f"Celular {str(cel_marca).strip()} - {str(cel_imei).strip()}"
-                elif cel_imei and str(cel_imei).strip():
-                    phone_name = f"Celular - {str(cel_imei).strip()}"
-                
-                # Prepara os dados do telefone
-                # Garante que cel_type seja um valor válido (1=Celular por padrão)
-                phone_type_id = cel_type if cel_type and cel_type in [1, 2] else 1
-                
-                if not cel_type or cel_type not in [1, 2]:
-                    print(c(f"📱 Tipo de celular corrigido: {cel_type} → {phone_type_id} (Celular)", 'cyan'))
-                
-                phone_data = {
-                    "name": phone_name,
-                    "entities_id": entidade_final_id,
-                    "users_id": user_id if user_id else 0,  # Usa 0 como fallback
-                    "phonetypes_id": phone_type_id,
-                    "states_id": cel_status  # Corrigido: states_id ao invés de status
-                }
-
-                # Busca ou cria o modelo
-                if cel_modelo:
-                    model_id = get_or_create_model(session, cel_modelo, "Phone")
-                    if model_id:
-                        phone_data["phonemodels_id"] = model_id
-                    else:
-                        print(c(f"⚠️ [AVISO] Não foi possível criar/encontrar o modelo '{cel_modelo}'", 'yellow'))
-
-                # Busca ou cria o fabricante
-                if cel_marca and str(cel_marca).strip():
-                    manufacturer_id = get_or_create_manufacturer(session, str(cel_marca).strip())
-                    if manufacturer_id:
-                        phone_data["manufacturers_id"] = manufacturer_id
-                    else:
-                        print(c(f"⚠️ [AVISO] Não foi possível criar/encontrar o fabricante '{cel_marca}'", 'yellow'))
-
-                # Adiciona IMEI como número serial
-                if cel_imei and str(cel_imei).strip():
-                    phone_data["serial"] = str(cel_imei).strip()
-
-                if cel_coment and str(cel_coment).strip():
-                    phone_data["comment"] = str(cel_coment).strip()
-
-                phone_id, phone_error = create_asset(session, "Phone", phone_data)
-                
+
+                    _submit_asset(client, writer, assets, "Line", line_data, on_line_done, journal, idx)
+                else:
+                    error_msg = f"Operadora '{row.linha_operadora}' não encontrada"
+                    logger.error(f"Não foi possível encontrar a operadora '{row.linha_operadora}'")
+                    update_status_column(writer, idx, "input_line", "ERRO", error_msg, journal=journal)  # Erro na operadora = erro na linha
+        else:
+            # Se não há linha para processar, marca como vazio
+            if not row.linha:
+                update_status_column(writer, idx, "input_line", "")
+                logger.debug(f"Sem linha para processar na linha {idx}")
+
+        # Verifica se celular foi processado ou se não há celular
+        if row.cel_modelo:
+            # Format phone name to include brand and IMEI
+            phone_name = row.cel_modelo
+            if row.cel_marca and row.cel_imei:
+                phone_name = f"Celular {row.cel_marca} - {row.cel_imei}"
+            elif row.cel_imei:
+                phone_name = f"Celular - {row.cel_imei}"
+            
+            # Prepara os dados do telefone
+            # Garante que cel_type seja um valor válido (1=Celular por padrão)
+            phone_type_id = row.cel_type if row.cel_type and row.cel_type in [1, 2] else 1
+            
+            if not row.cel_type or row.cel_type not in [1, 2]:
+                print(c(f"📱 Tipo de celular corrigido: {row.cel_type} → {phone_type_id} (Celular)", 'cyan'))
+            
+            phone_data = {
+                "name": phone_name,
+                "entities_id": entidade_final_id,
+                "users_id": user_id if user_id else 0,  # Usa 0 como fallback
+                "phonetypes_id": phone_type_id,
+                "states_id": row.cel_status  # Corrigido: states_id ao invés de status
+            }
+
+            # Busca ou cria o modelo
+            if row.cel_modelo:
+                model_id = plan.model(client, row.cel_modelo, "Phone")
+                if model_id:
+                    phone_data["phonemodels_id"] = model_id
+                else:
+                    print(c(f"⚠️ [AVISO] Não foi possível criar/encontrar o modelo '{row.cel_modelo}'", 'yellow'))
+
+            # Busca ou cria o fabricante
+            if row.cel_marca:
+                manufacturer_id = plan.manufacturer(client, row.cel_marca)
+                if manufacturer_id:
+                    phone_data["manufacturers_id"] = manufacturer_id
+                else:
+                    print(c(f"⚠️ [AVISO] Não foi possível criar/encontrar o fabricante '{row.cel_marca}'", 'yellow'))
+
+            # Adiciona IMEI como número serial
+            if row.cel_imei:
+                phone_data["serial"] = row.cel_imei
+
+            if row.cel_coment:
+                phone_data["comment"] = row.cel_coment
+
+            # Finaliza o celular (status) assim que o ID estiver disponível
+            def on_phone_done(phone_id, phone_error, created=False):
                 # Atualiza status do celular na planilha
                 if phone_id:
-                    update_status_column(wb, idx, 43, "OK")  # Coluna 43 = Input Mobile
+                    update_status_column(writer, idx, "input_mobile", "OK")
                     logger.item_created("Phone", phone_id, phone_name)
                 else:
                     error_msg = phone_error if phone_error else "Falha ao criar celular"
-                    update_status_column(wb, idx, 43, "ERRO", error_msg)
+                    update_status_column(writer, idx, "input_mobile", "ERRO", error_msg, journal=journal)
                     logger.item_failed("Phone", error_msg)
-            else:
-                # Se não há celular para processar, marca como vazio
-                if not cel_modelo or str(cel_modelo).strip() == "":
-                    update_status_column(wb, idx, 43, "")
-                    logger.debug(f"Sem celular para processar na linha {idx}")
-
-            # Verifica se notebook foi processado ou se não há notebook  
-            if nb_modelo:
-                # Format computer name to include manufacturer and serial number
-                computer_name = f"Notebook {str(nb_marca).strip()} - {str(nb_serial).strip()}"
-                
-                # Busca ou cria o modelo
-                model_id = get_or_create_model(session, nb_modelo, "Computer")
-                if not model_id:
-                    print(c(f"⚠️ [AVISO] Não foi possível criar/encontrar o modelo '{nb_modelo}'", 'yellow'))
-                    continue
-
-                # Busca ou cria o fabricante
-                manufacturer_id = get_or_create_manufacturer(session, str(nb_marca).strip())
-                if not manufacturer_id:
-                    print(c(f"⚠️ [AVISO] Não foi possível criar/encontrar o fabricante '{nb_marca}'", 'yellow'))
-                    continue
-
-                computer_data = {
-                "name": computer_name,
-                "entities_id": entidade_final_id,
-                "users_id": user_id if user_id else 0,  # Usa 0 como fallback
-                "is_dynamic": 0,  # Garantir que não é um computador dinâmico
-                "computermodels_id": model_id,
-                "manufacturers_id": manufacturer_id,
-                "serial": nb_serial,
-                "otherserial": nb_ativo,
-                "computertypes_id": nb_type,
-                "states_id": nb_status  # Corrigido: states_id ao invés de status
-                }
-
-                if nb_coment and str(nb_coment).strip():
-                    computer_data["comment"] = str(nb_coment).strip()
-
-                # Cria o computador
-                computer_id, computer_error = create_asset(session, "Computer", computer_data)
-                
+
+            _submit_asset(client, writer, assets, "Phone", phone_data, on_phone_done, journal, idx)
+        else:
+            # Se não há celular para processar, marca como vazio
+            if not row.cel_modelo:
+                update_status_column(writer, idx, "input_mobile", "")
+                logger.debug(f"Sem celular para processar na linha {idx}")
+
+        # Verifica se notebook foi processado ou se não há notebook  
+        if row.nb_modelo:
+            # Format computer name to include manufacturer and serial number
+            computer_name = f"Notebook {str(row.nb_marca)} - {row.nb_serial}"
+            
+            # Busca ou cria o modelo
+            model_id = plan.model(client, row.nb_modelo, "Computer")
+            if not model_id:
+                print(c(f"⚠️ [AVISO] Não foi possível criar/encontrar o modelo '{row.nb_modelo}'", 'yellow'))
+                return None
+
+            # Busca ou cria o fabricante
+            manufacturer_id = plan.manufacturer(client, str(row.nb_marca))
+            if not manufacturer_id:
+                print(c(f"⚠️ [AVISO] Não foi possível criar/encontrar o fabricante '{row.nb_marca}'", 'yellow'))
+                return None
+
+            computer_data = {
+            "name": computer_name,
+            "entities_id": entidade_final_id,
+            "users_id": user_id if user_id else 0,  # Usa 0 como fallback
+            "is_dynamic": 0,  # Garantir que não é um computador dinâmico
+            "computermodels_id": model_id,
+            "manufacturers_id": manufacturer_id,
+            "serial": row.nb_serial,
+            "otherserial": row.nb_ativo,
+            "computertypes_id": row.nb_type,
+            "states_id": row.nb_status  # Corrigido: states_id ao invés de status
+            }
+
+            if row.nb_coment:
+                computer_data["comment"] = row.nb_coment
+
+            # Finaliza o notebook (status, contrato, management, componentes) assim que o ID estiver disponível
+            def on_computer_done(computer_id, computer_error, created=False):
                 # Atualiza status do notebook na planilha
                 if computer_id:
-                    update_status_column(wb, idx, 44, "OK")  # Coluna 44 = Input Notebook
+                    update_status_column(writer, idx, "input_notebook", "OK")
                     logger.item_created("Computer", computer_id, computer_name)
                 else:
                     error_msg = computer_error if computer_error else "Falha ao criar notebook"
-                    update_status_column(wb, idx, 44, "ERRO", error_msg)
+                    update_status_column(writer, idx, "input_notebook", "ERRO", error_msg, journal=journal)
                     logger.item_failed("Computer", error_msg)
-                
+            
                 # Se o computador foi criado com sucesso
                 if computer_id:
                     # Processa contrato do notebook
-                    if contrato_notebook and str(contrato_notebook).strip():
+                    if row.contrato_notebook:
                         supplier_id = None
-                        
+                    
                         # Primeiro cria/busca o fornecedor se fornecido (na entidade raiz)
-                        if fornecedor_notebook and str(fornecedor_notebook).strip():
-                            supplier_id = get_or_create_supplier(session, str(fornecedor_notebook).strip())
-                        
+                        if row.fornecedor_notebook:
+                            supplier_id = plan.supplier(client, row.fornecedor_notebook)
+                    
                         # Cria/busca o contrato com o fornecedor (na entidade raiz)
-                        contract_id = get_or_create_contract(session, str(contrato_notebook).strip(), supplier_id=supplier_id)
+                        contract_id = plan.contract(client, row.contrato_notebook, row.fornecedor_notebook)
                         if contract_id:
-                            link_contract_to_asset(session, "Computer", computer_id, contract_id)
-                    
+                            link_contract_to_asset(client, "Computer", computer_id, contract_id, is_new=created)
+                
                     # Processa informações de Management
-                    if comprado_em_notebook and str(comprado_em_notebook).strip():
+                    if row.comprado_em_notebook:
                         # Pegar o supplier_id do contrato do notebook
                         notebook_supplier_id = None
-                        if contrato_notebook and str(contrato_notebook).strip():
+                        if row.contrato_notebook:
                             # Buscar o supplier do contrato do notebook
-                            if fornecedor_notebook and str(fornecedor_notebook).strip():
-                                notebook_supplier_id = get_or_create_supplier(session, str(fornecedor_notebook).strip())
-                        
+                            if row.fornecedor_notebook:
+                                notebook_supplier_id = plan.supplier(client, row.fornecedor_notebook)
+                    
                         create_management_info(
-                            session,
+                            client,
                             "Computer", 
                             computer_id,
-                            buy_date=comprado_em_notebook,
-                            supplier_id=notebook_supplier_id
+                            buy_date=row.comprado_em_notebook,
+                            supplier_id=notebook_supplier_id,
+                            is_new=created,
+                            infocoms=infocoms,
+                            track=_journal_tracker(journal, idx)
                         )
 
                     # Linka componentes ao computador
-                    link_component(computer_id, nb_armazenamento, nb_processador, nb_memoria, session)
+                    link_component(computer_id, row.nb_armazenamento, row.nb_processador, row.nb_memoria, client,
+                                   device_ids=plan.devices, links=links, track=_journal_tracker(journal, idx),
+                                   is_new=created)
 
                 logger.success("Notebook e componentes processados com sucesso")
-            else:
-                # Se não há notebook para processar, marca como vazio
-                if not nb_modelo or str(nb_modelo).strip() == "":
-                    update_status_column(wb, idx, 44, "")
-                    logger.debug(f"Sem notebook para processar na linha {idx}")
 
-            logger.success(f"Linha {idx} processada com sucesso")
-            total_processado += 1
+            _submit_asset(client, writer, assets, "Computer", computer_data, on_computer_done, journal, idx)
+        else:
+            # Se não há notebook para processar, marca como vazio
+            if not row.nb_modelo:
+                update_status_column(writer, idx, "input_notebook", "")
+                logger.debug(f"Sem notebook para processar na linha {idx}")
+
+        logger.success(f"Linha {idx} processada com sucesso")
+        return True
+    except Exception as e:
+        logger.error(f"Erro na linha {idx}: {e}")
+        
+        # Em caso de erro geral, marca todas as colunas com a descrição do erro
+        error_description = f"Erro geral: {str(e)[:50]}..."  # Limita tamanho da mensagem
+        update_status_column(writer, idx, "input_user", "ERRO", error_description, journal=journal)
+        update_status_column(writer, idx, "input_line", "ERRO", error_description, journal=journal)
+        update_status_column(writer, idx, "input_mobile", "ERRO", error_description, journal=journal)
+        update_status_column(writer, idx, "input_notebook", "ERRO", error_description, journal=journal)
+        return False
+
+def run_row(client, writer, idx, row, plan, assets=None, journal=None, links=None, infocoms=None):
+    """Processa a linha registrando início e fim no journal da execução"""
+    if journal:
+        journal.begin(idx)
+    result = False
+    try:
+        # Novas tentativas de requisições da linha respeitam o prazo da linha
+        with row_budget(ROW_TIME_BUDGET):
+            result = process_row(client, writer, idx, row, plan, assets, journal, links, infocoms)
+        return result
+    finally:
+        if journal:
+            journal.finish(idx, bool(result))
+
+def _records(sheet, schema, skip=()):
+    """
+    Linhas da planilha (sem o cabeçalho) já normalizadas pelo schema
+
+    Yields:
+        tuple: (número da linha, RowRecord), exceto as linhas em skip
+    """
+    for idx, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
+        if idx not in skip:
+            yield idx, schema.record(row)
+
+def _row_keys(rows):
+    """
+    Chave natural e hash de cada linha da planilha (estado do modo incremental)
+    Linhas sem nenhum identificador usam o número da linha.
+
+    Yields:
+        tuple: (número da linha, chave, hash)
+    """
+    for idx, row in rows:
+        yield idx, row_key(row) or f"#{idx}", row_hash(row.inputs())
+
+def _count_result(idx, result):
+    """Atualiza os contadores globais com o resultado de process_row"""
+    global total_processado, total_sucesso, total_erro
+    if result is None:
+        return
+    with _counters_lock:
+        total_processado += 1
+        if result and idx not in _rows_failed:
             total_sucesso += 1
-            
-            # Salva as alterações de status na planilha após cada linha
-            save_excel_file(wb)
-        except Exception as e:
-            logger.error(f"Erro na linha {idx}: {e}")
-            total_processado += 1
+            _rows_ok.add(idx)
+        else:
             total_erro += 1
+
+def _count_failure(idx):
+    """
+    Conta como erro a linha cujo ativo em lote falhou ao ser finalizado
+    Se a linha já foi contada como sucesso, passa para erro; se ainda não foi
+    contada, _count_result a conta como erro.
+    """
+    global total_sucesso, total_erro
+    with _counters_lock:
+        if idx in _rows_failed:
+            return
+        _rows_failed.add(idx)
+        if idx in _rows_ok:
+            _rows_ok.discard(idx)
+            total_sucesso -= 1
+            total_erro += 1
+
+def main(workers=1, batch_size=ASSET_BATCH_SIZE, stream=False, resume=False, file_path=None, base_url=None, adaptive=False,
+         incremental=False, report_removed=False):
+    """
+    Executa o input de dados da planilha no GLPI
+    
+    Args:
+        workers: Número de linhas processadas em paralelo (1 = sequencial)
+        adaptive: Ajusta as requisições simultâneas conforme a latência e os erros do GLPI
+                  (até workers, ou ADAPTIVE_MAX_CONCURRENCY se workers = 1)
+        batch_size: Computers, Phones e Lines novos criados por requisição (1 = um a um)
+        stream: Lê a planilha em modo somente leitura e grava os status só no final
+        resume: Pula as linhas concluídas em uma execução anterior da mesma planilha
+        incremental: Processa só as linhas novas ou alteradas desde a última execução (ROW_STATE_PATH)
+        report_removed: No modo incremental, lista as linhas que saíram da planilha
+        file_path: Planilha de entrada (padrão: FILE_PATH do .env)
+        base_url: URL da API do GLPI (padrão: GLPI_URL do .env)
+    
+    Returns:
+        tuple: (total_processado, total_sucesso, total_erro)
+    """
+    global total_processado, total_sucesso, total_erro, client, run_stats
+    # Contadores e tempos valem por execução (main() pode ser chamada várias vezes no mesmo processo)
+    total_processado = total_sucesso = total_erro = 0
+    _rows_ok.clear()
+    _rows_failed.clear()
+    run_stats = {}
+    file_path = file_path or FILE_PATH
+    started = time.perf_counter()
+    controller = None
+    if adaptive:
+        # workers passa a ser o teto; o controle define quantas requisições ficam em andamento
+        workers = workers if workers > 1 else ADAPTIVE_MAX_CONCURRENCY
+        controller = AdaptiveConcurrency(initial=min(2, workers), max_limit=workers,
+                                         target_p95=ADAPTIVE_TARGET_P95_MS / 1000,
+                                         max_error_rate=ADAPTIVE_MAX_ERROR_RATE, window=ADAPTIVE_WINDOW)
+    
+    # Inicializa o logger
+    logger = get_logger()
+    
+    ### Valida se o arquivo existe
+    try:
+        logger.process_start("Processo de Input de dados no GLPI")
+
+        if not os.path.exists(file_path):
+            logger.error(f"Arquivo '{file_path}' não encontrado!")
+            return total_processado, total_sucesso, total_erro
             
-            # Em caso de erro geral, marca todas as colunas com a descrição do erro
-            error_description = f"Erro geral: {str(e)[:50]}..."  # Limita tamanho da mensagem
-            update_status_column(wb, idx, 41, "ERRO", error_description)  # Input User
-            update_status_column(wb, idx, 42, "ERRO", error_description)  # Input Line  
-            update_status_column(wb, idx, 43, "ERRO", error_description)  # Input Mobile
-            update_status_column(wb, idx, 44, "ERRO", error_description)  # Input Notebook
-            save_excel_file(wb)
-
-    kill_session(session)
+        # No modo streaming as linhas são lidas sob demanda, sem carregar a planilha inteira
+        wb = openpyxl.load_workbook(file_path, read_only=stream)
+        load_seconds = time.perf_counter() - started
+        sheet = wb.active
+        if sheet.max_row is not None and sheet.max_row < 2:
+            logger.error("Planilha vazia ou sem dados!")
+            return
+        # Pool de conexões com pelo menos uma conexão por worker
+        client = init_session(pool_size=max(HTTP_POOL_SIZE, workers), base_url=base_url or GLPI_URL,
+                              sessions=min(workers, GLPI_SESSIONS))
+        client.concurrency = controller
+        reset_dropdown_cache()
+        reset_entity_cache()
+        reset_user_index()
+        reset_contract_index()
+        reset_component_index()
+        reset_asset_index()
+
+        # Colunas mapeadas pelo cabeçalho: colunas extras, fora de ordem ou ausentes não quebram as linhas
+        schema = RowSchema.from_header(next(sheet.iter_rows(max_row=1, values_only=True), ()))
+        if schema.missing:
+            names = ", ".join(RowSchema.header_name(name) for name in schema.missing)
+            logger.warning(f"Coluna(s) não encontrada(s) na planilha, tratadas como vazias: {names}")
+        if schema.unknown:
+            logger.warning(f"Coluna(s) desconhecida(s) ignorada(s): {', '.join(schema.unknown)}")
+        
+        # Status ficam em memória/journal e a planilha só é salva nos checkpoints
+        # No modo streaming os status vão para uma planilha de saída separada; ao retomar,
+        # a saída da execução anterior é a base, para manter os status já gravados
+        output_path = STREAM_OUTPUT_PATH or stream_output_path(file_path)
+        base_path = output_path if stream and resume and os.path.exists(output_path) else file_path
+        writer = StatusWriter(None if stream else wb, file_path, every_rows=STATUS_SAVE_EVERY_ROWS, every_seconds=STATUS_SAVE_EVERY_SECONDS,
+                              columns=schema.status_columns, fsync_seconds=STATUS_FSYNC_SECONDS,
+                              output_path=output_path, base_path=base_path)
+        writer.register_exit_handlers()
+        for name in schema.added_status:
+            writer.set(1, schema.status_columns[name], RowSchema.header_name(name))
+
+        # Journal da execução, identificado pelo conteúdo de entrada da planilha
+        journal = RunJournal(RUN_JOURNAL_PATH or f"{file_path}.run.db",
+                             sheet_fingerprint(row.inputs() for _, row in _records(sheet, schema)))
+        if resume:
+            completed = journal.completed_rows()
+            logger.info(f"Retomando execução: {len(completed)} linha(s) já concluída(s) serão puladas")
+        else:
+            journal.clear()
+            completed = set()
+
+        # Estado entre execuções: chave natural, hash e IDs de cada linha já enviada
+        state = RowState(ROW_STATE_PATH or f"{file_path}.state.db")
+        removed = []
+        if incremental:
+            # Chave e hash de cada linha vão para uma tabela temporária do estado, não para a memória
+            state.scan(_row_keys(_records(sheet, schema)))
+            total, unchanged = state.scanned()
+            completed |= unchanged
+            logger.info(f"Modo incremental: {len(unchanged)} linha(s) sem alteração serão puladas, "
+                        f"{total - len(unchanged)} nova(s) ou alterada(s)")
+            removed = state.removed()
+            if removed:
+                logger.warning(f"{len(removed)} linha(s) da execução anterior não estão mais na planilha")
+                if report_removed:
+                    for key, row_number, ids in state.entries(removed):
+                        shown = ", ".join(f"{kind}={item_id}" for kind, item_id in ids.items()) or "sem IDs"
+                        logger.warning(f"Linha removida (antes linha {row_number}): {key} - {shown}")
+            # Hash e IDs de cada linha concluída sem erros são gravados assim que ela termina
+            journal.on_done = state.store
+        elif not resume:
+            # Execução completa: o estado anterior não vale mais (o GLPI foi resetado)
+            state.clear()
+    except Exception as e:
+        logger.error(f"Erro ao processar arquivo: {str(e)}")
+        if client:
+            kill_session(client)
+        return
+
+    ### Fase 1: resolve uma única vez cada objeto de referência distinto da planilha
+    try:
+        plan = build_reference_plan(client, _records(sheet, schema, completed), workers=workers)
+        for operator, row_numbers in plan.unknown_operators.items():
+            shown = ", ".join(str(number) for number in row_numbers[:20])
+            more = f" e mais {len(row_numbers) - 20}" if len(row_numbers) > 20 else ""
+            logger.warning(f"Operadora '{operator}' não encontrada no GLPI - {len(row_numbers)} linha(s): {shown}{more}")
+    except Exception as e:
+        logger.warning(f"Falha no planejamento, referências serão resolvidas linha a linha: {e}")
+        plan = ReferencePlan()
+
+    ### Fase 2: itera sobre as linhas da planilha, pulando o cabeçalho
+    # Ativos novos vão para uma fila e são criados em lote
+    assets = AssetBatchWriter(client, batch_size) if batch_size > 1 else None
+    # Vínculos de componentes (Item_Device*) de vários notebooks vão em um único POST por tipo
+    links = ComponentLinkWriter(client, batch_size) if batch_size > 1 else None
+    # Infocom dos ativos recém-criados também vai em lote
+    infocoms = InfocomWriter(client, batch_size) if batch_size > 1 else None
+    rows = _records(sheet, schema, completed)
+    if workers <= 1:
+        for idx, row in rows:
+            _count_result(idx, run_row(client, writer, idx, row, plan, assets, journal, links, infocoms))
+            # Salva a planilha apenas quando a política de checkpoint exigir
+            writer.row_done()
+    else:
+        # Janela limitada de linhas em andamento para não carregar a planilha inteira em futures
+        if controller:
+            logger.info(f"Processando linhas em paralelo com concorrência adaptativa (até {workers})")
+        else:
+            logger.info(f"Processando linhas em paralelo com {workers} workers")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # future -> número da linha
+            in_flight = {}
+            for idx, row in rows:
+                in_flight[executor.submit(run_row, client, writer, idx, row, plan, assets, journal, links, infocoms)] = idx
+                # Com o controle adaptativo a janela acompanha o limite atual
+                if len(in_flight) >= (controller.limit if controller else workers) * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        _count_result(in_flight.pop(future), future.result())
+                        writer.row_done()
+            for future in as_completed(in_flight):
+                _count_result(in_flight[future], future.result())
+                writer.row_done()
+
+    # Cria os ativos que ficaram na fila
+    if assets:
+        assets.flush()
+    # Depois dos ativos, pois os notebooks criados no flush enfileiram seus vínculos
+    if links:
+        links.flush()
+    if infocoms:
+        infocoms.flush()
+
+    kill_session(client)
+    # Linhas que saíram da planilha não valem mais para a próxima execução incremental
+    state.remove(removed)
+    state.close()
+    journal.close()
     
     # Usar o logger para estatísticas finais  
     logger = get_logger()
     
     # Salvamento final da planilha
-    if save_excel_file(wb):
-        logger.success("Planilha salva com status atualizados!")
+    if stream:
+        # Libera o arquivo de entrada antes de gerar a planilha de saída
+        wb.close()
+    if writer.close():
+        if stream:
+            logger.success(f"Planilha com status atualizados salva em '{writer.output_path}'")
+        else:
+            logger.success("Planilha salva com status atualizados!")
     else:
         logger.error("Erro ao salvar planilha final!")
     
-    logger.statistics(total_processado, total_sucesso, total_erro)
+    run_stats = {
+        "elapsed_seconds": time.perf_counter() - started,
+        "workbook_io_seconds": load_seconds + writer.io_seconds,
+        "network_seconds": client.network_seconds,
+        "requests": client.request_count,
+        "concurrency": controller.summary() if controller else None,
+    }
+    logger.statistics(total_processado, total_sucesso, total_erro, http_summary=client.metrics.summary(),
+                      concurrency=run_stats["concurrency"])
+    try:
+        if HTTP_METRICS_JSON:
+            client.metrics.write_json(HTTP_METRICS_JSON)
+        if HTTP_METRICS_PROM:
+            client.metrics.write_prometheus(HTTP_METRICS_PROM)
+    except Exception as e:
+        logger.warning(f"Não foi possível gravar as métricas HTTP: {e}")
     logger.process_end("Processo de Input de dados no GLPI")
     
     return total_processado, total_sucesso, total_erro
 
 
+def parse_args():
+    """Lê as opções de linha de comando"""
+    parser = argparse.ArgumentParser(description="Input automatizado de dados no GLPI via API")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Número de linhas processadas em paralelo (padrão: 1)")
+    parser.add_argument("--batch-size", type=int, default=ASSET_BATCH_SIZE,
+                        help=f"Computers, Phones e Lines novos criados por requisição (padrão: {ASSET_BATCH_SIZE}, 1 = um a um)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Lê a planilha em streaming (somente leitura) e grava os status no final em uma planilha de saída "
+                             "(STREAM_OUTPUT_PATH, padrão: <planilha>.out.xlsx), para planilhas muito grandes")
+    parser.add_argument("--resume", action="store_true",
+                        help="Retoma a execução anterior da mesma planilha, pulando as linhas já concluídas (não reseta o GLPI)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Processa só as linhas novas ou alteradas desde a última execução (não reseta o GLPI)")
+    parser.add_argument("--report-removed", action="store_true",
+                        help="Com --incremental, lista as linhas da execução anterior que não estão mais na planilha")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Ajusta automaticamente as requisições simultâneas pela latência (p95) e taxa de erros do GLPI; "
+                             "--workers vira o máximo (padrão: ADAPTIVE_MAX_CONCURRENCY)")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
     try:
+        args = parse_args()
+        
         # Inicializar logger
         logger = get_logger()
-        logger.process_start("Reset do GLPI")
-        reset_glpi()
+        # Ao retomar (ou no modo incremental), os dados já criados no GLPI são mantidos
+        if not args.resume and not args.incremental:
+            logger.process_start("Reset do GLPI")
+            reset_glpi()
         
-        total, sucessos, erros = main()
+        total, sucessos, erros = main(workers=args.workers, batch_size=args.batch_size,
+                                      stream=args.stream, resume=args.resume, adaptive=args.adaptive,
+                                      incremental=args.incremental, report_removed=args.report_removed)
         
         if total > 0:
             taxa_sucesso = (sucessos / total) * 100